@@ -3,20 +3,79 @@ Gemini File Search 챗봇
 Google Gemini File Search API를 활용한 문서 기반 질의응답 웹 애플리케이션
 """
 
+import threading
+import time
+
 import streamlit as st
 from dotenv import load_dotenv
 
 # 로컬 모듈 임포트
-from config import PAGE_CONFIG, UPLOAD_CONFIG
+from config import PAGE_CONFIG, UPLOAD_CONFIG, SESSION_IO_CONFIG, REQUEST_CONTROL_CONFIG
 from styles import get_custom_css
-from gemini_api import initialize_client, create_store, upload_file, query_store
-from utils import get_store_stats
+from gemini_api import (
+    initialize_client,
+    create_store,
+    get_store,
+    upload_file,
+    query_store,
+    summarize_conversation
+)
+from conversation import build_conversation, conversation_fingerprint, new_summary_cache
+from citations import prepare_inline_citations
+from session_io import export_session_bytes, import_session_bytes, SessionFormatError
+from warmup import start_store_warmup, is_warm
+from tagging import build_metadata_filter, collect_scope_options, new_upload_batch_id, parse_labels
+from precompute import (
+    canned_questions,
+    get_precomputed_answer,
+    is_canned_question,
+    ready_questions,
+    start_precompute
+)
+from request_control import (
+    DeadlineExceeded,
+    OperationCancelled,
+    new_deadline,
+    result_with_deadline,
+    submit
+)
+from shared_state import (
+    register_store,
+    list_registered_stores,
+    session_owner,
+    workspace_owner,
+    bump_store_version,
+    answer_cache_key,
+    get_cached_answer,
+    put_cached_answer,
+    try_acquire_request
+)
+from utils import (
+    get_store_stats,
+    new_store_stats,
+    load_store_stats,
+    save_store_stats,
+    seed_store_stats,
+    export_store_stats,
+    store_stats_view,
+    update_store_stats,
+    stats_add_file,
+    stats_record_query,
+    stats_record_first_query,
+    stats_record_cache_lookup,
+    stats_record_canned_question,
+    query_latency_percentile
+)
 from ui_components import (
     render_file_metadata_sidebar,
+    render_store_stats,
+    render_warmup_status,
+    render_annotated_answer,
     render_source_citations,
     render_debug_info,
     render_file_metadata_detail,
     render_example_questions,
+    render_search_scope,
     render_footer
 )
 
@@ -38,6 +97,63 @@ if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
 if "uploaded_files_metadata" not in st.session_state:
     st.session_state.uploaded_files_metadata = []
+if "conversation_summary" not in st.session_state:
+    st.session_state.conversation_summary = new_summary_cache()
+if "store_stats" not in st.session_state:
+    st.session_state.store_stats = store_stats_view(new_store_stats())
+if "warmup" not in st.session_state:
+    st.session_state.warmup = None
+if "precompute" not in st.session_state:
+    st.session_state.precompute = None
+if "first_query_pending" not in st.session_state:
+    st.session_state.first_query_pending = False
+if "session_owner" not in st.session_state:
+    st.session_state.session_owner = session_owner()
+if "workspace_key" not in st.session_state:
+    st.session_state.workspace_key = ""
+
+
+def current_owner():
+    """Store 레지스트리 소유자 ID (워크스페이스 키가 없으면 이 세션만)"""
+    if st.session_state.workspace_key:
+        return workspace_owner(st.session_state.workspace_key)
+    return st.session_state.session_owner
+
+
+def activate_store(store, store_stats=None):
+    """Store를 활성화하고 통계를 불러온 뒤 백그라운드 워밍업을 시작합니다."""
+    st.session_state.store = store
+    if store_stats:
+        st.session_state.store_stats = seed_store_stats(store.name, store_stats)
+    else:
+        st.session_state.store_stats = load_store_stats(store.name)
+    register_store(store.name, store.display_name, current_owner())
+    st.session_state.warmup = start_store_warmup(st.session_state.client, store.name)
+    st.session_state.precompute = None
+    st.session_state.first_query_pending = True
+
+
+def cancel_current_operation():
+    """진행 중인 업로드/질의를 취소합니다. (중지 버튼 콜백)"""
+    if st.session_state.get("cancel_event"):
+        st.session_state.cancel_event.set()
+
+
+def begin_cancellable_operation(container, timeout_seconds, key):
+    """중지 버튼과 경과 시간 표시가 연결된 Deadline을 생성합니다."""
+    cancel_event = threading.Event()
+    st.session_state.cancel_event = cancel_event
+
+    with container.container():
+        st.button("⏹️ 중지", key=key, on_click=cancel_current_operation)
+        elapsed_text = st.empty()
+
+    start_time = time.perf_counter()
+
+    def show_elapsed():
+        elapsed_text.caption(f"⏳ {time.perf_counter() - start_time:.0f}초 경과 (최대 {timeout_seconds}초)")
+
+    return new_deadline(timeout_seconds, cancel_event=cancel_event, on_wait=show_elapsed)
 
 
 # ============================================================================
@@ -51,26 +167,9 @@ st.markdown("##### 문서 기반 질의응답 시스템")
 # 사이드바
 # ============================================================================
 
-with st.sidebar:
-    st.markdown("### ⚙️ 설정")
-
-    # 클라이언트 초기화
-    if not st.session_state.client:
-        with st.spinner("클라이언트 초기화 중..."):
-            client, error = initialize_client()
-            if client:
-                st.session_state.client = client
-                st.success("✓ 클라이언트 초기화 완료")
-            else:
-                st.error(f"❌ {error}")
-                st.info("💡 .env 파일에 GEMINI_API_KEY를 설정해주세요")
-                st.stop()
-    else:
-        st.success("✓ 클라이언트 연결됨")
-
-    st.divider()
-
-    # Store 관리
+@st.fragment
+def store_panel():
+    """Store 생성/연결 영역 (입력 중에는 이 영역만 다시 실행)"""
     st.markdown("### 📁 Store 관리")
 
     if not st.session_state.store:
@@ -84,11 +183,37 @@ with st.sidebar:
             with st.spinner("Store 생성 중..."):
                 store, error = create_store(st.session_state.client, new_store_name)
                 if store:
-                    st.session_state.store = store
+                    activate_store(store)
                     st.success(f"✓ Store 생성 완료")
                     st.rerun()
                 else:
                     st.error(f"❌ 생성 실패: {error}")
+
+        # 같은 워크스페이스 키로 다른 워커/세션에서 만든 Store에 연결
+        # (Store가 활성화된 동안 입력란이 사라져도 키를 유지하도록 별도 상태에 보관)
+        if "workspace_key_input" not in st.session_state:
+            st.session_state.workspace_key_input = st.session_state.workspace_key
+        st.session_state.workspace_key = st.text_input(
+            "워크스페이스 키 (선택)",
+            type="password",
+            key="workspace_key_input",
+            help="같은 키를 입력한 세션끼리만 기존 Store 목록을 공유합니다. 비워 두면 이 세션에서 만든 Store만 보입니다."
+        )
+        registered_stores = list_registered_stores(current_owner())
+        if registered_stores:
+            selected_store = st.selectbox(
+                "기존 Store 연결",
+                registered_stores,
+                format_func=lambda store: f"{store['display_name']} ({store['name']})"
+            )
+            if st.button("🔗 Store 연결", use_container_width=True):
+                with st.spinner("Store 연결 중..."):
+                    store, error = get_store(st.session_state.client, selected_store["name"])
+                    if store:
+                        activate_store(store)
+                        st.rerun()
+                    else:
+                        st.error(f"❌ 연결 실패: {error}")
     else:
         st.success(f"**활성 Store**")
         st.code(st.session_state.store.display_name)
@@ -97,44 +222,163 @@ with st.sidebar:
             st.session_state.store = None
             st.session_state.chat_history = []
             st.session_state.uploaded_files_metadata = []
+            st.session_state.conversation_summary = new_summary_cache()
+            st.session_state.store_stats = store_stats_view(new_store_stats())
+            st.session_state.warmup = None
+            st.session_state.precompute = None
             st.rerun()
 
-    st.divider()
 
-    # 업로드된 파일 목록
-    if st.session_state.uploaded_files_metadata:
-        st.markdown("### 📚 업로드된 파일")
-        for idx, file_meta in enumerate(st.session_state.uploaded_files_metadata, 1):
-            with st.expander(f"{idx}. {file_meta['filename']} ({file_meta['file_size_mb']} MB)"):
-                render_file_metadata_sidebar(file_meta)
+@st.fragment(run_every=1)
+def warmup_progress():
+    """워밍업 진행 상태 (사이드바는 채팅 중에 다시 실행되지 않으므로 끝날 때까지 1초마다 이 영역만 갱신)"""
+    if warmup_running():
+        render_warmup_status(st.session_state.warmup)
+    else:
+        # 완료 표시와 함께 워밍업에서 가져온 문서가 검색 범위 선택지에 반영되도록 전체를 한 번 다시 실행
+        st.rerun()
 
-    st.divider()
 
-    # 통계 및 작업
-    if st.session_state.store:
+def warmup_running():
+    return bool(st.session_state.warmup) and st.session_state.warmup["state"] == "running"
+
+
+def stats_panel(container):
+    """사이드바에 자리만 잡아 둔 container에 Store 통계를 그립니다."""
+    with container.container():
         st.markdown("### 📊 통계")
         stats = get_store_stats(
-            st.session_state.uploaded_files_metadata,
+            st.session_state.store_stats,
             st.session_state.chat_history
         )
+        render_store_stats(stats)
+        st.divider()
 
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("파일", stats["uploaded_files"])
-            st.metric("대화", stats["chat_messages"])
-        with col2:
-            st.metric("총 크기", f"{stats['total_size_mb']:.1f} MB")
-            if stats["total_tokens"] > 0:
-                st.metric("총 토큰", f"~{stats['total_tokens']:,}")
+
+@st.fragment
+def session_panel():
+    """채팅 초기화와 세션 내보내기/불러오기 영역"""
+    # 채팅 초기화 버튼 (채팅은 별도 fragment에서 갱신되므로 Store가 있으면 항상 표시)
+    if st.session_state.store:
+        if st.button("🗑️ 채팅 기록 삭제", use_container_width=True, type="secondary"):
+            st.session_state.chat_history = []
+            st.session_state.conversation_summary = new_summary_cache()
+            st.rerun()
 
         st.divider()
 
-        # 채팅 초기화 버튼
-        if st.session_state.chat_history:
-            if st.button("🗑️ 채팅 기록 삭제", use_container_width=True, type="secondary"):
-                st.session_state.chat_history = []
-                st.success("채팅 기록이 삭제되었습니다")
+    # 세션 내보내기/불러오기
+    st.markdown("### 💾 세션")
+
+    if st.session_state.store:
+        if st.button("📦 세션 내보내기 준비", use_container_width=True):
+            st.session_state.session_export = export_session_bytes(
+                {
+                    "name": st.session_state.store.name,
+                    "display_name": st.session_state.store.display_name
+                },
+                st.session_state.uploaded_files_metadata,
+                st.session_state.chat_history,
+                export_store_stats(st.session_state.store.name)
+            )
+
+        if st.session_state.get("session_export"):
+            st.download_button(
+                "⬇️ 세션 파일 다운로드",
+                data=st.session_state.session_export,
+                file_name=f"session.{SESSION_IO_CONFIG['file_extension']}",
+                mime="application/octet-stream",
+                use_container_width=True
+            )
+
+    session_file = st.file_uploader(
+        "세션 파일 불러오기",
+        type=[SESSION_IO_CONFIG["file_extension"]],
+        key="session_import"
+    )
+    if session_file and st.button("📂 세션 복원", use_container_width=True):
+        store_lookup = []
+        controls = st.empty()
+        deadline = begin_cancellable_operation(
+            controls,
+            REQUEST_CONTROL_CONFIG["background_timeout_seconds"],
+            key="stop_restore"
+        )
+
+        def connect_store(store_info):
+            # 헤더를 읽자마자 Store 조회를 시작해 나머지 레코드를 푸는 시간과 겹치게 함
+            store_lookup.append(
+                submit(get_store, st.session_state.client, store_info["name"], deadline, pool="background")
+            )
+
+        try:
+            session = import_session_bytes(session_file.getvalue(), on_header=connect_store)
+        except (SessionFormatError, ValueError) as e:
+            controls.empty()
+            st.error(f"❌ 세션 파일 오류: {e}")
+        else:
+            # 조회가 멈춰도 마감 시간/중지 버튼으로 빠져나옴
+            try:
+                store, error = result_with_deadline(store_lookup[0], deadline)
+            except (DeadlineExceeded, OperationCancelled) as e:
+                store, error = None, str(e)
+            controls.empty()
+            if store:
+                store_stats = None
+                if session["store_stats"]:
+                    store_stats = dict(new_store_stats(), **session["store_stats"])
+                activate_store(store, store_stats)
+                st.session_state.uploaded_files_metadata = session["uploaded_files_metadata"]
+                st.session_state.chat_history = session["chat_history"]
+                st.session_state.conversation_summary = new_summary_cache()
+                st.session_state.session_export = None
                 st.rerun()
+            else:
+                st.error(f"❌ Store 연결 실패: {error}")
+
+
+with st.sidebar:
+    st.markdown("### ⚙️ 설정")
+
+    # 클라이언트 초기화
+    if not st.session_state.client:
+        with st.spinner("클라이언트 초기화 중..."):
+            client, error = initialize_client()
+            if client:
+                st.session_state.client = client
+                st.success("✓ 클라이언트 초기화 완료")
+            else:
+                st.error(f"❌ {error}")
+                st.info("💡 .env 파일에 GEMINI_API_KEY를 설정해주세요")
+                st.stop()
+    else:
+        st.success("✓ 클라이언트 연결됨")
+
+    st.divider()
+
+    store_panel()
+
+    # 워밍업 중일 때만 주기적으로 갱신되는 fragment 사용 (완료 후에는 정적으로 표시)
+    if warmup_running():
+        warmup_progress()
+    else:
+        render_warmup_status(st.session_state.warmup)
+
+    st.divider()
+
+    # 업로드된 파일 목록
+    if st.session_state.uploaded_files_metadata:
+        st.markdown("### 📚 업로드된 파일")
+        for idx, file_meta in enumerate(st.session_state.uploaded_files_metadata, 1):
+            with st.expander(f"{idx}. {file_meta['filename']} ({file_meta['file_size_mb']} MB)"):
+                render_file_metadata_sidebar(file_meta)
+
+    st.divider()
+
+    # 통계 자리 (질의로 바뀌는 값이므로 채팅 fragment가 실행될 때마다 그림)
+    stats_container = st.empty()
+
+    session_panel()
 
 
 # ============================================================================
@@ -152,22 +396,40 @@ tab1, tab2 = st.tabs(["💬 질의응답", "📤 파일 업로드"])
 # Tab 1: 질의응답
 # ============================================================================
 
-with tab1:
+@st.fragment
+def chat_panel(stats_container):
+    """질의응답 영역 (질문 제출 시 이 영역만 다시 실행)"""
     # 시작 안내 (채팅 기록이 없을 때)
     if not st.session_state.chat_history:
-        if st.session_state.uploaded_files_metadata:
+        if st.session_state.uploaded_files_metadata or st.session_state.store_stats["file_count"]:
             st.info("💡 **팁:** 업로드된 문서에 대해 자유롭게 질문해보세요!")
-            render_example_questions()
+            render_example_questions(
+                canned_questions(),
+                ready_questions(st.session_state.store.name),
+                st.session_state.precompute
+            )
         else:
             st.info("📤 먼저 '파일 업로드' 탭에서 문서를 업로드해주세요")
 
+    # 검색 범위 선택 (선택한 파일/라벨의 태그로 검색 문서를 좁힘)
+    scope_files, scope_labels = render_search_scope(*collect_scope_options(
+        st.session_state.uploaded_files_metadata,
+        st.session_state.warmup["documents"] if is_warm(st.session_state.warmup) else None
+    ))
+    metadata_filter = build_metadata_filter(scope_files, scope_labels)
+
     # 채팅 히스토리 표시
     for chat in st.session_state.chat_history:
         with st.chat_message("user", avatar="👤"):
             st.markdown(chat["question"])
+            if chat.get("metadata_filter"):
+                st.caption(f"🎯 검색 범위: `{chat['metadata_filter']}`")
 
         with st.chat_message("assistant", avatar="🤖"):
-            st.markdown(chat["answer"])
+            render_annotated_answer(
+                chat.get("annotated_answer", chat["answer"]),
+                chat.get("footnotes", [])
+            )
 
             # 인용 출처 표시
             if chat.get("debug_info") and chat["debug_info"].get("grounding_chunks"):
@@ -179,24 +441,99 @@ with tab1:
                 render_debug_info(chat["debug_info"])
 
     # 질문 입력
+    # 예시 질문 버튼을 누르면 pending_question으로 전달됨
     question = st.chat_input("질문을 입력하세요...", key="chat_input")
+    question = question or st.session_state.pop("pending_question", None)
 
     if question:
         # 사용자 메시지 표시
         with st.chat_message("user", avatar="👤"):
             st.markdown(question)
+            if metadata_filter:
+                st.caption(f"🎯 검색 범위: `{metadata_filter}`")
 
         # AI 답변 생성
         with st.chat_message("assistant", avatar="🤖"):
             with st.spinner("답변 생성 중..."):
-                answer, citations, debug_info, error = query_store(
+                # 이전 대화를 토큰 예산 안에서 컨텍스트로 구성
+                contents, system_instruction = build_conversation(
                     st.session_state.client,
+                    st.session_state.chat_history,
                     question,
-                    st.session_state.store.name
+                    st.session_state.conversation_summary,
+                    summarize_conversation
+                )
+
+                # 같은 Store 버전/대화 맥락/검색 범위의 답변이 공유 캐시에 있으면 재사용
+                cache_key = answer_cache_key(
+                    st.session_state.store.name,
+                    question,
+                    conversation_fingerprint(contents, system_instruction),
+                    metadata_filter=metadata_filter
                 )
+                cached = get_cached_answer(cache_key)
+                if not cached and not metadata_filter:
+                    # 사전 계산된 질문은 대화 중에 다시 물어도 미리 준비한 답변을 사용
+                    cached = get_precomputed_answer(st.session_state.store.name, question)
+
+                # 통계 변경은 모아 두었다가 공유 상태에 한 번에 적용
+                stats_changes = [lambda stats: stats_record_cache_lookup(stats, bool(cached))]
+                if is_canned_question(question):
+                    stats_changes.append(
+                        lambda stats: stats_record_canned_question(stats, question.strip(), bool(cached))
+                    )
+
+                if cached:
+                    answer, citations, debug_info, error = (
+                        cached["answer"], cached["citations"], cached["debug_info"], None
+                    )
+                elif not try_acquire_request():
+                    answer, citations, debug_info, error = (
+                        None, None, None, "요청 한도를 초과했습니다. 잠시 후 다시 시도해주세요."
+                    )
+                else:
+                    controls = st.empty()
+                    deadline = begin_cancellable_operation(
+                        controls,
+                        REQUEST_CONTROL_CONFIG["query_timeout_seconds"],
+                        key="stop_query"
+                    )
+                    hedge_after = query_latency_percentile(
+                        st.session_state.store_stats,
+                        95,
+                        REQUEST_CONTROL_CONFIG["hedge_min_samples"]
+                    )
+
+                    query_start = time.perf_counter()
+                    answer, citations, debug_info, error = query_store(
+                        st.session_state.client,
+                        question,
+                        st.session_state.store.name,
+                        contents=contents,
+                        system_instruction=system_instruction,
+                        deadline=deadline,
+                        hedge_after=hedge_after,
+                        metadata_filter=metadata_filter
+                    )
+                    controls.empty()
+
+                    if answer:
+                        query_seconds = time.perf_counter() - query_start
+                        stats_changes.append(lambda stats: stats_record_query(stats, query_seconds))
+                        if st.session_state.first_query_pending:
+                            warm = is_warm(st.session_state.warmup)
+                            stats_changes.append(
+                                lambda stats: stats_record_first_query(stats, query_seconds, warm)
+                            )
+                            st.session_state.first_query_pending = False
+                        put_cached_answer(cache_key, answer, citations, debug_info)
+
+                st.session_state.store_stats = update_store_stats(st.session_state.store.name, *stats_changes)
+                save_store_stats(st.session_state.store.name)
 
                 if answer:
-                    st.markdown(answer)
+                    annotated_answer, footnotes = prepare_inline_citations(answer, debug_info)
+                    render_annotated_answer(annotated_answer, footnotes)
 
                     # 인용 출처 표시
                     if debug_info and debug_info.get("grounding_chunks"):
@@ -213,21 +550,42 @@ with tab1:
                     st.session_state.chat_history.append({
                         "question": question,
                         "answer": answer,
+                        "annotated_answer": annotated_answer,
+                        "footnotes": footnotes,
                         "citations": citations,
-                        "debug_info": debug_info
+                        "debug_info": debug_info,
+                        "metadata_filter": metadata_filter
                     })
+                    st.session_state.session_export = None
                 else:
                     st.error(f"❌ 오류 발생: {error}")
 
+    # 사이드바 전체를 다시 실행하지 않고 통계만 갱신
+    stats_panel(stats_container)
+
+
+with tab1:
+    chat_panel(stats_container)
+
 
 # ============================================================================
 # Tab 2: 파일 업로드
 # ============================================================================
 
-with tab2:
+@st.fragment
+def upload_panel():
+    """파일 선택/업로드 영역 (업로드가 끝나 파일 목록이 바뀌면 전체를 다시 실행)"""
     st.markdown("### 📤 파일 업로드")
     st.markdown("업로드된 파일은 자동으로 인덱싱되어 질의응답에 사용됩니다.")
 
+    # 직전 업로드 배치 결과 (업로드 후 전체 rerun으로 사라진 진행 메시지 대신 표시)
+    upload_report = st.session_state.pop("upload_report", None)
+    if upload_report:
+        for level, message in upload_report["messages"]:
+            getattr(st, level)(message)
+        st.markdown(f"**완료:** {upload_report['success_count']}/{upload_report['total']}개 파일 업로드 성공")
+        st.balloons()
+
     uploaded_files = st.file_uploader(
         "파일을 선택하세요 (PDF, TXT, DOCX, MD, CSV)",
         accept_multiple_files=True,
@@ -239,35 +597,101 @@ with tab2:
         st.markdown(f"**선택된 파일:** {len(uploaded_files)}개")
 
         col1, col2 = st.columns([3, 1])
+        with col1:
+            labels_text = st.text_input(
+                "라벨",
+                placeholder="예: 재무, 2024, 계약서",
+                help="쉼표로 구분한 라벨을 붙이면 질의응답 탭에서 라벨로 검색 범위를 좁힐 수 있습니다",
+                label_visibility="collapsed"
+            )
         with col2:
             upload_button = st.button("⬆️ 업로드 시작", type="primary", use_container_width=True)
 
         if upload_button:
             progress_bar = st.progress(0)
             status_text = st.empty()
+            controls = st.empty()
+            batch_deadline = begin_cancellable_operation(
+                controls,
+                REQUEST_CONTROL_CONFIG["upload_timeout_seconds"],
+                key="stop_upload"
+            )
 
             success_count = 0
+            messages = []
+            uploaded_metadata = []
+            upload_batch = new_upload_batch_id()
+            labels = parse_labels(labels_text)
 
             for i, file in enumerate(uploaded_files):
+                if batch_deadline.cancel_event.is_set():
+                    messages.append(("warning", "⏹️ 업로드가 중지되었습니다"))
+                    st.warning(messages[-1][1])
+                    break
+
+                if not try_acquire_request():
+                    messages.append(("error", f"✗ {file.name}: 요청 한도를 초과했습니다. 잠시 후 다시 시도해주세요."))
+                    st.error(messages[-1][1])
+                    continue
+
                 status_text.markdown(f"**업로드 중:** `{file.name}`")
 
+                # 파일마다 마감 시간을 새로 두고, 중지 버튼은 배치 전체에 적용
                 success, file_metadata, error = upload_file(
                     st.session_state.client,
                     file,
-                    st.session_state.store.name
+                    st.session_state.store.name,
+                    deadline=new_deadline(
+                        REQUEST_CONTROL_CONFIG["upload_timeout_seconds"],
+                        cancel_event=batch_deadline.cancel_event,
+                        on_wait=batch_deadline.on_wait
+                    ),
+                    upload_batch=upload_batch,
+                    labels=labels
                 )
 
                 if success:
-                    st.success(f"✓ {file.name} 업로드 완료")
+                    messages.append(("success", f"✓ {file.name} 업로드 완료"))
+                    st.success(messages[-1][1])
                     st.session_state.uploaded_files_metadata.append(file_metadata)
+                    uploaded_metadata.append(file_metadata)
                     success_count += 1
                 else:
-                    st.error(f"✗ {file.name}: {error}")
+                    messages.append(("error", f"✗ {file.name}: {error}"))
+                    st.error(messages[-1][1])
 
                 progress_bar.progress((i + 1) / len(uploaded_files))
 
+            controls.empty()
+
+            if success_count:
+                def add_uploaded_files(stats):
+                    for file_metadata in uploaded_metadata:
+                        stats_add_file(stats, file_metadata)
+
+                st.session_state.store_stats = update_store_stats(st.session_state.store.name, add_uploaded_files)
+                save_store_stats(st.session_state.store.name)
+                bump_store_version(st.session_state.store.name)
+                st.session_state.session_export = None
+                # 바뀐 Store 버전 기준으로 자주 묻는 질문 답변을 미리 계산
+                st.session_state.precompute = start_precompute(
+                    st.session_state.client,
+                    st.session_state.store.name
+                )
+
+                # 파일 목록/통계/예시 질문이 바뀌었으므로 사이드바와 다른 탭까지 전체를 다시 실행
+                st.session_state.upload_report = {
+                    "messages": messages,
+                    "success_count": success_count,
+                    "total": len(uploaded_files)
+                }
+                st.rerun()
+
             status_text.markdown(f"**완료:** {success_count}/{len(uploaded_files)}개 파일 업로드 성공")
-            st.balloons()
+
+
+with tab2:
+    upload_panel()
 
     st.divider()
 
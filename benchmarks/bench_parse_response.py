@@ -0,0 +1,135 @@
+"""응답 파싱 비용 벤치마크 (리플렉션 기반 기존 방식 대비)
+
+grounding 청크/서포트 수를 바꿔 가며 generate_content 응답 한 건을 debug_info,
+citations dict로 바꾸는 데 드는 시간과 직렬화 크기를 비교합니다.
+
+사용법:
+    uv run python benchmarks/bench_parse_response.py --chunks 5 10 20 --repeat 2000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_gemini import make_grounded_response  # noqa: E402
+from models import QueryResult  # noqa: E402
+from splitter import resolve_source  # noqa: E402
+
+
+def _public_attrs(obj):
+    values = {}
+    for attr in dir(obj):
+        if not attr.startswith("_"):
+            try:
+                value = getattr(obj, attr)
+                if not callable(value):
+                    values[attr] = value
+            except Exception:
+                pass
+    return values
+
+
+def legacy_parse(response):
+    """기존 query_store의 dir()/hasattr 탐색 방식 (디버그 출력 포함)"""
+    debug_info = {"has_grounding": False, "grounding_chunks": [], "grounding_supports": [], "citations": []}
+    citations = []
+
+    for obj in [response] + list(response.parts or []):
+        for attr, value in _public_attrs(obj).items():
+            print(f"  - {attr}: {type(value).__name__}")
+
+    grounding_metadata = None
+    for candidate in response.candidates or []:
+        for attr, value in _public_attrs(candidate).items():
+            print(f"    - {attr}: {type(value).__name__}")
+            if attr == "grounding_metadata" and value:
+                grounding_metadata = value
+        for attr, value in _public_attrs(candidate.content).items():
+            print(f"    - {attr}: {type(value).__name__}")
+
+    if grounding_metadata:
+        debug_info["has_grounding"] = True
+        for attr, value in _public_attrs(grounding_metadata).items():
+            print(f"  - {attr}: {type(value).__name__}")
+
+        for idx, chunk in enumerate(grounding_metadata.grounding_chunks, 1):
+            for attr, value in _public_attrs(chunk).items():
+                print(f"    - {attr}: {type(value).__name__}")
+            chunk_data = {"index": idx}
+            if hasattr(chunk, "retrieved_context") and chunk.retrieved_context:
+                ctx = chunk.retrieved_context
+                for attr, value in _public_attrs(ctx).items():
+                    print(f"      - {attr}: {type(value).__name__} = {repr(value)[:100]}")
+                chunk_data["retrieved_context"] = {"title": ctx.title}
+                citation_item = {"title": ctx.title}
+                source_file, part_label = resolve_source(ctx.title)
+                if part_label:
+                    chunk_data["retrieved_context"].update(source_file=source_file, part=part_label)
+                    citation_item.update(source_file=source_file, part=part_label)
+                chunk_data["retrieved_context"].update(uri=ctx.uri, text=ctx.text)
+                citation_item.update(uri=ctx.uri, source=ctx.uri, text=ctx.text)
+                citations.append(citation_item)
+            debug_info["grounding_chunks"].append(chunk_data)
+
+        for idx, support in enumerate(grounding_metadata.grounding_supports, 1):
+            seg = support.segment
+            debug_info["grounding_supports"].append({
+                "index": idx,
+                "segment": {
+                    "text": getattr(seg, "text", ""),
+                    "start_index": getattr(seg, "start_index", None),
+                    "end_index": getattr(seg, "end_index", None)
+                },
+                "chunk_indices": list(support.grounding_chunk_indices),
+                "confidence_scores": list(support.confidence_scores)
+            })
+
+    return response.text, citations, debug_info
+
+
+def model_parse(response):
+    """QueryResult 기반 단일 패스 파싱"""
+    result = QueryResult.from_response(response)
+    return result.answer, result.citations(), result.debug_info()
+
+
+def measure(func, response, repeat):
+    with contextlib.redirect_stdout(io.StringIO()):
+        func(response)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            output = func(response)
+        elapsed = time.perf_counter() - start
+    return elapsed / repeat * 1e6, len(json.dumps(output, ensure_ascii=False).encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="응답 파싱 비용 벤치마크")
+    parser.add_argument("--chunks", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    # 기존 방식의 dir() 탐색이 pydantic 폐기 예정 속성까지 건드리며 내는 경고는 무시
+    warnings.simplefilter("ignore")
+
+    print(f"{'chunks':>6} {'legacy(us)':>11} {'models(us)':>11} {'speedup':>8} {'legacy(B)':>10} {'models(B)':>10}")
+    for chunk_count in args.chunks:
+        response = make_grounded_response("분기 매출 요약", chunk_count=chunk_count, answer_sentences=chunk_count * 2)
+        legacy_us, legacy_bytes = measure(legacy_parse, response, args.repeat)
+        model_us, model_bytes = measure(model_parse, response, args.repeat)
+        print(
+            f"{chunk_count:>6} {legacy_us:>11.1f} {model_us:>11.1f} {legacy_us / model_us:>7.1f}x "
+            f"{legacy_bytes:>10} {model_bytes:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
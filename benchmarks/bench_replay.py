@@ -0,0 +1,128 @@
+"""카세트 재생 벤치마크 (gemini_api 성능 회귀 확인용)
+
+녹화한 실제 트래픽(GFS_RECORD_MODE=record로 앱을 사용해 만든 카세트)의
+generate_content 요청을 query_store로 다시 실행합니다. 지연 배율 0으로 재생하면
+네트워크 시간 없이 요청 구성, 응답 파싱 등 클라이언트 측 비용만 측정되므로,
+gemini_api.py를 바꾼 전후의 결과를 비교할 수 있습니다.
+
+사용법:
+    GFS_RECORD_MODE=record GFS_CASSETTE=.cache/cassettes/prod.jsonl uv run streamlit run app.py
+    uv run python benchmarks/bench_replay.py .cache/cassettes/prod.jsonl --repeat 20
+    uv run python benchmarks/bench_replay.py --synthetic 50   # 가짜 클라이언트로 카세트 생성 후 재생
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from google.genai import types  # noqa: E402
+
+from gemini_api import query_store  # noqa: E402
+from recorder import load_cassette, recording_client, replay_client  # noqa: E402
+
+
+def make_synthetic_cassette(path, count, latency):
+    """가짜 클라이언트 호출을 녹화해 카세트를 만듭니다."""
+    from fake_gemini import FakeClient
+
+    client = recording_client(FakeClient(latency_seconds=latency, seed=0), path)
+    store = client.file_search_stores.create(config={"display_name": "replay"})
+    for index in range(count):
+        query_store(client, f"분기별 매출 추이와 고객 지표를 요약해줘 ({index})", store.name)
+    return store.name
+
+
+def recorded_queries(records):
+    """generate_content 기록에서 (질문, contents, system_instruction, store) 목록을 만듭니다."""
+    queries = []
+    for record in records:
+        if record["method"] != "models.generate_content" or "error" in record:
+            continue
+        request = record["request"]
+        config = request.get("config") or {}
+        tools = config.get("tools") or []
+        if not tools or "file_search" not in tools[0]:
+            continue  # 대화 요약 등 Store 검색이 없는 호출은 제외
+
+        contents = request["contents"]
+        if isinstance(contents, list):
+            contents = [types.Content.model_validate(content) for content in contents]
+            question = contents[-1].parts[0].text
+        else:
+            question, contents = contents, None
+        queries.append((
+            question,
+            contents,
+            config.get("system_instruction"),
+            tools[0]["file_search"]["file_search_store_names"][0],
+            record["duration_seconds"]
+        ))
+    return queries
+
+
+def replay(cassette_path, queries, latency_scale, repeat):
+    """카세트를 재생하며 query_store 1회당 소요 시간 목록을 반환합니다."""
+    durations = []
+    for _ in range(repeat):
+        client = replay_client(cassette_path, latency_scale=latency_scale, strict=True)
+        for question, contents, system_instruction, store_name, _ in queries:
+            start = time.perf_counter()
+            _, _, _, error = query_store(client, question, store_name, contents=contents,
+                                         system_instruction=system_instruction)
+            durations.append(time.perf_counter() - start)
+            if error:
+                raise RuntimeError(f"재생 실패: {error}")
+    return sorted(durations)
+
+
+def _percentile(sorted_values, percent):
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="카세트 재생 벤치마크")
+    parser.add_argument("cassette", nargs="?", help="카세트 파일 (JSON Lines)")
+    parser.add_argument("--synthetic", type=int, default=0, help="가짜 클라이언트로 만들 질의 수")
+    parser.add_argument("--latency", type=float, default=0.05, help="합성 카세트의 가짜 API 지연(초)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="종단 간 재생 시 지연 배율")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cassette_path = args.cassette
+        if args.synthetic:
+            cassette_path = os.path.join(tmp, "synthetic.jsonl")
+            make_synthetic_cassette(cassette_path, args.synthetic, args.latency)
+        if not cassette_path:
+            parser.error("카세트 파일 또는 --synthetic을 지정하세요")
+
+        queries = recorded_queries(load_cassette(cassette_path))
+        if not queries:
+            parser.error("카세트에 재생할 generate_content 기록이 없습니다")
+        recorded_seconds = sum(query[4] for query in queries)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            overhead = replay(cassette_path, queries, 0.0, args.repeat)
+            end_to_end = replay(cassette_path, queries, args.latency_scale, 1)
+
+    print(f"질의 {len(queries)}개 (녹화 당시 API 시간 합계 {recorded_seconds:.2f}초)")
+    print(
+        f"클라이언트 측 비용 (지연 0, {args.repeat}회 반복): "
+        f"p50 {_percentile(overhead, 50) * 1000:.2f}ms, p95 {_percentile(overhead, 95) * 1000:.2f}ms"
+    )
+    print(
+        f"종단 간 재생 (지연 x{args.latency_scale}): 합계 {sum(end_to_end):.2f}초, "
+        f"p50 {_percentile(end_to_end, 50) * 1000:.1f}ms, p95 {_percentile(end_to_end, 95) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""세션 내보내기/불러오기 벤치마크 (JSON 기준선 대비)
+
+사용법:
+    uv run python benchmarks/bench_session_io.py --turns 5000
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from session_io import export_session_bytes, import_session_bytes, iter_session_records  # noqa: E402
+
+
+def make_session(turns, chunks_per_turn):
+    """grounding 청크 텍스트를 포함한 가상 세션을 생성합니다."""
+    rng = random.Random(42)
+    words = ["문서", "요약", "매출", "분기", "보고서", "지표", "성장", "고객", "revenue", "growth"]
+
+    def sentence(n):
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    files = [
+        {
+            "filename": f"doc_{i}.pdf",
+            "file_size_bytes": 1024 * rng.randint(10, 5000),
+            "file_size_mb": 1.0,
+            "file_type": ".pdf",
+            "estimated_tokens": rng.randint(1000, 50000),
+            "estimated_chunks": rng.randint(3, 120),
+            "upload_duration_seconds": round(rng.uniform(2, 30), 2)
+        }
+        for i in range(50)
+    ]
+
+    chat_history = []
+    for turn in range(turns):
+        chunks = [
+            {
+                "index": idx,
+                "retrieved_context": {"title": f"doc_{rng.randrange(50)}.pdf", "text": sentence(250)}
+            }
+            for idx in range(1, chunks_per_turn + 1)
+        ]
+        answer = sentence(120)
+        chat_history.append({
+            "question": f"질문 {turn}: {sentence(12)}",
+            "answer": answer,
+            "annotated_answer": answer,
+            "footnotes": [],
+            "citations": [chunk["retrieved_context"] for chunk in chunks],
+            "debug_info": {"has_grounding": True, "grounding_chunks": chunks, "grounding_supports": []}
+        })
+    return files, chat_history
+
+
+def timed(func, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def restore(data, store_latency, overlapped):
+    """앱의 세션 복원 (파일 불러오기 + Store 조회)을 흉내 냅니다."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        if not overlapped:
+            import_session_bytes(data)
+            return executor.submit(time.sleep, store_latency).result()
+        lookup = []
+        import_session_bytes(data, on_header=lambda store_info: lookup.append(executor.submit(time.sleep, store_latency)))
+        return lookup[0].result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=3000)
+    parser.add_argument("--chunks-per-turn", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--store-latency", type=float, default=0.2, help="세션 복원 시 Store 조회 지연(초)")
+    args = parser.parse_args()
+
+    files, chat_history = make_session(args.turns, args.chunks_per_turn)
+    store_info = {"name": "fileSearchStores/bench", "display_name": "Bench"}
+    baseline = {"store": store_info, "uploaded_files_metadata": files, "chat_history": chat_history}
+
+    json_dump_time, json_data = timed(lambda: json.dumps(baseline, ensure_ascii=False).encode("utf-8"), args.repeat)
+    json_load_time, _ = timed(lambda: json.loads(json_data), args.repeat)
+
+    export_time, binary_data = timed(lambda: export_session_bytes(store_info, files, chat_history), args.repeat)
+    import_time, _ = timed(lambda: import_session_bytes(binary_data), args.repeat)
+
+    def first_turn():
+        for kind, obj in iter_session_records(io.BytesIO(binary_data)):
+            if kind == "chat":
+                return obj
+        return None
+
+    stream_time, _ = timed(first_turn, args.repeat)
+    sequential_time, _ = timed(lambda: restore(binary_data, args.store_latency, False), args.repeat)
+    overlapped_time, _ = timed(lambda: restore(binary_data, args.store_latency, True), args.repeat)
+
+    print(f"세션: 대화 {args.turns}턴, 턴당 청크 {args.chunks_per_turn}개, 파일 {len(files)}개")
+    print(f"{'형식':<18}{'크기 (MB)':>12}{'저장 (ms)':>12}{'불러오기 (ms)':>16}")
+    print(f"{'JSON 기준선':<18}{len(json_data) / 1e6:>12.2f}{json_dump_time * 1e3:>12.1f}{json_load_time * 1e3:>16.1f}")
+    print(f"{'GFSS 바이너리':<18}{len(binary_data) / 1e6:>12.2f}{export_time * 1e3:>12.1f}{import_time * 1e3:>16.1f}")
+    print(f"스트리밍 첫 대화 읽기: {stream_time * 1e3:.2f} ms")
+    print(
+        f"앱 세션 복원 (Store 조회 {args.store_latency * 1e3:.0f} ms 포함): "
+        f"불러온 뒤 조회 {sequential_time * 1e3:.1f} ms, 헤더를 읽자마자 조회 {overlapped_time * 1e3:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
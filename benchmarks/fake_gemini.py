@@ -0,0 +1,137 @@
+"""벤치마크용 가짜 Gemini 클라이언트
+
+네트워크 없이 genai.Client와 같은 모양(models, file_search_stores, operations)의
+응답을 돌려주며, 호출마다 지연 시간을 주입할 수 있습니다.
+"""
+
+import random
+import threading
+import time
+import uuid
+
+from google.genai import types
+
+
+class FakeLatency:
+    """평균 지연 시간과 지터(비율)로 sleep 시간을 만듭니다."""
+
+    def __init__(self, mean_seconds=0.0, jitter=0.2, seed=None):
+        self.mean_seconds = mean_seconds
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self):
+        if self.mean_seconds <= 0:
+            return
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(self.mean_seconds * factor)
+
+
+def make_grounded_response(question, chunk_count=5, answer_sentences=8):
+    """grounding 메타데이터가 포함된 응답을 생성합니다."""
+    sentences = [f"{question}에 대한 답변 문장 {idx}입니다." for idx in range(1, answer_sentences + 1)]
+    answer = " ".join(sentences)
+
+    supports = []
+    offset = 0
+    for idx, sentence in enumerate(sentences):
+        length = len((sentence + " ").encode("utf-8"))
+        supports.append(types.GroundingSupport(
+            segment=types.Segment(start_index=offset, end_index=offset + length - 1, text=sentence),
+            grounding_chunk_indices=[idx % chunk_count],
+            confidence_scores=[0.9]
+        ))
+        offset += length
+
+    chunks = [
+        types.GroundingChunk(retrieved_context=types.GroundingChunkRetrievedContext(
+            title=f"document_{idx}.md",
+            uri=f"fileSearchStores/fake/documents/{idx}",
+            text=f"참조 텍스트 {idx} " * 60
+        ))
+        for idx in range(chunk_count)
+    ]
+
+    return types.GenerateContentResponse(candidates=[types.Candidate(
+        content=types.Content(role="model", parts=[types.Part(text=answer)]),
+        grounding_metadata=types.GroundingMetadata(grounding_chunks=chunks, grounding_supports=supports)
+    )])
+
+
+class _FakeModels:
+    def __init__(self, latency):
+        self._latency = latency
+
+    def generate_content(self, model, contents, config=None):
+        self._latency.sleep()
+        if isinstance(contents, str):
+            question = contents
+        else:
+            question = contents[-1].parts[0].text
+        return make_grounded_response(question[:40])
+
+
+class _FakeDocuments:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def list(self, parent, config=None):
+        self._owner.latency.sleep()
+        return list(self._owner.documents.get(parent, {}).values())
+
+    def delete(self, name, config=None):
+        self._owner.latency.sleep()
+        for documents in self._owner.documents.values():
+            documents.pop(name, None)
+
+
+class _FakeFileSearchStores:
+    def __init__(self, owner):
+        self._owner = owner
+        self.documents = _FakeDocuments(owner)
+
+    def create(self, config=None):
+        self._owner.latency.sleep()
+        display_name = (config or {}).get("display_name", "store")
+        return types.FileSearchStore(name=f"fileSearchStores/{uuid.uuid4().hex[:12]}", display_name=display_name)
+
+    def get(self, name, config=None):
+        self._owner.latency.sleep()
+        return types.FileSearchStore(name=name, display_name=name.split("/")[-1])
+
+    def upload_to_file_search_store(self, file, file_search_store_name, config=None):
+        self._owner.latency.sleep()
+        config = config or {}
+        document_name = f"{file_search_store_name}/documents/{uuid.uuid4().hex[:12]}"
+        self._owner.documents.setdefault(file_search_store_name, {})[document_name] = types.Document(
+            name=document_name,
+            display_name=config.get("display_name"),
+            custom_metadata=config.get("custom_metadata")
+        )
+        return types.UploadToFileSearchStoreOperation(
+            name=f"operations/{uuid.uuid4().hex[:12]}",
+            done=False,
+            response=types.UploadToFileSearchStoreResponse(document_name=document_name)
+        )
+
+
+class _FakeOperations:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def get(self, operation, config=None):
+        self._owner.latency.sleep()
+        return operation.model_copy(update={"done": True})
+
+
+class FakeClient:
+    """genai.Client를 대신하는 가짜 클라이언트입니다."""
+
+    def __init__(self, latency_seconds=0.0, jitter=0.2, seed=None):
+        self.latency = FakeLatency(latency_seconds, jitter, seed)
+        self.documents = {}
+        self.models = _FakeModels(self.latency)
+        self.file_search_stores = _FakeFileSearchStores(self)
+        self.operations = _FakeOperations(self)
@@ -0,0 +1,337 @@
+"""동시 세션 부하 테스트 (앱 인스턴스 하나가 감당하는 사용자 수 측정)
+
+Streamlit 서버처럼 한 프로세스 안에서 세션마다 스레드를 두고, 각 세션이 AppTest로
+실제 app.py 스크립트를 실행합니다. 세션은 Store 생성 → 파일 업로드 → 질의 반복
+(대화 기록 증가) 순서로 진행하며, Gemini API는 지연 시간을 주입한 가짜 클라이언트로
+대체합니다. --cassette를 주면 recorder.py로 녹화한 실제 트래픽을 재생합니다.
+
+동시 세션 수별로 rerun 지연 백분위수, 처리량, 세션당 CPU 시간/메모리, 질의 rerun
+1회당 CPU 시간을 출력하고 p95 지연이 기준의 --saturation-factor배를 넘거나 처리량이
+더 늘지 않는 지점을 포화 시작으로 표시합니다.
+
+AppTest는 항상 스크립트 전체를 다시 실행하므로, 브라우저처럼 조작한 위젯이 속한
+fragment만 다시 실행하도록 요청합니다. --rerun-scope app이면 항상 전체를 실행합니다.
+
+사용법:
+    uv run python benchmarks/load_test_sessions.py --sessions 1 2 4 8 16 --turns 10
+    uv run python benchmarks/load_test_sessions.py --sessions 1 --uploads 100 --file-kb 1 --rerun-scope app
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+APP_PATH = os.path.join(ROOT, "app.py")
+UPLOAD_LABEL_PREFIX = "파일을 선택하세요"
+
+# 세션 스레드별로 다음 rerun의 fragment와 마지막 실행의 위젯 → fragment 매핑을 보관
+_rerun_scope = threading.local()
+
+
+def _rss_bytes():
+    """현재 프로세스의 RSS를 반환합니다. (/proc이 없으면 최대 RSS)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def _make_document(session_id, index, size_kb):
+    lines = [f"# 세션 {session_id} 문서 {index}", ""]
+    paragraph = f"세션 {session_id}의 {index}번째 문서 문단입니다. 분기 매출과 고객 지표를 설명합니다. "
+    while sum(len(line) for line in lines) < size_kb * 1024:
+        lines.append(paragraph * 4)
+        lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+def _share_test_runtime():
+    """AppTest가 실행마다 교체/해제하는 전역 Runtime 대신 공유 Runtime을 쓰도록 합니다.
+
+    AppTest는 run()마다 Runtime._instance를 자기 mock으로 바꾸고 끝나면 None으로
+    되돌리므로, 여러 세션을 동시에 실행하면 다른 세션의 스크립트가 Runtime 없이
+    실행됩니다. 비어 있을 때는 공유 mock을 돌려주도록 해 Streamlit 서버처럼 한
+    프로세스의 Runtime을 모든 세션이 함께 쓰게 합니다. 스크립트 바이트코드 캐시도
+    서버처럼 공유해 rerun마다 app.py를 다시 컴파일하지 않도록 합니다.
+    run()마다 켰다 되돌리는 global.appTest 설정도 미리 켜 두어, 먼저 끝난 세션이
+    다른 세션 실행 도중에 설정을 끄지 않도록 합니다.
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit import config as streamlit_config
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    shared_runtime = MagicMock(spec=Runtime)
+    shared_runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared_runtime.cache_storage_manager = MemoryCacheStorageManager()
+
+    Runtime.instance = classmethod(lambda cls: cls._instance or shared_runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    streamlit_config.set_option("global.appTest", True)
+
+    shared_script_cache = ScriptCache()
+    app_test.ScriptCache = lambda: shared_script_cache
+    local_script_runner.ScriptCache = lambda: shared_script_cache
+
+
+def _enable_fragment_reruns():
+    """AppTest rerun을 조작한 위젯이 속한 fragment로 한정할 수 있게 합니다.
+
+    브라우저는 fragment 안의 위젯을 조작하면 해당 fragment id만 담아 rerun을
+    요청합니다. 실행마다 전송된 delta에서 위젯 id → fragment id를 기록해 두고,
+    다음 rerun 요청(RerunData)에 그 fragment id를 넣습니다. fragment rerun 후의
+    요소 트리에는 해당 fragment 요소만 남습니다.
+    """
+    from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+    from streamlit.testing.v1 import local_script_runner
+
+    def scoped_rerun_data(**kwargs):
+        return RerunData(fragment_id=getattr(_rerun_scope, "fragment_id", None), **kwargs)
+
+    original_run = local_script_runner.LocalScriptRunner.run
+
+    def run(self, *args, **kwargs):
+        tree = original_run(self, *args, **kwargs)
+        widget_fragments = getattr(_rerun_scope, "widget_fragments", {})
+        for msg in self.forward_msgs():
+            if not msg.HasField("delta") or not msg.delta.HasField("new_element"):
+                continue
+            element_type = msg.delta.new_element.WhichOneof("type")
+            widget_id = getattr(getattr(msg.delta.new_element, element_type), "id", None)
+            if widget_id:
+                widget_fragments[widget_id] = msg.delta.fragment_id or None
+        _rerun_scope.widget_fragments = widget_fragments
+        return tree
+
+    local_script_runner.RerunData = scoped_rerun_data
+    local_script_runner.LocalScriptRunner.run = run
+
+
+class SessionRunner:
+    """AppTest 세션 하나의 시나리오를 실행하며 rerun 지연을 기록합니다."""
+
+    def __init__(self, session_id, client, args):
+        from streamlit.testing.v1 import AppTest
+
+        self.session_id = session_id
+        self.args = args
+        self.samples = []
+        self.errors = []
+        self.at = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+        self.at.session_state["client"] = client
+
+    def run(self, start_barrier):
+        _rerun_scope.widget_fragments = {}
+        start_barrier.wait()
+        try:
+            self._rerun("initial", self.at.run)
+            self._create_store()
+            self._upload_files()
+            for turn in range(self.args.turns):
+                question = f"세션 {self.session_id} 질문 {turn}: 문서 요약해줘"
+                chat_input = self.at.chat_input[0]
+                self._rerun("query", chat_input.set_value(question).run, widget=chat_input)
+        except Exception as e:
+            self.errors.append(f"{type(e).__name__}: {e}")
+
+    def _rerun(self, kind, action, widget=None):
+        _rerun_scope.fragment_id = None
+        if widget is not None and self.args.rerun_scope == "fragment":
+            _rerun_scope.fragment_id = _rerun_scope.widget_fragments.get(widget.id)
+
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        action()
+        # 프로세스 CPU 시간이므로 세션 1개일 때만 rerun 1회의 비용과 같음
+        self.samples.append((kind, time.perf_counter() - started, time.process_time() - cpu_started))
+        if self.at.exception:
+            self.errors.append(str(self.at.exception[0].value))
+
+    def _click(self, kind, label):
+        button = next(button for button in self.at.button if button.label == label)
+        self._rerun(kind, button.click().run, widget=button)
+
+    def _create_store(self):
+        self.at.text_input[0].set_value(f"Load Test {self.session_id}")
+        self._click("create_store", "🎯 Store 생성")
+
+    def _upload_files(self):
+        if not self.args.uploads:
+            return
+        uploader = next(
+            uploader for uploader in self.at.file_uploader
+            if uploader.label.startswith(UPLOAD_LABEL_PREFIX)
+        )
+        files = [
+            (f"session{self.session_id}_doc{index}.md", _make_document(self.session_id, index, self.args.file_kb),
+             "text/markdown")
+            for index in range(self.args.uploads)
+        ]
+        self._rerun("select_files", uploader.set_value(files).run, widget=uploader)
+        self._click("upload", "⬆️ 업로드 시작")
+
+
+def run_level(session_count, args):
+    """session_count개 세션을 동시에 실행하고 측정값을 반환합니다."""
+    from fake_gemini import FakeClient
+    from recorder import replay_client
+
+    def make_client(session_id):
+        if args.cassette:
+            return replay_client(args.cassette, latency_scale=args.latency_scale)
+        return FakeClient(latency_seconds=args.latency, seed=session_id)
+
+    start_barrier = threading.Barrier(session_count + 1)
+    runners = [
+        SessionRunner(session_id, make_client(session_id), args)
+        for session_id in range(session_count)
+    ]
+    threads = [threading.Thread(target=runner.run, args=(start_barrier,), daemon=True) for runner in runners]
+
+    rss_before = _rss_bytes()
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+    # 세션 객체가 아직 살아 있는 상태에서 측정해 세션 상태/기록 메모리를 포함
+    rss_after = _rss_bytes()
+
+    samples = [sample for runner in runners for sample in runner.samples]
+    latencies = sorted(duration for _, duration, _ in samples)
+    query_latencies = sorted(duration for kind, duration, _ in samples if kind == "query")
+    query_cpu = [cpu_seconds for kind, _, cpu_seconds in samples if kind == "query"]
+    errors = [error for runner in runners for error in runner.errors]
+    del runners
+
+    return {
+        "sessions": session_count,
+        "reruns": len(samples),
+        "throughput": len(samples) / wall if wall else 0.0,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "query_p95": _percentile(query_latencies, 95),
+        "query_cpu_ms": sum(query_cpu) / len(query_cpu) * 1000 if query_cpu else 0.0,
+        "cpu_per_session": cpu / session_count,
+        "mem_per_session_mb": max(0, rss_after - rss_before) / session_count / (1024 * 1024),
+        "errors": errors
+    }
+
+
+def find_saturation(results, factor):
+    """p95가 기준의 factor배를 넘거나 처리량 증가가 10% 미만이 되는 첫 세션 수를 찾습니다."""
+    baseline = results[0]
+    previous = baseline
+    for result in results[1:]:
+        if result["p95"] > baseline["p95"] * factor:
+            return result["sessions"], f"p95 {result['p95']:.2f}s > 기준 {baseline['p95']:.2f}s x {factor}"
+        if result["throughput"] < previous["throughput"] * 1.1:
+            return result["sessions"], (
+                f"처리량 {previous['throughput']:.1f} → {result['throughput']:.1f} rerun/s (증가 10% 미만)"
+            )
+        previous = result
+    return None, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 세션 부하 테스트")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--turns", type=int, default=10, help="세션당 질의 수")
+    parser.add_argument("--uploads", type=int, default=2, help="세션당 업로드 파일 수")
+    parser.add_argument("--file-kb", type=int, default=64, help="업로드 파일 크기(KB)")
+    parser.add_argument("--latency", type=float, default=0.3, help="가짜 API 평균 지연(초)")
+    parser.add_argument("--cassette", help="가짜 클라이언트 대신 재생할 녹화 카세트 (recorder.py)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="카세트 재생 지연 배율")
+    parser.add_argument("--saturation-factor", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="rerun 1회 최대 시간(초)")
+    parser.add_argument("--rerun-scope", choices=["fragment", "app"], default="fragment",
+                        help="fragment: 위젯이 속한 fragment만 rerun (브라우저와 같음), app: 항상 전체 rerun")
+    args = parser.parse_args()
+
+    from config import PRECOMPUTE_CONFIG, REQUEST_CONTROL_CONFIG, SHARED_STATE_CONFIG
+
+    _share_test_runtime()
+    _enable_fragment_reruns()
+
+    # 업로드 완료 폴링 간격을 가짜 지연에 맞추고, 공유 요청 한도는 끔
+    REQUEST_CONTROL_CONFIG["poll_interval_seconds"] = max(0.05, args.latency)
+    SHARED_STATE_CONFIG["rate_limit_requests_per_minute"] = 0
+    # 업로드 후 백그라운드 사전 계산 질의가 질의 rerun CPU 측정에 섞이지 않도록 끔
+    PRECOMPUTE_CONFIG["enabled"] = False
+
+    # Store 통계 등 .cache 파일이 저장소를 더럽히지 않도록 임시 폴더에서 실행
+    workdir = tempfile.mkdtemp(prefix="gfs-load-")
+    os.chdir(workdir)
+    devnull = open(os.devnull, "w")
+
+    print(
+        f"{'sessions':>8} {'reruns':>7} {'rerun/s':>8} {'p50(s)':>7} {'p95(s)':>7} {'p99(s)':>7} "
+        f"{'q_p95(s)':>8} {'q_cpu(ms)':>9} {'cpu/sess(s)':>11} {'mem/sess(MB)':>12} {'errors':>6}"
+    )
+    results = []
+    try:
+        # 모듈 import, 스크립트 컴파일 비용이 첫 측정에 섞이지 않도록 한 번 실행하고 버림
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            run_level(1, args)
+        finally:
+            sys.stdout = stdout
+
+        for session_count in args.sessions:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                result = run_level(session_count, args)
+            finally:
+                sys.stdout = stdout
+            results.append(result)
+            print(
+                f"{result['sessions']:>8} {result['reruns']:>7} {result['throughput']:>8.2f} "
+                f"{result['p50']:>7.3f} {result['p95']:>7.3f} {result['p99']:>7.3f} {result['query_p95']:>8.3f} "
+                f"{result['query_cpu_ms']:>9.1f} {result['cpu_per_session']:>11.3f} {result['mem_per_session_mb']:>12.2f} {len(result['errors']):>6}",
+                flush=True
+            )
+            for error in result["errors"][:3]:
+                print(f"    ⚠️ {error}")
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    sessions, reason = find_saturation(results, args.saturation_factor)
+    if sessions:
+        print(f"\n📉 포화 시작: 동시 세션 {sessions}개 ({reason})")
+    else:
+        print("\n✅ 측정 범위 안에서 포화 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""멀티 워커 부하 테스트 (워커 수에 따른 처리량 비교)
+
+워커 프로세스마다 app.py를 AppTest로 실행하고, 가짜 Gemini 클라이언트로
+채팅 질의를 반복합니다. 모든 워커는 SQLite(WAL) 공유 상태를 함께 사용하며,
+임시 폴더에서 실행되어 저장소에 파일을 남기지 않습니다.
+
+워커 프로세스 사이의 공유 상태 확장성만 측정합니다. service.sh가 띄우는 nginx
+ip_hash 고정 세션 배포(HTTP/WebSocket 프록시, Streamlit 서버)는 거치지 않습니다.
+
+사용법:
+    uv run python benchmarks/load_test_workers.py --workers 1 2 4 --duration 20
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Store:
+    name = "fileSearchStores/loadtest"
+    display_name = "Load Test"
+
+
+def _worker(worker_id, workdir, duration, latency, sessions, turns, start_barrier, result_queue):
+    sys.stdout = open(os.devnull, "w")
+    # Store 통계, 추출 캐시 등 .cache 파일이 저장소를 더럽히지 않도록 임시 폴더에서 실행
+    os.chdir(workdir)
+    os.environ["GFS_SHARED_STATE_BACKEND"] = "sqlite"
+    os.environ["GFS_SHARED_STATE_PATH"] = os.path.join(workdir, "shared_state.db")
+
+    from streamlit.testing.v1 import AppTest
+
+    from config import SHARED_STATE_CONFIG
+    from fake_gemini import FakeClient
+
+    # 처리량 측정이 목적이므로 공유 요청 한도는 끔
+    SHARED_STATE_CONFIG["rate_limit_requests_per_minute"] = 0
+
+    client = FakeClient(latency_seconds=latency, seed=worker_id)
+    app_path = os.path.join(ROOT, "app.py")
+    queries = 0
+    latencies = []
+
+    # import/초기화 시간을 제외하고 모든 워커가 동시에 측정을 시작
+    start_barrier.wait()
+    started_at = time.perf_counter()
+    deadline = started_at + duration
+
+    while time.perf_counter() < deadline:
+        for _ in range(sessions):
+            at = AppTest.from_file(app_path, default_timeout=60)
+            at.session_state["client"] = client
+            at.session_state["store"] = _Store()
+            at.run()
+            for _ in range(turns):
+                if time.perf_counter() >= deadline:
+                    break
+                started = time.perf_counter()
+                # 매번 다른 질문으로 답변 캐시 적중을 피함
+                at.chat_input[0].set_value(f"질문 {uuid.uuid4().hex[:8]}").run()
+                latencies.append(time.perf_counter() - started)
+                queries += 1
+
+    result_queue.put((queries, time.perf_counter() - started_at, latencies))
+
+
+def run(worker_count, duration, latency, sessions, turns):
+    with tempfile.TemporaryDirectory(prefix="gfs-workers-") as tmp:
+        ctx = multiprocessing.get_context("spawn")
+        result_queue = ctx.Queue()
+        start_barrier = ctx.Barrier(worker_count)
+        processes = [
+            ctx.Process(
+                target=_worker,
+                args=(i, tmp, duration, latency, sessions, turns, start_barrier, result_queue)
+            )
+            for i in range(worker_count)
+        ]
+        for process in processes:
+            process.start()
+        results = [result_queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    queries = sum(count for count, _, _ in results)
+    elapsed = max(worker_elapsed for _, worker_elapsed, _ in results)
+    latencies = sorted(value for _, _, samples in results for value in samples)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    return queries, queries / elapsed, p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description="멀티 워커 처리량 부하 테스트")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=20.0, help="워커당 측정 시간(초)")
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 API 평균 지연(초)")
+    parser.add_argument("--sessions", type=int, default=1, help="반복당 새 세션 수")
+    parser.add_argument("--turns", type=int, default=5, help="세션당 질의 수")
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'queries':>8} {'q/s':>8} {'p95(s)':>8} {'scale':>6}")
+    baseline = None
+    for worker_count in args.workers:
+        queries, throughput, p95 = run(worker_count, args.duration, args.latency, args.sessions, args.turns)
+        baseline = baseline or throughput
+        print(f"{worker_count:>8} {queries:>8} {throughput:>8.2f} {p95:>8.3f} {throughput / baseline:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
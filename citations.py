@@ -0,0 +1,83 @@
+"""답변 본문 인라인 출처 표시 함수들
+
+grounding_supports의 segment 위치(UTF-8 바이트 오프셋)를 끝 위치 기준으로 한 번
+정렬해 삽입 지점 인덱스를 만들고, 답변을 한 번만 훑으면서 각주 번호를 끼워 넣습니다.
+"""
+
+
+def build_citation_index(supports, answer_length):
+    """(끝 오프셋, 청크 번호 목록) 삽입 지점을 끝 오프셋 순으로 정렬해 반환합니다.
+
+    같은 위치에서 끝나는 support는 하나로 합치고, 청크 번호는 1부터 시작합니다.
+    """
+    markers = {}
+    for support in supports:
+        end_index = support.get("segment", {}).get("end_index")
+        chunk_indices = support.get("chunk_indices")
+        if end_index is None or not chunk_indices:
+            continue
+        position = min(max(int(end_index), 0), answer_length)
+        numbers = markers.setdefault(position, [])
+        for chunk_index in chunk_indices:
+            number = chunk_index + 1
+            if number not in numbers:
+                numbers.append(number)
+    return sorted((position, sorted(numbers)) for position, numbers in markers.items())
+
+
+def annotate_answer(answer, supports):
+    """답변에 `[1, 2]` 형식의 각주 표시를 삽입하고, (본문, 참조된 청크 번호 목록)을 반환합니다."""
+    if not answer or not supports:
+        return answer, []
+
+    encoded = answer.encode("utf-8")
+    index = build_citation_index(supports, len(encoded))
+    if not index:
+        return answer, []
+
+    pieces = []
+    referenced = []
+    seen = set()
+    cursor = 0
+    for position, numbers in index:
+        # 멀티바이트 문자 중간이면 다음 문자 경계로 이동
+        while position < len(encoded) and (encoded[position] & 0xC0) == 0x80:
+            position += 1
+        if position < cursor:
+            position = cursor
+        pieces.append(encoded[cursor:position].decode("utf-8"))
+        pieces.append(" \\[" + ", ".join(str(number) for number in numbers) + "\\]")
+        cursor = position
+        for number in numbers:
+            if number not in seen:
+                seen.add(number)
+                referenced.append(number)
+    pieces.append(encoded[cursor:].decode("utf-8"))
+    return "".join(pieces), referenced
+
+
+def build_footnotes(referenced, grounding_chunks, max_text_length=120):
+    """참조된 청크 번호로 (번호, 제목, 발췌) 각주 목록을 만듭니다."""
+    chunks_by_number = {chunk["index"]: chunk for chunk in grounding_chunks}
+    footnotes = []
+    for number in sorted(referenced):
+        chunk = chunks_by_number.get(number)
+        if not chunk:
+            continue
+        ctx = chunk.get("retrieved_context", {})
+        title = ctx.get("source_file") or ctx.get("title") or "출처"
+        if ctx.get("part"):
+            title = f"{title} (파트 {ctx['part']})"
+        text = " ".join((ctx.get("text") or "").split())
+        if len(text) > max_text_length:
+            text = text[:max_text_length] + "..."
+        footnotes.append((number, title, text))
+    return footnotes
+
+
+def prepare_inline_citations(answer, debug_info):
+    """답변 하나에 대해 인라인 출처 본문과 각주를 한 번만 계산합니다."""
+    if not debug_info:
+        return answer, []
+    annotated, referenced = annotate_answer(answer, debug_info.get("grounding_supports", []))
+    return annotated, build_footnotes(referenced, debug_info.get("grounding_chunks", []))
@@ -32,7 +32,8 @@ CHUNKING_CONFIG = {
 # Gemini 모델 설정
 MODEL_CONFIG = {
     "model_name": "gemini-2.5-flash",
-    "temperature": 0.2
+    "temperature": 0.2,
+    "debug_logging": False  # True면 질의마다 grounding 요약을 콘솔에 출력
 }
 
 # 파일 업로드 설정
@@ -40,3 +41,111 @@ UPLOAD_CONFIG = {
     "accepted_types": ["pdf", "txt", "docx", "md", "csv"],
     "text_extensions": ['.txt', '.md', '.csv', '.json', '.xml', '.html']
 }
+
+# 대용량 파일 분할 설정
+SPLIT_CONFIG = {
+    "enabled": True,
+    "max_part_bytes": 4 * 1024 * 1024,
+    "pdf_max_pages_per_part": 50,
+    "max_parallel_uploads": 4,  # 파일 하나가 동시에 올리는 파트 수 (전체 상한은 max_upload_workers)
+    "splittable_extensions": [".txt", ".md", ".csv", ".pdf"]
+}
+
+# 로컬 텍스트 추출 설정 (DOCX/PDF)
+EXTRACTION_CONFIG = {
+    "enabled": True,
+    "upload_extracted_text": False,
+    "min_characters_per_page": 50,  # 이보다 적으면 스캔/이미지 문서로 보고 원본을 업로드
+    "extensions": [".docx", ".pdf"],
+    "cache_dir": ".cache/extracted"
+}
+
+# 멀티턴 대화 컨텍스트 설정
+CONVERSATION_CONFIG = {
+    "enabled": True,
+    "max_history_tokens": 2000,
+    "max_summary_tokens": 400,
+    "summary_model_name": "gemini-2.5-flash"
+}
+
+# Store 통계 설정
+STATS_CONFIG = {
+    "dir": ".cache/stores",
+    "max_latency_samples": 1000,
+    "save_interval_seconds": 30  # 통계 파일 스냅샷 최소 간격 (질의마다 전체를 쓰지 않도록)
+}
+
+# 세션 내보내기/불러오기 설정
+SESSION_IO_CONFIG = {
+    "file_extension": "gfss",
+    "compression_level": 6
+}
+
+# Store 활성화 시 워밍업 설정
+WARMUP_CONFIG = {
+    "enabled": True,
+    "prime_model": False,
+    "max_documents": 1000
+}
+
+# 요청 마감 시간/취소/헤지 설정
+REQUEST_CONTROL_CONFIG = {
+    "upload_timeout_seconds": 900,
+    "query_timeout_seconds": 120,
+    "summary_timeout_seconds": 30,
+    "background_timeout_seconds": 60,
+    "poll_interval_seconds": 2,
+    "heartbeat_interval_seconds": 0.5,
+    "hedge_enabled": True,
+    "hedge_min_samples": 20,
+    "hedge_max_extra_ratio": 0.1,
+    "max_upload_workers": 4,
+    "max_query_workers": 8,
+    "max_background_workers": 2
+}
+
+# 멀티 워커 공유 상태 설정 (backend: "memory" 또는 "sqlite")
+SHARED_STATE_CONFIG = {
+    "backend": "memory",
+    "sqlite_path": ".cache/shared_state.db",
+    "answer_cache_ttl_seconds": 24 * 60 * 60,
+    "answer_cache_max_entries": 5000,
+    "purge_interval_seconds": 60,
+    "rate_limit_requests_per_minute": 60
+}
+
+# 디렉터리 동기화 설정
+SYNC_CONFIG = {
+    "manifest_dir": ".cache/sync",
+    "max_parallel_files": 4,
+    "manifest_save_every": 50,
+    "ignore_hidden": True,
+    "watch_debounce_seconds": 2.0,
+    "watch_poll_interval_seconds": 30,
+    "rate_limit_wait_seconds": 1.0
+}
+
+# API 호출 기록/재생 설정 (mode: None, "record" 또는 "replay")
+RECORDER_CONFIG = {
+    "mode": None,
+    "cassette_path": ".cache/cassettes/session.jsonl",
+    "latency_scale": 1.0
+}
+
+# 업로드 후 자주 묻는 질문 답변 사전 계산 설정 (업로드마다 질문 수만큼 모델 호출 비용이 생기므로 기본 꺼짐)
+PRECOMPUTE_CONFIG = {
+    "enabled": False,
+    "questions": [
+        "이 문서의 주요 내용을 요약해주세요",
+        "문서에서 중요한 숫자나 통계가 있나요?",
+        "이 문서의 핵심 키워드는 무엇인가요?"
+    ],
+    "max_parallel": 2,
+    "claim_ttl_seconds": 600
+}
+
+# 문서 메타데이터 태그 설정
+TAGGING_CONFIG = {
+    "enabled": True,
+    "max_labels": 10
+}
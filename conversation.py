@@ -0,0 +1,108 @@
+"""멀티턴 대화 컨텍스트 관리 함수들
+
+최근 대화는 토큰 예산 안에서 그대로 재전송하고, 예산을 벗어난 오래된 대화는
+롤링 요약으로 압축합니다. 요약은 세션별 캐시에 보관되어 대화 창이 밀려날 때만
+새로 생성됩니다. 검색된 청크 텍스트(debug_info, citations)는 재전송하지 않습니다.
+"""
+
+from google.genai import types
+
+from config import CONVERSATION_CONFIG
+
+
+def estimate_tokens(text):
+    """문자 수 기반 토큰 추정치 (업로드 통계와 같은 기준)"""
+    return len(text) // 4
+
+
+def new_summary_cache():
+    """롤링 요약 캐시를 생성합니다."""
+    return {"summarized_turns": 0, "summary": ""}
+
+
+def build_conversation(client, chat_history, question, summary_cache, summarize):
+    """이전 대화로 (contents, 요약 지시문)을 구성합니다.
+
+    summarize(client, previous_summary, turns)는 (요약, 오류)를 반환하는 함수입니다.
+    """
+    if not CONVERSATION_CONFIG["enabled"] or not chat_history:
+        return question, None
+
+    budget = CONVERSATION_CONFIG["max_history_tokens"] - estimate_tokens(question)
+    if summary_cache["summary"]:
+        budget -= estimate_tokens(summary_cache["summary"])
+
+    window_start = _window_start(chat_history, summary_cache["summarized_turns"], budget)
+
+    # 요약이 매 턴 발생하지 않도록, 밀려날 때는 예산의 절반까지 한 번에 비움
+    if window_start > summary_cache["summarized_turns"]:
+        window_start = _window_start(chat_history, summary_cache["summarized_turns"], budget // 2)
+
+    # 창에서 밀려난 대화를 기존 요약에 이어서 압축
+    if window_start > summary_cache["summarized_turns"]:
+        evicted = chat_history[summary_cache["summarized_turns"]:window_start]
+        new_summary, error = summarize(client, summary_cache["summary"], evicted)
+        if error or not new_summary:
+            new_summary = _fallback_summary(summary_cache["summary"], evicted)
+        summary_cache["summary"] = _truncate_tokens(new_summary, CONVERSATION_CONFIG["max_summary_tokens"])
+        summary_cache["summarized_turns"] = window_start
+
+    contents = []
+    for chat in chat_history[summary_cache["summarized_turns"]:]:
+        contents.append(types.Content(role="user", parts=[types.Part(text=chat["question"])]))
+        contents.append(types.Content(role="model", parts=[types.Part(text=chat["answer"])]))
+    contents.append(types.Content(role="user", parts=[types.Part(text=question)]))
+
+    system_instruction = None
+    if summary_cache["summary"]:
+        system_instruction = f"지금까지의 대화 요약:\n{summary_cache['summary']}"
+
+    return contents, system_instruction
+
+
+def conversation_fingerprint(contents, system_instruction):
+    """답변 캐시 키에 쓸 대화 맥락 문자열을 만듭니다. (마지막 질문 제외)"""
+    if not isinstance(contents, list):
+        return system_instruction or ""
+    history = [
+        f"{content.role}:{part.text}"
+        for content in contents[:-1]
+        for part in content.parts
+    ]
+    return "\n".join([system_instruction or ""] + history)
+
+
+def format_turns(turns):
+    """요약 요청용으로 대화를 텍스트로 변환합니다."""
+    return "\n".join(f"사용자: {chat['question']}\n어시스턴트: {chat['answer']}" for chat in turns)
+
+
+def _window_start(chat_history, first_unsummarized, budget):
+    """최신 대화부터 예산 안에 들어가는 첫 대화의 인덱스를 반환합니다."""
+    window_start = len(chat_history)
+    for idx in range(len(chat_history) - 1, first_unsummarized - 1, -1):
+        cost = _turn_tokens(chat_history[idx])
+        if cost > budget:
+            break
+        budget -= cost
+        window_start = idx
+    return window_start
+
+
+def _turn_tokens(chat):
+    return estimate_tokens(chat["question"]) + estimate_tokens(chat["answer"])
+
+
+def _truncate_tokens(text, max_tokens):
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return "…" + text[-(max_chars - 1):]
+
+
+def _fallback_summary(previous_summary, turns):
+    """요약 API 실패 시 질문 위주로 간단히 압축합니다."""
+    lines = [previous_summary] if previous_summary else []
+    for chat in turns:
+        lines.append(f"- 질문: {chat['question'][:200]} / 답변 요지: {chat['answer'][:200]}")
+    return "\n".join(lines)
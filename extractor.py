@@ -0,0 +1,184 @@
+"""DOCX/PDF 로컬 텍스트 추출 함수들
+
+추출 결과는 파일 내용의 SHA-256 해시를 키로 디스크에 캐시되므로 같은 파일을
+다시 올릴 때는 파싱을 건너뜁니다.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import zipfile
+from xml.etree import ElementTree
+
+from config import EXTRACTION_CONFIG
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+PAGE_MARKER = re.compile(r"<!-- page \d+ -->")
+
+
+def content_hash(data):
+    """파일 내용의 SHA-256 해시를 반환합니다."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def has_enough_text(text):
+    """추출된 텍스트가 원본을 대신할 만큼 있는지 확인합니다.
+
+    스캔/이미지 PDF는 페이지 표시만 있고 글자가 거의 없으므로, 페이지 표시와 공백을 뺀
+    글자 수가 페이지당 min_characters_per_page보다 적으면 False를 반환합니다.
+    """
+    pages = max(1, len(PAGE_MARKER.findall(text)))
+    characters = len(re.sub(r"\s", "", PAGE_MARKER.sub("", text)))
+    return characters >= EXTRACTION_CONFIG["min_characters_per_page"] * pages
+
+
+def warm_up():
+    """첫 업로드가 기다리지 않도록 추출 캐시 디렉터리를 만들고 PDF 파서를 미리 불러옵니다."""
+    if not EXTRACTION_CONFIG["enabled"]:
+        return
+    os.makedirs(EXTRACTION_CONFIG["cache_dir"], exist_ok=True)
+    if ".pdf" in EXTRACTION_CONFIG["extensions"]:
+        try:
+            import pypdf  # noqa: F401
+        except ImportError:
+            pass
+
+
+def extract_text(filename, data):
+    """지원 형식이면 (텍스트, 추출 정보)를, 아니면 (None, None)을 반환합니다."""
+    ext = os.path.splitext(filename)[1].lower()
+    if not EXTRACTION_CONFIG["enabled"] or ext not in EXTRACTION_CONFIG["extensions"]:
+        return None, None
+
+    digest = content_hash(data)
+    cached = _load_cached(digest)
+    if cached:
+        cached["info"]["cached"] = True
+        return cached["text"], cached["info"]
+
+    if ext == ".docx":
+        text, method = _extract_docx(data), "docx-xml"
+    else:
+        text, method = _extract_pdf(data), "pypdf"
+
+    if text is None:
+        return None, None
+
+    info = {
+        "method": method,
+        "content_hash": digest,
+        "extracted_bytes": len(text.encode("utf-8")),
+        "cached": False
+    }
+    _store_cached(digest, text, info)
+    return text, info
+
+
+def _cache_path(digest):
+    return os.path.join(EXTRACTION_CONFIG["cache_dir"], f"{digest}.json")
+
+
+def _load_cached(digest):
+    path = _cache_path(digest)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cached(digest, text, info):
+    path = _cache_path(digest)
+    temp_path = None
+    try:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # 같은 내용의 파일을 동시에 올려도 임시 파일이 겹치지 않도록 고유한 이름 사용
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f"{digest}.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"text": text, "info": info}, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except OSError:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _extract_docx(data):
+    """DOCX 본문을 Markdown으로 변환합니다. (헤딩, 목록, 표 지원)"""
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            document = archive.read("word/document.xml")
+    except (zipfile.BadZipFile, KeyError):
+        return None
+
+    body = ElementTree.fromstring(document).find(f"{WORD_NAMESPACE}body")
+    if body is None:
+        return None
+
+    lines = []
+    for element in body:
+        if element.tag == f"{WORD_NAMESPACE}p":
+            line = _docx_paragraph(element)
+            if line:
+                lines.append(line)
+        elif element.tag == f"{WORD_NAMESPACE}tbl":
+            lines.extend(_docx_table(element))
+    return "\n\n".join(lines)
+
+
+def _docx_text(element):
+    return "".join(node.text or "" for node in element.iter(f"{WORD_NAMESPACE}t"))
+
+
+def _docx_paragraph(paragraph):
+    text = _docx_text(paragraph).strip()
+    if not text:
+        return ""
+
+    style = paragraph.find(f"{WORD_NAMESPACE}pPr/{WORD_NAMESPACE}pStyle")
+    style_name = style.get(f"{WORD_NAMESPACE}val", "") if style is not None else ""
+
+    if style_name.lower().startswith("heading"):
+        level = style_name[len("heading"):].strip()
+        depth = int(level) if level.isdigit() else 1
+        return f"{'#' * min(depth, 6)} {text}"
+    if style_name.lower() == "title":
+        return f"# {text}"
+    if paragraph.find(f"{WORD_NAMESPACE}pPr/{WORD_NAMESPACE}numPr") is not None:
+        return f"- {text}"
+    return text
+
+
+def _docx_table(table):
+    rows = []
+    for row in table.iter(f"{WORD_NAMESPACE}tr"):
+        cells = [_docx_text(cell).strip().replace("|", "\\|") for cell in row.iter(f"{WORD_NAMESPACE}tc")]
+        rows.append("| " + " | ".join(cells) + " |")
+    if rows:
+        column_count = rows[0].count(" | ") + 1
+        rows.insert(1, "|" + " --- |" * column_count)
+    return ["\n".join(rows)] if rows else []
+
+
+def _extract_pdf(data):
+    """PDF 텍스트를 페이지별로 추출합니다. pypdf가 없으면 None을 반환합니다."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        pages = [page.extract_text() or "" for page in reader.pages]
+    except Exception:
+        return None
+
+    return "\n\n".join(
+        f"<!-- page {number} -->\n{text.strip()}"
+        for number, text in enumerate(pages, 1)
+    )
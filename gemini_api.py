@@ -4,19 +4,49 @@ import os
 import time
 import uuid
 from google import genai
-from google.genai import types
-from config import CHUNKING_CONFIG, MODEL_CONFIG, UPLOAD_CONFIG
+from google.genai import errors, types
+from config import (
+    CHUNKING_CONFIG,
+    MODEL_CONFIG,
+    UPLOAD_CONFIG,
+    SPLIT_CONFIG,
+    EXTRACTION_CONFIG,
+    CONVERSATION_CONFIG,
+    REQUEST_CONTROL_CONFIG,
+    TAGGING_CONFIG
+)
+from conversation import format_turns
+from request_control import (
+    DeadlineExceeded,
+    OperationCancelled,
+    call_with_deadline,
+    new_deadline,
+    submit,
+    wait_for
+)
+from splitter import FilePart, split_file
+from extractor import content_hash, extract_text, has_enough_text
+from models import QueryResult, UploadResult
+from recorder import get_recorder_settings, recording_client, replay_client
+from tagging import build_tags, from_custom_metadata, to_custom_metadata
 
 
 def initialize_client():
     """환경 변수에서 API 키를 로드하고 클라이언트를 초기화합니다."""
     try:
+        record_mode, cassette_path, latency_scale = get_recorder_settings()
+        if record_mode == "replay":
+            # 카세트 재생은 네트워크와 API 키 없이 동작
+            return replay_client(cassette_path, latency_scale=latency_scale), None
+
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             return None, "GEMINI_API_KEY가 .env 파일에 설정되지 않았습니다."
 
         os.environ["GEMINI_API_KEY"] = api_key
         client = genai.Client()
+        if record_mode == "record":
+            client = recording_client(client, cassette_path)
         return client, None
     except Exception as e:
         return None, str(e)
@@ -33,12 +63,262 @@ def create_store(client, store_name):
         return None, str(e)
 
 
-def upload_file(client, file, store_name):
-    """파일을 업로드하고 인덱싱합니다."""
+def get_store(client, store_name, deadline=None):
+    """이름으로 기존 File Search Store를 조회합니다. deadline이 있으면 HTTP 타임아웃도 그에 맞춥니다."""
+    try:
+        config = None
+        if deadline is not None:
+            deadline.check()
+            if deadline.remaining_ms() is not None:
+                config = {"http_options": {"timeout": deadline.remaining_ms()}}
+        store = client.file_search_stores.get(name=store_name, config=config)
+        return store, None
+    except Exception as e:
+        return None, str(e)
+
+
+def list_documents(client, store_name, limit=None, deadline=None):
+    """Store의 문서 목록을 조회합니다. (백그라운드 풀에서 마감 시간 안에 실행)"""
+    if deadline is None:
+        deadline = new_deadline(REQUEST_CONTROL_CONFIG["background_timeout_seconds"])
+
+    def list_all():
+        documents = []
+        for document in client.file_search_stores.documents.list(parent=store_name):
+            # 페이지를 넘길 때마다 호출이 일어나므로 포기한 뒤에는 더 가져오지 않음
+            deadline.check()
+            documents.append({
+                "name": document.name,
+                "display_name": document.display_name,
+                "size_bytes": document.size_bytes,
+                "state": str(document.state) if document.state else None,
+                "tags": from_custom_metadata(document.custom_metadata)
+            })
+            if limit and len(documents) >= limit:
+                break
+        return documents
+
+    try:
+        documents, _ = call_with_deadline(list_all, deadline, pool="background")
+        return documents, None
+    except Exception as e:
+        return None, str(e)
+
+
+def delete_document(client, document_name):
+    """Store에서 문서를 삭제합니다. (인덱싱된 청크 포함, 이미 없는 문서는 성공으로 처리)"""
+    try:
+        client.file_search_stores.documents.delete(name=document_name, config={"force": True})
+        return True, None
+    except errors.ClientError as e:
+        if e.code == 404:
+            return True, None
+        return False, str(e)
+    except Exception as e:
+        return False, str(e)
+
+
+def prime_model(client, deadline=None):
+    """최소 출력 요청으로 모델 호출 경로를 예열합니다."""
+    if deadline is None:
+        deadline = new_deadline(REQUEST_CONTROL_CONFIG["background_timeout_seconds"])
+
+    try:
+        config = types.GenerateContentConfig(
+            max_output_tokens=1,
+            temperature=0.0,
+            http_options=types.HttpOptions(timeout=deadline.remaining_ms())
+        )
+        call_with_deadline(
+            lambda: client.models.generate_content(
+                model=MODEL_CONFIG["model_name"],
+                contents="ping",
+                config=config
+            ),
+            deadline,
+            pool="background"
+        )
+        return True, None
+    except Exception as e:
+        return False, str(e)
+
+
+def upload_file(client, file, store_name, deadline=None, upload_batch=None, labels=None):
+    """파일을 업로드하고 인덱싱합니다.
+
+    DOCX/PDF는 로컬에서 텍스트를 추출해 정확한 통계를 계산하고, 설정된 경우 추출된
+    텍스트를 대신 업로드합니다. 대용량 파일은 파트로 나눠 병렬 업로드합니다.
+    업로드는 작업 스레드에서 실행되며, 호출 스레드는 deadline의 취소/마감 시간을
+    확인하면서 기다립니다. 모든 파트에 원본 파일 기준 태그(custom_metadata)를 붙입니다.
+    """
+    if deadline is None:
+        deadline = new_deadline(REQUEST_CONTROL_CONFIG["upload_timeout_seconds"])
+
+    try:
+        data = file.getbuffer().tobytes()
+    except Exception as e:
+        return False, None, f"파일 읽기 실패: {e}"
+
+    tags = None
+    if TAGGING_CONFIG["enabled"]:
+        tags = build_tags(
+            getattr(file, "display_name", file.name),
+            os.path.splitext(file.name)[1],
+            content_hash(data),
+            upload_batch=upload_batch,
+            labels=labels
+        )
+
+    try:
+        extracted_text, extraction_info = extract_text(file.name, data)
+    except Exception:
+        extracted_text, extraction_info = None, None
+
+    # 스캔/이미지 문서는 추출된 텍스트가 거의 없으므로 원본을 올려 서버에서 인덱싱하도록 함
+    text_sufficient = extracted_text is not None and has_enough_text(extracted_text)
+
+    payload = file
+    if text_sufficient and EXTRACTION_CONFIG["upload_extracted_text"]:
+        payload_name = os.path.splitext(file.name)[0] + ".md"
+        payload = FilePart(payload_name, extracted_text.encode("utf-8"), display_name=file.name)
+        data = payload.getbuffer().tobytes()
+
+    try:
+        parts = split_file(payload.name, data, display_name=getattr(payload, "display_name", file.name))
+    except Exception:
+        parts = []
+
+    try:
+        if parts:
+            success, file_metadata, error = _upload_parts(client, file, parts, store_name, deadline, tags)
+        else:
+            future = submit(_upload_single, client, payload, store_name, deadline, tags, pool="upload")
+            try:
+                wait_for([future], deadline)
+            except (DeadlineExceeded, OperationCancelled):
+                # 포기한 뒤에 업로드가 끝나면 남은 문서를 삭제
+                _discard_parts(client, [future])
+                raise
+            success, file_metadata, error = future.result()
+    except (DeadlineExceeded, OperationCancelled) as e:
+        return False, None, str(e)
+
+    if success and tags:
+        file_metadata["tags"] = tags
+
+    if success and extraction_info:
+        # 바이너리 추정치 대신 추출된 텍스트 기준 통계로 교체 (텍스트가 거의 없으면 추정치 유지)
+        if text_sufficient:
+            _apply_text_stats(file_metadata, extracted_text)
+        file_metadata["filename"] = file.name
+        file_metadata["file_size_bytes"] = file.size
+        file_metadata["file_size_mb"] = round(file.size / (1024 * 1024), 2)
+        file_metadata["file_type"] = os.path.splitext(file.name)[1]
+        file_metadata["extraction"] = dict(
+            extraction_info,
+            uploaded_as="text" if payload is not file else "original",
+            text_sufficient=text_sufficient
+        )
+
+    return success, file_metadata, error
+
+
+def _apply_text_stats(file_metadata, text):
+    """텍스트 기준 문자/단어/토큰/청크 수를 메타데이터에 기록합니다."""
+    file_metadata["character_count"] = len(text)
+    file_metadata["word_count"] = len(text.split())
+    file_metadata["estimated_tokens"] = len(text) // 4
+    file_metadata["estimated_chunks"] = max(1, file_metadata["estimated_tokens"] // CHUNKING_CONFIG["max_tokens_per_chunk"])
+
+
+def _upload_parts(client, file, parts, store_name, deadline, tags=None):
+    """파트들을 병렬 업로드하고 하나의 논리 문서 메타데이터로 묶습니다."""
+    start_time = time.time()
+    max_in_flight = max(1, SPLIT_CONFIG["max_parallel_uploads"])
+
+    # 공유 업로드 풀에서 실행해 세션/파일/동기화가 겹쳐도 전체 동시 업로드 수가
+    # max_upload_workers를 넘지 않게 하고, 파일 하나는 max_parallel_uploads개까지만 올림
+    futures = []
+    pending = set()
+    try:
+        for part in parts:
+            while len(pending) >= max_in_flight:
+                pending -= wait_for(pending, deadline)
+            future = submit(_upload_single, client, part, store_name, deadline, tags, pool="upload")
+            futures.append(future)
+            pending.add(future)
+        while pending:
+            pending -= wait_for(pending, deadline)
+    except BaseException:
+        # 마감/취소 시 시작하지 않은 파트는 취소하고, 이미 올라갔거나 나중에 끝나는 파트는 삭제
+        for future in futures:
+            future.cancel()
+        _discard_parts(client, futures)
+        raise
+    results = [future.result() for future in futures]
+
+    errors = [
+        f"{part.name}: {error}"
+        for part, (success, _, error) in zip(parts, results)
+        if not success
+    ]
+    if errors:
+        # 일부 파트만 남으면 검색에 반쪽 문서가 섞이므로 성공한 파트도 삭제
+        _discard_parts(client, futures)
+        return False, None, f"{len(errors)}/{len(parts)}개 파트 업로드 실패 - " + "; ".join(errors)
+
+    part_metadata = []
+    for part, (_, metadata, _) in zip(parts, results):
+        metadata["part_index"] = part.part_index
+        metadata["part_range"] = part.part_range
+        part_metadata.append(metadata)
+
+    file_metadata = {
+        "filename": getattr(file, "display_name", file.name),
+        "file_size_bytes": file.size,
+        "file_size_mb": round(file.size / (1024 * 1024), 2),
+        "file_type": os.path.splitext(file.name)[1],
+        "chunking_config": CHUNKING_CONFIG.copy(),
+        "part_count": len(parts),
+        "parts": part_metadata,
+        "document_names": [metadata["document_name"] for metadata in part_metadata if metadata.get("document_name")]
+    }
+
+    for key in ("character_count", "word_count", "estimated_tokens", "estimated_chunks"):
+        values = [metadata.get(key) for metadata in part_metadata]
+        if all(isinstance(value, int) for value in values):
+            file_metadata[key] = sum(values)
+        else:
+            file_metadata[key] = part_metadata[0].get(key, "N/A")
+
+    file_metadata["upload_duration_seconds"] = round(time.time() - start_time, 2)
+    return True, file_metadata, None
+
+
+def _discard_parts(client, futures):
+    """성공한 파트 문서를 Store에서 삭제합니다. 아직 실행 중인 파트는 끝나는 대로 삭제합니다."""
+    for future in futures:
+        future.add_done_callback(lambda future: _delete_part_document(client, future))
+
+
+def _delete_part_document(client, future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    success, metadata, _ = future.result()
+    document_name = metadata.get("document_name") if success else None
+    if document_name:
+        deleted, error = delete_document(client, document_name)
+        if not deleted:
+            print(f"⚠️ 파트 문서 삭제 실패 ({document_name}): {error}")
+
+
+def _upload_single(client, file, store_name, deadline, tags=None):
+    """단일 파일(또는 파트)을 업로드하고 인덱싱합니다."""
+    temp_file = None
     try:
         # 파일 메타데이터 수집
         file_metadata = {
-            "filename": file.name,
+            "filename": getattr(file, "display_name", file.name),
             "file_size_bytes": file.size,
             "file_size_mb": round(file.size / (1024 * 1024), 2),
             "file_type": os.path.splitext(file.name)[1],
@@ -70,52 +350,42 @@ def upload_file(client, file, store_name):
             file_metadata["estimated_tokens"] = file.size // 4
 
         # 파일 업로드
+        deadline.check()
         start_time = time.time()
+        upload_config = {
+            "display_name": getattr(file, "display_name", file.name),
+            "chunking_config": {
+                "white_space_config": {
+                    "max_tokens_per_chunk": CHUNKING_CONFIG["max_tokens_per_chunk"],
+                    "max_overlap_tokens": CHUNKING_CONFIG["max_overlap_tokens"]
+                }
+            }
+        }
+        if tags:
+            upload_config["custom_metadata"] = to_custom_metadata(tags)
+        if deadline.remaining_ms() is not None:
+            upload_config["http_options"] = {"timeout": deadline.remaining_ms()}
+
         operation = client.file_search_stores.upload_to_file_search_store(
             file=temp_file,
             file_search_store_name=store_name,
-            config={
-                "display_name": file.name,
-                "chunking_config": {
-                    "white_space_config": {
-                        "max_tokens_per_chunk": CHUNKING_CONFIG["max_tokens_per_chunk"],
-                        "max_overlap_tokens": CHUNKING_CONFIG["max_overlap_tokens"]
-                    }
-                }
-            }
+            config=upload_config
         )
 
-        # 업로드 완료 대기
+        # 업로드 완료 대기 (취소되면 즉시 중단, 마감 시간 초과 시 실패)
         while not operation.done:
-            time.sleep(2)
+            deadline.sleep(REQUEST_CONTROL_CONFIG["poll_interval_seconds"])
             operation = client.operations.get(operation)
 
         file_metadata["upload_duration_seconds"] = round(time.time() - start_time, 2)
 
-        # Operation 결과 메타데이터 수집
-        if hasattr(operation, 'result'):
-            result = operation.result
-            file_metadata["operation_result"] = {}
-            for attr in dir(result):
-                if not attr.startswith('_'):
-                    try:
-                        value = getattr(result, attr)
-                        if not callable(value):
-                            file_metadata["operation_result"][attr] = str(value)
-                    except:
-                        pass
-
-        if hasattr(operation, 'metadata'):
-            metadata = operation.metadata
-            file_metadata["operation_metadata"] = {}
-            for attr in dir(metadata):
-                if not attr.startswith('_'):
-                    try:
-                        value = getattr(metadata, attr)
-                        if not callable(value):
-                            file_metadata["operation_metadata"][attr] = str(value)
-                    except:
-                        pass
+        # Operation 결과 (문서 이름은 동기화 시 교체/삭제에 사용)
+        upload_result = UploadResult.from_operation(operation)
+        if upload_result.error:
+            return False, None, f"인덱싱 실패: {upload_result.error.get('message', upload_result.error)}"
+        file_metadata["operation"] = upload_result.to_dict()
+        if upload_result.document_name:
+            file_metadata["document_name"] = upload_result.document_name
 
         # 청크 개수 추정
         if isinstance(file_metadata["estimated_tokens"], int):
@@ -124,255 +394,96 @@ def upload_file(client, file, store_name):
         else:
             file_metadata["estimated_chunks"] = "N/A"
 
+        return True, file_metadata, None
+
+    except Exception as e:
+        return False, None, str(e)
+
+    finally:
         # 임시 파일 정리
-        if os.path.exists(temp_file):
+        if temp_file and os.path.exists(temp_file):
             os.remove(temp_file)
 
-        return True, file_metadata, None
 
+def summarize_conversation(client, previous_summary, turns, deadline=None):
+    """이전 요약과 새로 밀려난 대화를 합쳐 롤링 요약을 생성합니다."""
+    if deadline is None:
+        deadline = new_deadline(REQUEST_CONTROL_CONFIG["summary_timeout_seconds"])
+
+    try:
+        prompt = (
+            "다음 대화를 이후 질문의 맥락으로 쓸 수 있도록 핵심 주제, 언급된 대상, "
+            "결론 위주로 간결하게 한국어로 요약하세요.\n\n"
+        )
+        if previous_summary:
+            prompt += f"[기존 요약]\n{previous_summary}\n\n"
+        prompt += f"[새 대화]\n{format_turns(turns)}"
+
+        config = types.GenerateContentConfig(
+            temperature=0.0,
+            max_output_tokens=CONVERSATION_CONFIG["max_summary_tokens"],
+            http_options=types.HttpOptions(timeout=deadline.remaining_ms())
+        )
+        response, _ = call_with_deadline(
+            lambda: client.models.generate_content(
+                model=CONVERSATION_CONFIG["summary_model_name"],
+                contents=prompt,
+                config=config
+            ),
+            deadline
+        )
+        return response.text, None
     except Exception as e:
-        if 'temp_file' in locals() and os.path.exists(temp_file):
-            os.remove(temp_file)
-        return False, None, str(e)
+        return None, str(e)
 
 
-def query_store(client, question, store_name):
-    """Store에 질문하고 답변을 받습니다."""
+def query_store(client, question, store_name, contents=None, system_instruction=None,
+                deadline=None, hedge_after=None, metadata_filter=None):
+    """Store에 질문하고 답변을 받습니다.
+
+    contents에 이전 대화가 포함된 Content 목록을 넘기면 멀티턴으로 질의합니다.
+    metadata_filter를 넘기면 태그가 일치하는 문서에서만 검색합니다.
+    hedge_after(초) 안에 응답이 없으면 헤지 예산 안에서 같은 요청을 한 번 더 보냅니다.
+    """
+    if deadline is None:
+        deadline = new_deadline(REQUEST_CONTROL_CONFIG["query_timeout_seconds"])
+
     try:
-        response = client.models.generate_content(
-            model=MODEL_CONFIG["model_name"],
-            contents=question,
-            config=types.GenerateContentConfig(
-                tools=[
-                    types.Tool(
-                        file_search=types.FileSearch(
-                            file_search_store_names=[store_name]
-                        )
+        config = types.GenerateContentConfig(
+            tools=[
+                types.Tool(
+                    file_search=types.FileSearch(
+                        file_search_store_names=[store_name],
+                        metadata_filter=metadata_filter
                     )
-                ],
-                temperature=MODEL_CONFIG["temperature"]
-            )
+                )
+            ],
+            system_instruction=system_instruction,
+            temperature=MODEL_CONFIG["temperature"],
+            http_options=types.HttpOptions(timeout=deadline.remaining_ms())
         )
 
-        # 디버깅 정보 수집
-        debug_info = {
-            "has_grounding": False,
-            "grounding_chunks": [],
-            "grounding_supports": [],
-            "citations": [],
-            "raw_response_info": {}
-        }
+        response, hedged = call_with_deadline(
+            lambda: client.models.generate_content(
+                model=MODEL_CONFIG["model_name"],
+                contents=contents if contents is not None else question,
+                config=config
+            ),
+            deadline,
+            hedge_after=hedge_after
+        )
 
-        citations = []
-
-        # API 응답 구조 확인을 위한 로깅
-        print("\n" + "="*80)
-        print("🔍 Gemini API Response Debug")
-        print("="*80)
-
-        # response 객체의 모든 속성 확인
-        print("\n📦 Response 객체 속성:")
-        for attr in dir(response):
-            if not attr.startswith('_'):
-                try:
-                    value = getattr(response, attr)
-                    if not callable(value):
-                        print(f"  - {attr}: {type(value).__name__}")
-                except:
-                    pass
-
-        # automatic_function_calling_history 확인
-        if hasattr(response, 'automatic_function_calling_history') and response.automatic_function_calling_history:
-            print(f"\n📜 automatic_function_calling_history 발견! 개수: {len(response.automatic_function_calling_history)}")
-            for idx, history_item in enumerate(response.automatic_function_calling_history):
-                print(f"\n  History {idx}:")
-                for attr in dir(history_item):
-                    if not attr.startswith('_'):
-                        try:
-                            value = getattr(history_item, attr)
-                            if not callable(value):
-                                print(f"    - {attr}: {type(value).__name__}")
-                        except:
-                            pass
-
-        # parts 확인
-        if hasattr(response, 'parts') and response.parts:
-            print(f"\n📄 response.parts 발견! 개수: {len(response.parts)}")
-            for idx, part in enumerate(response.parts):
-                print(f"\n  Part {idx}:")
-                for attr in dir(part):
-                    if not attr.startswith('_'):
-                        try:
-                            value = getattr(part, attr)
-                            if not callable(value):
-                                print(f"    - {attr}: {type(value).__name__}")
-                        except:
-                            pass
-
-        # candidates 확인
-        grounding_metadata = None
-        if hasattr(response, 'candidates') and response.candidates:
-            print(f"\n✅ candidates 발견! 개수: {len(response.candidates)}")
-
-            for idx, candidate in enumerate(response.candidates):
-                print(f"\n  Candidate {idx}:")
-                for attr in dir(candidate):
-                    if not attr.startswith('_'):
-                        try:
-                            value = getattr(candidate, attr)
-                            if not callable(value):
-                                print(f"    - {attr}: {type(value).__name__}")
-                                if attr == "grounding_metadata" and value:
-                                    grounding_metadata = value
-                                    print(f"      ✅ grounding_metadata 발견!")
-                        except:
-                            pass
-
-                # candidate.content 확인
-                if hasattr(candidate, 'content') and candidate.content:
-                    print(f"\n  Candidate {idx} Content:")
-                    for attr in dir(candidate.content):
-                        if not attr.startswith('_'):
-                            try:
-                                value = getattr(candidate.content, attr)
-                                if not callable(value):
-                                    print(f"    - {attr}: {type(value).__name__}")
-                            except:
-                                pass
-
-        # grounding_metadata 처리 (response 직접 또는 candidates[0]에서)
-        if not grounding_metadata and hasattr(response, "grounding_metadata"):
-            grounding_metadata = response.grounding_metadata
-
-        if grounding_metadata:
-            debug_info["has_grounding"] = True
-            print("\n✅ grounding_metadata 존재!")
-            print(f"  타입: {type(grounding_metadata)}")
-
-            # grounding_metadata의 모든 속성 확인
-            print("\n📋 grounding_metadata 속성:")
-            for attr in dir(grounding_metadata):
-                if not attr.startswith('_'):
-                    try:
-                        value = getattr(grounding_metadata, attr)
-                        if not callable(value):
-                            print(f"  - {attr}: {type(value).__name__}")
-                            if hasattr(value, '__len__') and not isinstance(value, str):
-                                try:
-                                    print(f"    (길이: {len(value)})")
-                                except:
-                                    pass
-                    except:
-                        pass
-
-            # grounding_chunks 수집 및 citations로 변환
-            if hasattr(grounding_metadata, "grounding_chunks"):
-                chunks_list = grounding_metadata.grounding_chunks
-                print(f"\n📦 grounding_chunks 발견! 개수: {len(list(chunks_list)) if chunks_list else 0}")
-
-                for idx, chunk in enumerate(grounding_metadata.grounding_chunks, 1):
-                    print(f"\n  Chunk {idx}:")
-
-                    # chunk의 모든 속성 확인
-                    for attr in dir(chunk):
-                        if not attr.startswith('_'):
-                            try:
-                                value = getattr(chunk, attr)
-                                if not callable(value):
-                                    print(f"    - {attr}: {type(value).__name__}")
-                            except:
-                                pass
-                    chunk_data = {"index": idx}
-
-                    if hasattr(chunk, "web") and chunk.web:
-                        chunk_data["web"] = str(chunk.web)
-
-                    if hasattr(chunk, "retrieved_context") and chunk.retrieved_context:
-                        ctx = chunk.retrieved_context
-                        chunk_data["retrieved_context"] = {}
-                        citation_item = {}
-
-                        # retrieved_context의 모든 속성 확인
-                        print(f"\n    🔍 Retrieved Context {idx} 속성:")
-                        for attr in dir(ctx):
-                            if not attr.startswith('_'):
-                                try:
-                                    value = getattr(ctx, attr)
-                                    if not callable(value):
-                                        print(f"      - {attr}: {type(value).__name__} = {repr(value)[:100]}")
-                                except:
-                                    pass
-
-                        if hasattr(ctx, "title"):
-                            chunk_data["retrieved_context"]["title"] = ctx.title
-                            citation_item["title"] = ctx.title
-
-                        if hasattr(ctx, "uri"):
-                            chunk_data["retrieved_context"]["uri"] = ctx.uri
-                            citation_item["uri"] = ctx.uri
-                            citation_item["source"] = ctx.uri
-
-                        if hasattr(ctx, "text"):
-                            chunk_data["retrieved_context"]["text"] = ctx.text
-                            citation_item["text"] = ctx.text
-
-                        if citation_item:
-                            citations.append(citation_item)
-
-                    debug_info["grounding_chunks"].append(chunk_data)
-
-                print(f"\n✅ 총 {len(debug_info['grounding_chunks'])}개 chunks 수집 완료")
-            else:
-                print("\n❌ grounding_chunks 속성이 없습니다!")
-
-            # grounding_supports 수집
-            if hasattr(grounding_metadata, "grounding_supports"):
-                for idx, support in enumerate(grounding_metadata.grounding_supports, 1):
-                    support_data = {"index": idx}
-
-                    if hasattr(support, "segment"):
-                        seg = support.segment
-                        support_data["segment"] = {
-                            "text": getattr(seg, "text", ""),
-                            "start_index": getattr(seg, "start_index", None),
-                            "end_index": getattr(seg, "end_index", None)
-                        }
-
-                    if hasattr(support, "grounding_chunk_indices") and support.grounding_chunk_indices is not None:
-                        support_data["chunk_indices"] = list(support.grounding_chunk_indices)
-
-                    if hasattr(support, "confidence_scores") and support.confidence_scores is not None:
-                        support_data["confidence_scores"] = list(support.confidence_scores)
-
-                    debug_info["grounding_supports"].append(support_data)
-
-            # citations 수집
-            if hasattr(grounding_metadata, "citations"):
-                for idx, citation in enumerate(grounding_metadata.citations, 1):
-                    citation_data = {}
-                    for attr in dir(citation):
-                        if not attr.startswith('_'):
-                            try:
-                                value = getattr(citation, attr)
-                                if not callable(value):
-                                    citation_data[attr] = value
-                            except:
-                                pass
-                    citations.append(citation_data)
-                    debug_info["citations"].append(citation_data)
-        else:
-            print("\n❌ grounding_metadata가 없습니다!")
-            debug_info["raw_response_info"]["has_grounding_metadata"] = False
-
-        print("\n" + "="*80)
-        print(f"📊 최종 수집 결과:")
-        print(f"  - has_grounding: {debug_info['has_grounding']}")
-        print(f"  - grounding_chunks: {len(debug_info['grounding_chunks'])}개")
-        print(f"  - grounding_supports: {len(debug_info['grounding_supports'])}개")
-        print(f"  - citations: {len(debug_info['citations'])}개")
-        print("="*80 + "\n")
-
-        return response.text, citations, debug_info, None
+        result = QueryResult.from_response(response, hedged=hedged)
+        if MODEL_CONFIG["debug_logging"]:
+            print(
+                f"🔍 grounding={result.has_grounding} chunks={len(result.chunks)} "
+                f"supports={len(result.supports)} hedged={result.hedged}"
+            )
+
+        return result.answer, result.citations(), result.debug_info(), None
+
+    except (DeadlineExceeded, OperationCancelled) as e:
+        return None, None, None, str(e)
 
     except Exception as e:
         import traceback
@@ -0,0 +1,196 @@
+"""Gemini API 응답을 담는 타입 결과 모델
+
+SDK 응답 객체에서 필요한 필드만 직접 읽어 한 번에 채우는 __slots__ dataclass입니다.
+to_dict()는 채팅 기록, 답변 캐시, 세션 파일에 저장되는 기존 dict 형태를 그대로
+만들며, 값이 None인 필드는 키를 넣지 않습니다.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+from splitter import resolve_source
+
+
+def _without_none(data):
+    """값이 None인 키를 뺀 dict를 반환합니다."""
+    return {key: value for key, value in data.items() if value is not None}
+
+
+@dataclass
+class GroundingChunk:
+    """답변 생성에 참조된 문서 조각 (번호는 1부터)"""
+
+    __slots__ = ("index", "title", "uri", "text", "source_file", "part", "web")
+
+    index: int
+    title: Optional[str]
+    uri: Optional[str]
+    text: Optional[str]
+    source_file: Optional[str]
+    part: Optional[str]
+    web: Optional[str]
+
+    @classmethod
+    def from_response(cls, index, chunk):
+        ctx = chunk.retrieved_context
+        web = str(chunk.web) if chunk.web else None
+        if ctx is None:
+            return cls(index, None, None, None, None, None, web)
+
+        # 분할 업로드된 파트는 원본 파일로 매핑
+        source_file, part = resolve_source(ctx.title) if ctx.title else (None, None)
+        if not part:
+            source_file = None
+        return cls(index, ctx.title, ctx.uri, ctx.text, source_file, part, web)
+
+    @property
+    def has_context(self):
+        return self.title is not None or self.uri is not None or self.text is not None
+
+    def to_dict(self):
+        data = {"index": self.index}
+        if self.web is not None:
+            data["web"] = self.web
+        if self.has_context:
+            data["retrieved_context"] = _without_none({
+                "title": self.title,
+                "source_file": self.source_file if self.part else None,
+                "part": self.part,
+                "uri": self.uri,
+                "text": self.text
+            })
+        return data
+
+    def to_citation(self):
+        """출처 목록에 표시할 citation dict를 반환합니다."""
+        return _without_none({
+            "title": self.title,
+            "source_file": self.source_file if self.part else None,
+            "part": self.part,
+            "uri": self.uri,
+            "source": self.uri,
+            "text": self.text
+        })
+
+
+@dataclass
+class GroundingSupport:
+    """답변 구간(UTF-8 바이트 오프셋)과 그 근거가 된 청크 인덱스(0부터)"""
+
+    __slots__ = ("index", "text", "start_index", "end_index", "chunk_indices", "confidence_scores")
+
+    index: int
+    text: Optional[str]
+    start_index: Optional[int]
+    end_index: Optional[int]
+    chunk_indices: Optional[List[int]]
+    confidence_scores: Optional[List[float]]
+
+    @classmethod
+    def from_response(cls, index, support):
+        segment = support.segment
+        return cls(
+            index,
+            segment.text if segment else None,
+            segment.start_index if segment else None,
+            segment.end_index if segment else None,
+            list(support.grounding_chunk_indices) if support.grounding_chunk_indices is not None else None,
+            list(support.confidence_scores) if support.confidence_scores is not None else None
+        )
+
+    def to_dict(self):
+        data = {"index": self.index}
+        if self.text is not None or self.start_index is not None or self.end_index is not None:
+            data["segment"] = _without_none(
+                {"text": self.text, "start_index": self.start_index, "end_index": self.end_index}
+            )
+        if self.chunk_indices is not None:
+            data["chunk_indices"] = self.chunk_indices
+        if self.confidence_scores is not None:
+            data["confidence_scores"] = self.confidence_scores
+        return data
+
+
+@dataclass
+class QueryResult:
+    """질의 응답 한 건의 답변과 grounding 정보"""
+
+    __slots__ = ("answer", "has_grounding", "chunks", "supports", "hedged")
+
+    answer: Optional[str]
+    has_grounding: bool
+    chunks: List[GroundingChunk]
+    supports: List[GroundingSupport]
+    hedged: bool
+
+    @classmethod
+    def from_response(cls, response, hedged=False):
+        """generate_content 응답을 한 번 훑어 결과를 만듭니다."""
+        grounding_metadata = None
+        for candidate in response.candidates or ():
+            if candidate.grounding_metadata:
+                grounding_metadata = candidate.grounding_metadata
+                break
+
+        chunks = []
+        supports = []
+        if grounding_metadata:
+            chunks = [
+                GroundingChunk.from_response(idx, chunk)
+                for idx, chunk in enumerate(grounding_metadata.grounding_chunks or (), 1)
+            ]
+            supports = [
+                GroundingSupport.from_response(idx, support)
+                for idx, support in enumerate(grounding_metadata.grounding_supports or (), 1)
+            ]
+
+        return cls(response.text, grounding_metadata is not None, chunks, supports, hedged)
+
+    def citations(self):
+        """문서 출처가 있는 청크의 citation dict 목록을 반환합니다."""
+        return [chunk.to_citation() for chunk in self.chunks if chunk.has_context]
+
+    def debug_info(self):
+        """UI와 인라인 출처 표시에 쓰는 debug_info dict를 반환합니다."""
+        return {
+            "has_grounding": self.has_grounding,
+            "grounding_chunks": [chunk.to_dict() for chunk in self.chunks],
+            "grounding_supports": [support.to_dict() for support in self.supports],
+            "hedged": self.hedged
+        }
+
+    def to_dict(self):
+        return {"answer": self.answer, "citations": self.citations(), "debug_info": self.debug_info()}
+
+
+@dataclass
+class UploadResult:
+    """업로드 작업(Operation) 한 건의 결과"""
+
+    __slots__ = ("operation_name", "document_name", "done", "error", "metadata")
+
+    operation_name: Optional[str]
+    document_name: Optional[str]
+    done: bool
+    error: Optional[dict]
+    metadata: Optional[dict]
+
+    @classmethod
+    def from_operation(cls, operation):
+        response = operation.response
+        return cls(
+            operation.name,
+            response.document_name if response else None,
+            bool(operation.done),
+            operation.error,
+            operation.metadata
+        )
+
+    def to_dict(self):
+        data = _without_none({"operation_name": self.operation_name, "document_name": self.document_name})
+        data["done"] = self.done
+        if self.error:
+            data["error"] = self.error
+        if self.metadata:
+            data["metadata"] = self.metadata
+        return data
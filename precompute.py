@@ -0,0 +1,127 @@
+"""업로드 후 자주 묻는 질문의 답변 사전 계산
+
+업로드가 끝나 Store 버전이 바뀌면 별도 스레드에서 PRECOMPUTE_CONFIG의 질문들을
+미리 질의해 공유 답변 캐시에 넣어 둡니다. 캐시 키에 Store 버전이 들어가므로 이후
+업로드/삭제로 Store가 바뀌면 이전 답변은 자동으로 무효화됩니다. 여러 워커가 같은
+Store 버전을 동시에 계산하지 않도록 공유 상태에서 한 워커만 작업을 맡습니다.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import PRECOMPUTE_CONFIG
+from gemini_api import query_store
+from shared_state import (
+    answer_cache_key,
+    get_cached_answer,
+    get_store_version,
+    put_cached_answer,
+    try_acquire_request,
+    try_claim
+)
+
+
+def canned_questions():
+    """사전 계산 대상 질문 목록을 반환합니다."""
+    return PRECOMPUTE_CONFIG["questions"]
+
+
+def is_canned_question(question):
+    return question.strip() in canned_questions()
+
+
+def precompute_key(store_name, question):
+    """대화 맥락 없이(첫 질문으로) 물었을 때의 답변 캐시 키를 반환합니다."""
+    return answer_cache_key(store_name, question.strip(), "")
+
+
+def get_precomputed_answer(store_name, question):
+    """사전 계산 대상 질문이면 대화 맥락과 관계없이 캐시된 답변을 반환합니다."""
+    if not is_canned_question(question):
+        return None
+    return get_cached_answer(precompute_key(store_name, question))
+
+
+def ready_questions(store_name):
+    """현재 Store 버전에 대해 답변이 준비된 질문 목록을 반환합니다."""
+    return [
+        question for question in canned_questions()
+        if get_cached_answer(precompute_key(store_name, question))
+    ]
+
+
+def start_precompute(client, store_name):
+    """사전 계산 스레드를 시작하고 상태 딕셔너리를 반환합니다. 비활성화 시 None을 반환합니다."""
+    if not PRECOMPUTE_CONFIG["enabled"] or not canned_questions():
+        return None
+
+    status = _new_status(store_name)
+    thread = threading.Thread(
+        target=_run_precompute,
+        args=(client, store_name, status),
+        name=f"precompute-{store_name}",
+        daemon=True
+    )
+    thread.start()
+    return status
+
+
+def run_precompute(client, store_name):
+    """사전 계산을 현재 스레드에서 실행하고 상태 딕셔너리를 반환합니다. (CLI용)"""
+    status = _new_status(store_name)
+    _run_precompute(client, store_name, status)
+    return status
+
+
+def _new_status(store_name):
+    return {
+        "store_name": store_name,
+        "version": get_store_version(store_name),
+        "state": "running",
+        "questions": {question: "pending" for question in canned_questions()},
+        "errors": [],
+        "duration_seconds": None
+    }
+
+
+def _run_precompute(client, store_name, status):
+    start_time = time.perf_counter()
+
+    # 같은 Store 버전은 한 워커만 계산 (나머지는 캐시에 채워지는 답변을 사용)
+    if not try_claim(f"precompute:{store_name}:{status['version']}", PRECOMPUTE_CONFIG["claim_ttl_seconds"]):
+        status["state"] = "skipped"
+        status["duration_seconds"] = round(time.perf_counter() - start_time, 3)
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, PRECOMPUTE_CONFIG["max_parallel"])) as executor:
+        for question, result in zip(
+            canned_questions(),
+            executor.map(lambda question: _precompute_one(client, store_name, question, status), canned_questions())
+        ):
+            status["questions"][question] = result
+
+    status["duration_seconds"] = round(time.perf_counter() - start_time, 3)
+    status["state"] = "done"
+
+
+def _precompute_one(client, store_name, question, status):
+    # 계산 도중 Store가 바뀌면 이전 버전 답변은 쓸모가 없으므로 중단
+    if get_store_version(store_name) != status["version"]:
+        return "stale"
+
+    cache_key = precompute_key(store_name, question)
+    if get_cached_answer(cache_key):
+        return "cached"
+    if not try_acquire_request():
+        return "rate_limited"
+
+    answer, citations, debug_info, error = query_store(client, question, store_name)
+    if error:
+        status["errors"].append(error)
+        return "error"
+    if get_store_version(store_name) != status["version"]:
+        return "stale"
+
+    put_cached_answer(cache_key, answer, citations, debug_info, source="precompute")
+    return "done"
@@ -0,0 +1,267 @@
+"""API 호출 기록/재생 (카세트)
+
+녹화 모드에서는 실제 클라이언트를 감싸 generate_content, upload_to_file_search_store,
+operations.get (및 Store 생성/조회, 문서 목록/삭제) 호출의 요청 요약, 응답, 소요 시간을
+JSON Lines 카세트 파일에 기록합니다. 재생 모드에서는 네트워크 없이 카세트의 응답을 같은 순서로
+돌려주며, 기록된 지연 시간을 그대로 또는 배율을 적용해 재현합니다.
+
+환경 변수 GFS_RECORD_MODE(record/replay), GFS_CASSETTE, GFS_REPLAY_LATENCY_SCALE 또는
+RECORDER_CONFIG로 설정하면 initialize_client()가 자동으로 적용합니다.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from google.genai import types
+
+from config import RECORDER_CONFIG
+
+# 기록 대상 메서드 (클라이언트 기준 경로)
+RECORDED_METHODS = (
+    "models.generate_content",
+    "file_search_stores.upload_to_file_search_store",
+    "operations.get",
+    "file_search_stores.create",
+    "file_search_stores.get",
+    "file_search_stores.documents.list",
+    "file_search_stores.documents.delete"
+)
+
+# 페이지 단위로 지연 조회하는 Pager를 반환하는 메서드 (녹화 시 전체 목록으로 풀어서 기록)
+PAGED_METHODS = ("file_search_stores.documents.list",)
+
+# 위치 인자로도 호출되는 메서드의 인자 이름
+POSITIONAL_ARGS = {"operations.get": ("operation",)}
+
+
+class CassetteMiss(LookupError):
+    """재생 모드에서 요청에 해당하는 기록이 없을 때 발생합니다."""
+
+
+class ReplayedError(RuntimeError):
+    """녹화 당시 API가 발생시킨 에러를 재생할 때 발생합니다."""
+
+
+def get_recorder_settings():
+    """환경 변수가 설정 파일보다 우선하는 (mode, cassette_path, latency_scale)을 반환합니다."""
+    mode = os.getenv("GFS_RECORD_MODE", RECORDER_CONFIG["mode"] or "") or None
+    cassette_path = os.getenv("GFS_CASSETTE", RECORDER_CONFIG["cassette_path"])
+    latency_scale = float(os.getenv("GFS_REPLAY_LATENCY_SCALE", RECORDER_CONFIG["latency_scale"]))
+    return mode, cassette_path, latency_scale
+
+
+# ============================================================================
+# 요청 정규화
+# ============================================================================
+
+def _dump(value):
+    """SDK 모델/dict/리스트를 JSON 직렬화 가능한 값으로 바꿉니다. (http_options 제외)"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True, exclude={"http_options"})
+    if isinstance(value, dict):
+        return {key: _dump(item) for key, item in value.items() if key != "http_options" and item is not None}
+    if isinstance(value, (list, tuple)):
+        return [_dump(item) for item in value]
+    return value
+
+
+def _file_summary(file):
+    """업로드 파일 경로 대신 내용 해시와 크기를 기록합니다. (임시 파일 이름은 매번 다름)"""
+    if isinstance(file, str) and os.path.exists(file):
+        with open(file, "rb") as f:
+            data = f.read()
+        return {"extension": os.path.splitext(file)[1], "size": len(data),
+                "content_hash": hashlib.sha256(data).hexdigest()}
+    return {"file": str(file)}
+
+
+def summarize_request(method, kwargs):
+    """호출 인자를 비교 가능한 요청 요약 dict로 정규화합니다."""
+    if method == "models.generate_content":
+        return {"model": kwargs.get("model"), "contents": _dump(kwargs.get("contents")),
+                "config": _dump(kwargs.get("config"))}
+    if method == "file_search_stores.upload_to_file_search_store":
+        return {"store": kwargs.get("file_search_store_name"), "file": _file_summary(kwargs.get("file")),
+                "config": _dump(kwargs.get("config"))}
+    if method == "operations.get":
+        operation = kwargs.get("operation")
+        return {"operation": getattr(operation, "name", None)}
+    return _dump(kwargs)
+
+
+def _bind(method, args, kwargs):
+    """위치 인자를 키워드 인자로 바꿉니다."""
+    if args:
+        kwargs = dict(zip(POSITIONAL_ARGS.get(method, ()), args), **kwargs)
+    return kwargs
+
+
+def request_key(method, request):
+    encoded = json.dumps([method, request], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# 녹화
+# ============================================================================
+
+class CassetteWriter:
+    """상호작용을 한 줄씩 추가 기록합니다. (여러 스레드에서 호출 가능)"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def write(self, method, request, response, duration_seconds, error=None):
+        with self._lock:
+            self._sequence += 1
+            record = {
+                "sequence": self._sequence,
+                "method": method,
+                "key": request_key(method, request),
+                "request": request,
+                "duration_seconds": round(duration_seconds, 4),
+                "recorded_at": time.time()
+            }
+            if error is not None:
+                record["error"] = {"type": type(error).__name__, "message": str(error)}
+            elif isinstance(response, list):
+                record["response_type"] = type(response[0]).__name__ if response else None
+                record["response_list"] = True
+                record["response"] = _dump(response)
+            else:
+                # 응답이 없는 호출(문서 삭제 등)은 response_type을 None으로 기록
+                record["response_type"] = type(response).__name__ if response is not None else None
+                record["response"] = _dump(response)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class _RecordingProxy:
+    """하위 객체로 속성 접근을 넘기면서 기록 대상 메서드만 가로챕니다."""
+
+    def __init__(self, target, prefix, writer):
+        self._target = target
+        self._prefix = prefix
+        self._writer = writer
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        path = f"{self._prefix}{name}"
+        if path in RECORDED_METHODS:
+            return self._wrap(path, value)
+        if any(method.startswith(f"{path}.") for method in RECORDED_METHODS):
+            return _RecordingProxy(value, f"{path}.", self._writer)
+        return value
+
+    def _wrap(self, method, func):
+        def recorded(*args, **kwargs):
+            request = summarize_request(method, _bind(method, args, kwargs))
+            start_time = time.perf_counter()
+            try:
+                response = func(*args, **kwargs)
+                if method in PAGED_METHODS:
+                    response = list(response)
+            except Exception as e:
+                self._writer.write(method, request, None, time.perf_counter() - start_time, error=e)
+                raise
+            self._writer.write(method, request, response, time.perf_counter() - start_time)
+            return response
+        return recorded
+
+
+def recording_client(client, cassette_path):
+    """실제 클라이언트 호출을 카세트에 기록하는 래퍼를 반환합니다."""
+    return _RecordingProxy(client, "", CassetteWriter(cassette_path))
+
+
+# ============================================================================
+# 재생
+# ============================================================================
+
+def load_cassette(path):
+    """카세트 파일의 상호작용 목록을 기록(파일) 순서대로 반환합니다."""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+
+class CassettePlayer:
+    """요청 키가 같은 기록을 순서대로 돌려주고, 없으면 같은 메서드의 다음 기록을 돌려줍니다.
+
+    같은 요청이 기록보다 많이 오면 마지막 기록을 반복합니다. (업로드 완료 폴링 등)
+    """
+
+    def __init__(self, records, latency_scale=1.0, strict=False):
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._by_key = {}
+        self._by_method = {}
+        self._method_cursor = {}
+        for record in records:
+            self._by_key.setdefault(record["key"], []).append(record)
+            self._by_method.setdefault(record["method"], []).append(record)
+        self._key_cursor = {key: 0 for key in self._by_key}
+
+    def play(self, method, kwargs):
+        record = self._next_record(method, summarize_request(method, kwargs))
+        if self.latency_scale > 0:
+            time.sleep(record["duration_seconds"] * self.latency_scale)
+        if "error" in record:
+            raise ReplayedError(f"{record['error']['type']}: {record['error']['message']}")
+        if record.get("response_list"):
+            if not record["response"]:
+                return []
+            response_type = getattr(types, record["response_type"])
+            return [response_type.model_validate(item) for item in record["response"]]
+        if record["response_type"] is None:
+            return None
+        response_type = getattr(types, record["response_type"])
+        return response_type.model_validate(record["response"])
+
+    def _next_record(self, method, request):
+        key = request_key(method, request)
+        with self._lock:
+            matches = self._by_key.get(key)
+            if matches:
+                cursor = self._key_cursor[key]
+                self._key_cursor[key] = min(cursor + 1, len(matches) - 1)
+                return matches[cursor]
+
+            candidates = self._by_method.get(method)
+            if self.strict or not candidates:
+                raise CassetteMiss(f"카세트에 기록되지 않은 요청입니다: {method}")
+            cursor = self._method_cursor.get(method, 0)
+            self._method_cursor[method] = (cursor + 1) % len(candidates)
+            return candidates[cursor]
+
+
+class _ReplayProxy:
+    def __init__(self, player, prefix):
+        self._player = player
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        path = f"{self._prefix}{name}"
+        if path in RECORDED_METHODS:
+            return lambda *args, **kwargs: self._player.play(path, _bind(path, args, kwargs))
+        if any(method.startswith(f"{path}.") for method in RECORDED_METHODS):
+            return _ReplayProxy(self._player, f"{path}.")
+        raise CassetteMiss(f"재생 모드에서 지원하지 않는 API입니다: {path}")
+
+
+def replay_client(cassette_path, latency_scale=1.0, strict=False):
+    """카세트 응답을 돌려주는 네트워크 없는 클라이언트를 반환합니다."""
+    player = CassettePlayer(load_cassette(cassette_path), latency_scale=latency_scale, strict=strict)
+    return _ReplayProxy(player, "")
@@ -0,0 +1,181 @@
+"""요청 마감 시간, 협조적 취소, 헤지 요청 함수들
+
+Deadline은 호출 체인을 따라 전달되며 남은 시간과 취소 여부를 알려줍니다.
+블로킹 API 호출은 용도별 스레드 풀(업로드/질의/백그라운드)에서 실행하고, 호출한
+쪽은 짧은 간격으로 취소/마감 시간을 확인하면서 기다립니다. 풀을 나눠 두어 오래
+걸리는 업로드가 채팅 질의의 작업 스레드를 차지하지 않습니다.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import REQUEST_CONTROL_CONFIG
+
+_executors = {
+    pool: ThreadPoolExecutor(
+        max_workers=REQUEST_CONTROL_CONFIG[f"max_{pool}_workers"],
+        thread_name_prefix=f"gemini-{pool}"
+    )
+    for pool in ("upload", "query", "background")
+}
+
+_hedge_lock = threading.Lock()
+_hedge_counters = {"requests": 0, "hedges": 0}
+
+
+class DeadlineExceeded(Exception):
+    """마감 시간을 넘겼을 때 발생합니다."""
+
+
+class OperationCancelled(Exception):
+    """사용자가 작업을 취소했을 때 발생합니다."""
+
+
+class Deadline:
+    """마감 시각과 취소 이벤트를 함께 전달하는 객체입니다."""
+
+    def __init__(self, timeout_seconds=None, cancel_event=None, on_wait=None):
+        self.expires_at = time.monotonic() + timeout_seconds if timeout_seconds else None
+        self.cancel_event = cancel_event or threading.Event()
+        self.on_wait = on_wait
+
+    def remaining(self):
+        """남은 시간(초)을 반환합니다. 마감 시간이 없으면 None입니다."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def remaining_ms(self):
+        """HTTP 타임아웃용 남은 시간(밀리초)을 반환합니다."""
+        remaining = self.remaining()
+        return None if remaining is None else max(1, int(remaining * 1000))
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check(self):
+        """취소되었거나 마감 시간이 지났으면 예외를 발생시킵니다."""
+        if self.cancel_event.is_set():
+            raise OperationCancelled("작업이 취소되었습니다.")
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            raise DeadlineExceeded("요청 마감 시간을 초과했습니다.")
+
+    def sleep(self, seconds):
+        """취소되면 즉시 깨어나는 sleep입니다. 마감 시간을 넘겨 자지 않습니다."""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        self.cancel_event.wait(seconds)
+        self.check()
+
+    def heartbeat(self):
+        """대기 중 호출자에게 제어를 돌려줍니다. (UI 갱신, 중지 버튼 처리 등)"""
+        if self.on_wait:
+            self.on_wait()
+
+
+def new_deadline(timeout_seconds, cancel_event=None, on_wait=None):
+    """설정값 기반 Deadline을 생성합니다."""
+    return Deadline(timeout_seconds, cancel_event=cancel_event, on_wait=on_wait)
+
+
+def submit(func, *args, pool="query"):
+    """pool("upload", "query", "background") 스레드 풀에서 func(*args)를 실행합니다."""
+    return _executors[pool].submit(func, *args)
+
+
+def wait_for(futures, deadline, timeout=None):
+    """Future 중 하나가 끝날 때까지 취소/마감 시간을 확인하며 기다립니다.
+
+    timeout(초)이 지나도 끝난 Future가 없으면 빈 집합을 반환합니다.
+    """
+    interval = REQUEST_CONTROL_CONFIG["heartbeat_interval_seconds"]
+    wait_until = time.monotonic() + timeout if timeout is not None else None
+    try:
+        while True:
+            deadline.check()
+            step = interval
+            remaining = deadline.remaining()
+            if remaining is not None:
+                step = min(step, remaining)
+            if wait_until is not None:
+                step = min(step, max(0.0, wait_until - time.monotonic()))
+            done, _ = wait(futures, timeout=step, return_when=FIRST_COMPLETED)
+            if done:
+                return done
+            if wait_until is not None and time.monotonic() >= wait_until:
+                return set()
+            deadline.heartbeat()
+    except DeadlineExceeded:
+        # 작업 스레드도 같은 Deadline을 확인하므로 스스로 멈춥니다
+        raise
+    except BaseException:
+        # 호출자가 중단되면(중지 버튼, 재실행 등) 같은 Deadline을 공유하는 작업도 멈추도록 취소 전파
+        deadline.cancel()
+        raise
+
+
+def call_with_deadline(func, deadline, hedge_after=None, pool="query"):
+    """func()를 pool 스레드 풀에서 마감 시간 안에 실행합니다.
+
+    hedge_after(초)가 주어지고 그 시간 안에 응답이 없으면, 헤지 예산이 허락하는
+    경우 같은 요청을 한 번 더 보내 먼저 끝난 결과를 사용합니다.
+    반환값은 (결과, 헤지 여부)입니다.
+    """
+    if pool == "query":
+        _count_request()
+    futures = [submit(func, pool=pool)]
+    hedged = False
+
+    if hedge_after is not None:
+        done = wait_for(futures, deadline, timeout=hedge_after)
+        if done:
+            return _first_result(done, futures, deadline), hedged
+        if _try_acquire_hedge():
+            futures.append(submit(func, pool=pool))
+            hedged = True
+
+    done = wait_for(futures, deadline)
+    return _first_result(done, futures, deadline), hedged
+
+
+def result_with_deadline(future, deadline):
+    """이미 시작한 Future의 결과를 call_with_deadline과 같은 방식으로 기다립니다.
+
+    결과가 필요해지기 전에 미리 시작해 둔 호출(예: 세션 복원 중 Store 조회)에 씁니다.
+    """
+    return _first_result(wait_for([future], deadline), [future], deadline)
+
+
+def hedge_stats():
+    """지금까지의 요청/헤지 횟수를 반환합니다."""
+    with _hedge_lock:
+        return dict(_hedge_counters)
+
+
+def _first_result(done, futures, deadline):
+    """먼저 끝난 Future의 결과를 반환합니다. 헤지 요청 중 하나만 실패했다면 나머지 결과를 기다립니다."""
+    first = next(f for f in futures if f in done)
+    others = [f for f in futures if f is not first]
+    if first.exception() is None or not others:
+        return first.result()
+    return _first_result(wait_for(others, deadline), others, deadline)
+
+
+def _count_request():
+    with _hedge_lock:
+        _hedge_counters["requests"] += 1
+
+
+def _try_acquire_hedge():
+    """추가 부하 상한(요청 대비 헤지 비율) 안에서만 헤지를 허용합니다."""
+    if not REQUEST_CONTROL_CONFIG["hedge_enabled"]:
+        return False
+    with _hedge_lock:
+        allowed = (_hedge_counters["hedges"] + 1) <= (
+            REQUEST_CONTROL_CONFIG["hedge_max_extra_ratio"] * _hedge_counters["requests"]
+        )
+        if allowed:
+            _hedge_counters["hedges"] += 1
+        return allowed
@@ -4,9 +4,16 @@
 
 SERVICE_NAME="gemini-file-search"
 SERVICE_FILE="/etc/systemd/system/${SERVICE_NAME}.service"
+WORKER_SERVICE_FILE="/etc/systemd/system/${SERVICE_NAME}@.service"
+PROXY_CONFIG_FILE="/etc/nginx/conf.d/${SERVICE_NAME}.conf"
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 USER=$(whoami)
 
+# 멀티 워커 설정 (프록시는 PUBLIC_PORT, 워커는 WORKER_BASE_PORT부터 순서대로 사용)
+PUBLIC_PORT=8501
+WORKER_BASE_PORT=8511
+WORKERS="${2:-${WORKERS:-1}}"
+
 # 색상 정의
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -22,6 +29,7 @@ show_help() {
     echo ""
     echo "사용법:"
     echo -e "  ${GREEN}./service.sh start${NC}      - 서비스 등록, 활성화 및 시작"
+    echo -e "  ${GREEN}./service.sh start N${NC}    - 워커 N개 + nginx 리버스 프록시(스티키 세션)로 시작"
     echo -e "  ${GREEN}./service.sh stop${NC}       - 서비스 중지"
     echo -e "  ${GREEN}./service.sh restart${NC}    - 서비스 재시작"
     echo -e "  ${GREEN}./service.sh status${NC}     - 서비스 상태 확인"
@@ -30,15 +38,14 @@ show_help() {
     echo ""
     echo "예시:"
     echo "  sudo ./service.sh start    # 서비스 등록 및 시작"
+    echo "  sudo ./service.sh start 4  # 워커 4개로 시작 (공유 상태: SQLite WAL)"
     echo "  sudo ./service.sh stop     # 서비스 중지"
     echo "  ./service.sh status        # 상태 확인 (sudo 불필요)"
     echo ""
 }
 
-# 서비스 파일 생성
-create_service_file() {
-    echo -e "${YELLOW}서비스 파일 생성 중...${NC}"
-
+# uv 경로 찾기
+find_uv() {
     # uv 경로 찾기 (sudo 환경에서도 작동하도록 여러 경로 확인)
     UV_PATH=""
 
@@ -72,6 +79,13 @@ create_service_file() {
     fi
 
     echo -e "${GREEN}✓ uv 발견: ${UV_PATH}${NC}"
+}
+
+# 서비스 파일 생성
+create_service_file() {
+    echo -e "${YELLOW}서비스 파일 생성 중...${NC}"
+
+    find_uv
 
     # .env 파일 확인
     if [ ! -f "${SCRIPT_DIR}/.env" ]; then
@@ -108,6 +122,171 @@ EOF
     echo -e "${GREEN}✓ 서비스 파일 생성 완료: ${SERVICE_FILE}${NC}"
 }
 
+# 워커 템플릿 서비스 파일 생성 (인스턴스 이름 = 포트)
+create_worker_service_file() {
+    echo -e "${YELLOW}워커 서비스 파일 생성 중...${NC}"
+
+    find_uv
+
+    # .env 파일 확인
+    if [ ! -f "${SCRIPT_DIR}/.env" ]; then
+        echo -e "${RED}경고: .env 파일이 없습니다.${NC}"
+        echo "서비스가 시작되지 않을 수 있습니다. .env 파일을 생성해주세요."
+    fi
+
+    mkdir -p "${SCRIPT_DIR}/.cache"
+
+    # 모든 워커가 같은 SQLite(WAL) 파일로 Store 레지스트리, 답변 캐시, 요청 한도를 공유
+    cat > /tmp/${SERVICE_NAME}@.service << EOF
+[Unit]
+Description=Gemini File Search Chatbot worker (port %i)
+After=network.target
+
+[Service]
+Type=simple
+User=${USER}
+WorkingDirectory=${SCRIPT_DIR}
+Environment="PATH=${HOME}/.local/bin:/usr/local/bin:/usr/bin:/bin"
+Environment="GFS_SHARED_STATE_BACKEND=sqlite"
+Environment="GFS_SHARED_STATE_PATH=${SCRIPT_DIR}/.cache/shared_state.db"
+ExecStart=${UV_PATH} run streamlit run app.py --server.port=%i --server.address=127.0.0.1 --server.headless=true
+Restart=always
+RestartSec=10
+StandardOutput=journal
+StandardError=journal
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+    sudo cp /tmp/${SERVICE_NAME}@.service ${WORKER_SERVICE_FILE}
+    sudo chmod 644 ${WORKER_SERVICE_FILE}
+    rm /tmp/${SERVICE_NAME}@.service
+
+    echo -e "${GREEN}✓ 워커 서비스 파일 생성 완료: ${WORKER_SERVICE_FILE}${NC}"
+}
+
+# nginx 리버스 프록시 설정 생성 (ip_hash 스티키 세션 + WebSocket)
+create_proxy_config() {
+    echo -e "${YELLOW}nginx 프록시 설정 생성 중...${NC}"
+
+    if ! command -v nginx > /dev/null 2>&1; then
+        echo -e "${RED}오류: nginx가 설치되어 있지 않습니다.${NC}"
+        echo "먼저 nginx를 설치해주세요: sudo apt install nginx"
+        exit 1
+    fi
+
+    UPSTREAM_SERVERS=""
+    for ((i = 0; i < WORKERS; i++)); do
+        UPSTREAM_SERVERS="${UPSTREAM_SERVERS}    server 127.0.0.1:$((WORKER_BASE_PORT + i));"$'\n'
+    done
+
+    cat > /tmp/${SERVICE_NAME}.conf << EOF
+upstream ${SERVICE_NAME} {
+    ip_hash;
+${UPSTREAM_SERVERS}}
+
+server {
+    listen ${PUBLIC_PORT};
+
+    location / {
+        proxy_pass http://${SERVICE_NAME};
+        proxy_http_version 1.1;
+        proxy_set_header Upgrade \$http_upgrade;
+        proxy_set_header Connection "upgrade";
+        proxy_set_header Host \$host;
+        proxy_set_header X-Forwarded-For \$proxy_add_x_forwarded_for;
+        proxy_read_timeout 86400;
+        client_max_body_size 200m;
+    }
+}
+EOF
+
+    sudo cp /tmp/${SERVICE_NAME}.conf ${PROXY_CONFIG_FILE}
+    sudo chmod 644 ${PROXY_CONFIG_FILE}
+    rm /tmp/${SERVICE_NAME}.conf
+
+    sudo nginx -t && sudo systemctl reload nginx
+
+    echo -e "${GREEN}✓ 프록시 설정 완료: ${PROXY_CONFIG_FILE}${NC}"
+}
+
+# 등록된 워커 인스턴스 목록
+worker_units() {
+    systemctl list-units --all --plain --no-legend "${SERVICE_NAME}@*.service" 2>/dev/null | awk '{print $1}'
+}
+
+# 멀티 워커 모드로 등록되어 있는지 확인
+is_worker_mode() {
+    [ -f "${WORKER_SERVICE_FILE}" ]
+}
+
+# 워커 인스턴스, 템플릿, 프록시 설정 제거
+remove_workers() {
+    for unit in $(worker_units); do
+        echo -e "${YELLOW}${unit} 중지 및 비활성화 중...${NC}"
+        sudo systemctl disable --now "${unit}" 2>/dev/null
+    done
+
+    sudo rm -f ${WORKER_SERVICE_FILE}
+
+    if [ -f "${PROXY_CONFIG_FILE}" ]; then
+        echo -e "${YELLOW}프록시 설정 삭제 중...${NC}"
+        sudo rm -f ${PROXY_CONFIG_FILE}
+        sudo nginx -t > /dev/null 2>&1 && sudo systemctl reload nginx
+    fi
+}
+
+# 멀티 워커 시작
+start_workers() {
+    echo -e "${BLUE}========================================${NC}"
+    echo -e "${BLUE}멀티 워커 서비스 등록 및 시작 (워커 ${WORKERS}개)${NC}"
+    echo -e "${BLUE}========================================${NC}"
+
+    # 단일 프로세스 서비스가 있으면 포트 충돌을 막기 위해 중지
+    if [ -f "${SERVICE_FILE}" ]; then
+        echo -e "${YELLOW}단일 프로세스 서비스 중지 중...${NC}"
+        sudo systemctl disable --now ${SERVICE_NAME} 2>/dev/null
+    fi
+
+    # 기존 워커 정리
+    for unit in $(worker_units); do
+        sudo systemctl disable --now "${unit}" 2>/dev/null
+    done
+
+    create_worker_service_file
+
+    echo -e "${YELLOW}systemd 데몬 리로드 중...${NC}"
+    sudo systemctl daemon-reload
+
+    echo -e "${YELLOW}워커 시작 중...${NC}"
+    for ((i = 0; i < WORKERS; i++)); do
+        sudo systemctl enable --now "${SERVICE_NAME}@$((WORKER_BASE_PORT + i))"
+    done
+
+    create_proxy_config
+
+    sleep 2
+    RUNNING=0
+    for unit in $(worker_units); do
+        if sudo systemctl is-active --quiet "${unit}"; then
+            RUNNING=$((RUNNING + 1))
+        fi
+    done
+
+    echo -e "${GREEN}========================================${NC}"
+    echo -e "${GREEN}✓ 워커 ${RUNNING}/${WORKERS}개 실행 중${NC}"
+    echo -e "${GREEN}========================================${NC}"
+    echo ""
+    echo "접속 URL: http://localhost:${PUBLIC_PORT} (nginx, 스티키 세션)"
+    echo "워커 포트: ${WORKER_BASE_PORT} ~ $((WORKER_BASE_PORT + WORKERS - 1))"
+    echo "공유 상태: ${SCRIPT_DIR}/.cache/shared_state.db"
+    echo ""
+    echo "유용한 명령어:"
+    echo "  상태 확인: ./service.sh status"
+    echo "  로그 보기: sudo journalctl -u '${SERVICE_NAME}@*' -f"
+}
+
 # 서비스 시작
 start_service() {
     echo -e "${BLUE}========================================${NC}"
@@ -121,6 +300,21 @@ start_service() {
         exit 1
     fi
 
+    if ! [[ "${WORKERS}" =~ ^[0-9]+$ ]] || [ "${WORKERS}" -lt 1 ]; then
+        echo -e "${RED}오류: 워커 수는 1 이상의 정수여야 합니다: ${WORKERS}${NC}"
+        exit 1
+    fi
+
+    if [ "${WORKERS}" -gt 1 ]; then
+        start_workers
+        return
+    fi
+
+    # 멀티 워커 모드에서 단일 프로세스로 전환하는 경우 워커 정리
+    if is_worker_mode; then
+        remove_workers
+    fi
+
     # 서비스 파일 생성
     create_service_file
 
@@ -168,6 +362,14 @@ stop_service() {
         exit 1
     fi
 
+    if is_worker_mode; then
+        for unit in $(worker_units); do
+            sudo systemctl stop "${unit}"
+        done
+        echo -e "${GREEN}✓ 모든 워커가 중지되었습니다.${NC}"
+        return
+    fi
+
     if [ ! -f "${SERVICE_FILE}" ]; then
         echo -e "${RED}오류: 서비스가 등록되어 있지 않습니다.${NC}"
         exit 1
@@ -187,6 +389,21 @@ restart_service() {
         exit 1
     fi
 
+    if is_worker_mode; then
+        for unit in $(worker_units); do
+            sudo systemctl restart "${unit}"
+        done
+        sleep 2
+        for unit in $(worker_units); do
+            if sudo systemctl is-active --quiet "${unit}"; then
+                echo -e "${GREEN}✓ ${unit} 재시작됨${NC}"
+            else
+                echo -e "${RED}✗ ${unit} 재시작 실패${NC}"
+            fi
+        done
+        return
+    fi
+
     if [ ! -f "${SERVICE_FILE}" ]; then
         echo -e "${RED}오류: 서비스가 등록되어 있지 않습니다.${NC}"
         exit 1
@@ -205,6 +422,11 @@ restart_service() {
 
 # 서비스 상태 확인
 status_service() {
+    if is_worker_mode; then
+        sudo systemctl status "${SERVICE_NAME}@*" --no-pager
+        return
+    fi
+
     if [ ! -f "${SERVICE_FILE}" ]; then
         echo -e "${RED}서비스가 등록되어 있지 않습니다.${NC}"
         exit 1
@@ -223,6 +445,13 @@ disable_service() {
         exit 1
     fi
 
+    if is_worker_mode; then
+        remove_workers
+        sudo systemctl daemon-reload
+        sudo systemctl reset-failed
+        echo -e "${GREEN}✓ 멀티 워커 서비스가 제거되었습니다.${NC}"
+    fi
+
     if [ ! -f "${SERVICE_FILE}" ]; then
         echo -e "${YELLOW}경고: 서비스 파일이 존재하지 않습니다.${NC}"
         exit 0
@@ -253,6 +482,12 @@ disable_service() {
 
 # 서비스 로그 보기
 logs_service() {
+    if is_worker_mode; then
+        echo -e "${BLUE}모든 워커 로그를 표시합니다 (Ctrl+C로 종료)${NC}"
+        sudo journalctl -u "${SERVICE_NAME}@*" -f
+        return
+    fi
+
     if [ ! -f "${SERVICE_FILE}" ]; then
         echo -e "${RED}서비스가 등록되어 있지 않습니다.${NC}"
         exit 1
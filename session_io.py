@@ -0,0 +1,157 @@
+"""세션/Store 카탈로그 바이너리 내보내기 및 불러오기 함수들
+
+파일 형식 (버전 1):
+    헤더   : b"GFSS" + 스키마 버전(1바이트) + 코덱(1바이트)
+    레코드 : 종류(1바이트) + 길이(4바이트, big-endian) + zlib 압축된 페이로드
+
+코덱은 msgpack이 설치되어 있으면 msgpack, 없으면 JSON을 사용합니다. 레코드 단위로
+압축되어 있으므로 iter_session_records로 전체를 메모리에 올리지 않고 순차적으로 읽을
+수 있습니다.
+"""
+
+import io
+import json
+import struct
+import zlib
+
+from config import SESSION_IO_CONFIG
+
+MAGIC = b"GFSS"
+SCHEMA_VERSION = 1
+
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+
+RECORD_HEADER = b"H"
+RECORD_FILE = b"F"
+RECORD_CHAT = b"C"
+RECORD_STATS = b"S"
+
+RECORD_NAMES = {
+    RECORD_HEADER: "header",
+    RECORD_FILE: "file",
+    RECORD_CHAT: "chat",
+    RECORD_STATS: "stats"
+}
+
+_FRAME = struct.Struct(">cI")
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class SessionFormatError(ValueError):
+    """세션 파일 형식이 올바르지 않을 때 발생합니다."""
+
+
+def export_session(stream, store_info, uploaded_files_metadata, chat_history, store_stats=None):
+    """세션을 스트림에 기록합니다. store_info는 {"name", "display_name"} 딕셔너리입니다."""
+    codec = CODEC_MSGPACK if msgpack is not None else CODEC_JSON
+    stream.write(MAGIC + bytes([SCHEMA_VERSION, codec]))
+
+    _write_record(stream, codec, RECORD_HEADER, {
+        "store": store_info,
+        "file_count": len(uploaded_files_metadata),
+        "chat_count": len(chat_history)
+    })
+    for file_metadata in uploaded_files_metadata:
+        _write_record(stream, codec, RECORD_FILE, file_metadata)
+    for chat in chat_history:
+        _write_record(stream, codec, RECORD_CHAT, chat)
+    if store_stats is not None:
+        _write_record(stream, codec, RECORD_STATS, store_stats)
+
+
+def export_session_bytes(store_info, uploaded_files_metadata, chat_history, store_stats=None):
+    """세션을 바이트로 내보냅니다."""
+    buffer = io.BytesIO()
+    export_session(buffer, store_info, uploaded_files_metadata, chat_history, store_stats)
+    return buffer.getvalue()
+
+
+def iter_session_records(stream):
+    """세션 파일의 레코드를 (종류, 객체) 형태로 하나씩 읽습니다."""
+    preamble = stream.read(len(MAGIC) + 2)
+    if len(preamble) < len(MAGIC) + 2 or preamble[:len(MAGIC)] != MAGIC:
+        raise SessionFormatError("세션 파일 형식이 아닙니다.")
+
+    version, codec = preamble[len(MAGIC)], preamble[len(MAGIC) + 1]
+    if version > SCHEMA_VERSION:
+        raise SessionFormatError(f"지원하지 않는 스키마 버전입니다: {version}")
+    if codec == CODEC_MSGPACK and msgpack is None:
+        raise SessionFormatError("msgpack으로 저장된 파일입니다. msgpack을 설치해주세요.")
+    if codec not in (CODEC_JSON, CODEC_MSGPACK):
+        raise SessionFormatError(f"알 수 없는 코덱입니다: {codec}")
+
+    while True:
+        frame = stream.read(_FRAME.size)
+        if not frame:
+            return
+        if len(frame) < _FRAME.size:
+            raise SessionFormatError("세션 파일이 손상되었습니다.")
+
+        kind, length = _FRAME.unpack(frame)
+        payload = stream.read(length)
+        if len(payload) < length:
+            raise SessionFormatError("세션 파일이 손상되었습니다.")
+
+        # 알 수 없는 레코드는 건너뛰어 이후 버전과 호환
+        if kind not in RECORD_NAMES:
+            continue
+        try:
+            obj = _decode(codec, zlib.decompress(payload))
+        except (zlib.error, ValueError, TypeError) as e:
+            raise SessionFormatError(f"세션 파일이 손상되었습니다: {e}") from e
+        yield RECORD_NAMES[kind], obj
+
+
+def import_session(stream, on_header=None):
+    """세션 파일 전체를 읽어 딕셔너리로 반환합니다.
+
+    헤더 레코드를 읽자마자 on_header(store_info)를 호출하므로, 나머지 레코드를 푸는
+    동안 Store 연결 같은 작업을 먼저 시작할 수 있습니다. Store 정보가 없으면
+    SessionFormatError를 발생시킵니다.
+    """
+    session = {"store": None, "uploaded_files_metadata": [], "chat_history": [], "store_stats": None}
+    for kind, obj in iter_session_records(stream):
+        if kind == "header":
+            store_info = obj.get("store") if isinstance(obj, dict) else None
+            if not isinstance(store_info, dict) or not store_info.get("name"):
+                raise SessionFormatError("세션 파일에 Store 정보가 없습니다.")
+            session["store"] = store_info
+            if on_header:
+                on_header(store_info)
+        elif kind == "file":
+            session["uploaded_files_metadata"].append(obj)
+        elif kind == "chat":
+            session["chat_history"].append(obj)
+        elif kind == "stats":
+            session["store_stats"] = obj
+    if session["store"] is None:
+        raise SessionFormatError("세션 파일에 Store 정보가 없습니다.")
+    return session
+
+
+def import_session_bytes(data, on_header=None):
+    """바이트에서 세션을 불러옵니다."""
+    return import_session(io.BytesIO(data), on_header=on_header)
+
+
+def _write_record(stream, codec, kind, obj):
+    payload = zlib.compress(_encode(codec, obj), SESSION_IO_CONFIG["compression_level"])
+    stream.write(_FRAME.pack(kind, len(payload)))
+    stream.write(payload)
+
+
+def _encode(codec, obj):
+    if codec == CODEC_MSGPACK:
+        return msgpack.packb(obj, default=str, use_bin_type=True)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _decode(codec, data):
+    if codec == CODEC_MSGPACK:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    return json.loads(data)
@@ -0,0 +1,395 @@
+"""워커 간 공유 상태 (Store 레지스트리, Store 통계, 답변 캐시, 요청 한도)
+
+단일 프로세스에서는 메모리 백엔드를, 여러 워커 프로세스를 띄울 때는 WAL 모드의
+SQLite 백엔드를 사용합니다. 백엔드는 SHARED_STATE_CONFIG 또는 환경 변수
+GFS_SHARED_STATE_BACKEND / GFS_SHARED_STATE_PATH로 선택합니다.
+
+만료된 항목은 쓰기 시 purge_interval_seconds마다 한 번씩 지우고, 답변 캐시처럼
+크기 제한(max_entries)이 있는 네임스페이스는 가장 오래 쓰이지 않은 항목부터 지웁니다.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from config import SHARED_STATE_CONFIG
+
+NAMESPACE_STORES = "stores"
+NAMESPACE_STORE_VERSIONS = "store_versions"
+NAMESPACE_STORE_STATS = "store_stats"
+NAMESPACE_ANSWERS = "answers"
+NAMESPACE_RATE_LIMIT = "rate_limit"
+NAMESPACE_CLAIMS = "claims"
+
+
+class MemoryBackend:
+    """프로세스 내부 딕셔너리 백엔드입니다.
+
+    max_entries: 네임스페이스별 최대 항목 수 (넘으면 가장 오래 쓰이지 않은 항목부터 제거)
+    """
+
+    def __init__(self, max_entries=None, purge_interval_seconds=60):
+        self._lock = threading.Lock()
+        self._data = {}
+        self._max_entries = max_entries or {}
+        self._purge_interval_seconds = purge_interval_seconds
+        self._purged_at = time.time()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entries = self._data.get(namespace)
+            entry = entries.get(key) if entries else None
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return value
+
+    def set(self, namespace, key, value, ttl_seconds=None):
+        expires_at = time.time() + ttl_seconds if ttl_seconds else None
+        with self._lock:
+            self._put(namespace, key, value, expires_at)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._data.get(namespace, {}).pop(key, None)
+
+    def items(self, namespace):
+        now = time.time()
+        with self._lock:
+            return [
+                (key, value)
+                for key, (value, expires_at) in self._data.get(namespace, {}).items()
+                if expires_at is None or expires_at >= now
+            ]
+
+    def update(self, namespace, key, func, ttl_seconds=None):
+        """현재 값을 func에 넘겨 새 값으로 원자적으로 교체하고 새 값을 반환합니다.
+
+        ttl_seconds를 주면 새 값은 그 시간 뒤 만료되며, 만료된 이전 값은 None으로 넘깁니다.
+        func가 받은 값을 그대로(같은 객체) 돌려주면 기존 만료 시각을 유지합니다.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(namespace, {}).get(key)
+            current = entry[0] if entry and (entry[1] is None or entry[1] >= now) else None
+            value = func(current)
+            if current is not None and value is current:
+                expires_at = entry[1]
+            else:
+                expires_at = now + ttl_seconds if ttl_seconds else None
+            self._put(namespace, key, value, expires_at)
+            return value
+
+    def _put(self, namespace, key, value, expires_at):
+        entries = self._data.setdefault(namespace, OrderedDict())
+        entries[key] = (value, expires_at)
+        entries.move_to_end(key)
+
+        max_entries = self._max_entries.get(namespace)
+        while max_entries and len(entries) > max_entries:
+            entries.popitem(last=False)
+
+        now = time.time()
+        if now - self._purged_at >= self._purge_interval_seconds:
+            self._purged_at = now
+            for namespace_entries in self._data.values():
+                expired = [
+                    entry_key for entry_key, (_, entry_expires_at) in namespace_entries.items()
+                    if entry_expires_at is not None and entry_expires_at < now
+                ]
+                for entry_key in expired:
+                    del namespace_entries[entry_key]
+
+
+class SQLiteBackend:
+    """WAL 모드 SQLite 백엔드입니다. 여러 프로세스가 같은 파일을 공유합니다.
+
+    max_entries가 있는 네임스페이스는 읽을 때마다 accessed_at을 갱신해 LRU 순서를 유지합니다.
+    """
+
+    def __init__(self, path, max_entries=None, purge_interval_seconds=60):
+        self.path = path
+        self._local = threading.local()
+        self._max_entries = max_entries or {}
+        self._purge_interval_seconds = purge_interval_seconds
+        self._purged_at = 0.0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        # accessed_at 열이 없던 이전 파일도 그대로 사용
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(kv)")]
+        if "accessed_at" not in columns:
+            connection.execute("ALTER TABLE kv ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+        connection.execute("CREATE INDEX IF NOT EXISTS kv_expires_at ON kv (expires_at)")
+        connection.execute("CREATE INDEX IF NOT EXISTS kv_accessed_at ON kv (namespace, accessed_at)")
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, namespace, key):
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self.delete(namespace, key)
+            return None
+        if namespace in self._max_entries:
+            connection.execute(
+                "UPDATE kv SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (time.time(), namespace, key)
+            )
+        return json.loads(value)
+
+    def set(self, namespace, key, value, ttl_seconds=None):
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds else None
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, json.dumps(value, ensure_ascii=False, default=str), expires_at, now)
+        )
+        self._after_write(connection, namespace, now)
+
+    def delete(self, namespace, key):
+        self._connection().execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def items(self, namespace):
+        rows = self._connection().execute(
+            "SELECT key, value FROM kv WHERE namespace = ? AND (expires_at IS NULL OR expires_at >= ?)",
+            (namespace, time.time())
+        ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def update(self, namespace, key, func, ttl_seconds=None):
+        """쓰기 잠금(BEGIN IMMEDIATE) 안에서 읽고-수정하고-쓰기를 수행합니다.
+
+        ttl_seconds를 주면 새 값은 그 시간 뒤 만료되며, 만료된 이전 값은 None으로 넘깁니다.
+        func가 받은 값을 그대로(같은 객체) 돌려주면 기존 만료 시각을 유지합니다.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = connection.execute(
+                "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?"
+                " AND (expires_at IS NULL OR expires_at >= ?)",
+                (namespace, key, now)
+            ).fetchone()
+            current = json.loads(row[0]) if row else None
+            value = func(current)
+            if current is not None and value is current:
+                expires_at = row[1]
+            else:
+                expires_at = now + ttl_seconds if ttl_seconds else None
+            connection.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    namespace,
+                    key,
+                    json.dumps(value, ensure_ascii=False, default=str),
+                    expires_at,
+                    now
+                )
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self._after_write(connection, namespace, now)
+        return value
+
+    def _after_write(self, connection, namespace, now):
+        max_entries = self._max_entries.get(namespace)
+        if max_entries:
+            connection.execute(
+                "DELETE FROM kv WHERE namespace = ? AND key IN ("
+                " SELECT key FROM kv WHERE namespace = ? ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (namespace, namespace, max_entries)
+            )
+        # 다른 워커가 방금 지웠을 수 있으므로 워커마다 간격을 두고 실행 (중복 실행은 무해)
+        if now - self._purged_at >= self._purge_interval_seconds:
+            self._purged_at = now
+            connection.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """설정에 따른 공유 상태 백엔드를 반환합니다. (프로세스당 하나)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend_name = os.getenv("GFS_SHARED_STATE_BACKEND", SHARED_STATE_CONFIG["backend"])
+                options = {
+                    "max_entries": {NAMESPACE_ANSWERS: SHARED_STATE_CONFIG["answer_cache_max_entries"]},
+                    "purge_interval_seconds": SHARED_STATE_CONFIG["purge_interval_seconds"]
+                }
+                if backend_name == "sqlite":
+                    path = os.getenv("GFS_SHARED_STATE_PATH", SHARED_STATE_CONFIG["sqlite_path"])
+                    _backend = SQLiteBackend(path, **options)
+                else:
+                    _backend = MemoryBackend(**options)
+    return _backend
+
+
+def set_backend(backend):
+    """공유 상태 백엔드를 교체합니다. (커스텀 백엔드 연결 및 벤치마크용)"""
+    global _backend
+    _backend = backend
+
+
+# ============================================================================
+# Store 레지스트리
+# ============================================================================
+
+def session_owner():
+    """세션마다 새로 만드는 소유자 ID입니다. (그 세션에서 등록한 Store만 보임)"""
+    return f"session:{uuid.uuid4().hex}"
+
+
+def workspace_owner(workspace_key):
+    """워크스페이스 키로 소유자 ID를 만듭니다. 키 원문은 공유 상태에 저장하지 않습니다."""
+    digest = hashlib.sha256(workspace_key.encode("utf-8")).hexdigest()
+    return f"workspace:{digest}"
+
+
+def register_store(store_name, display_name, owner):
+    """생성/연결된 Store를 소유자별 레지스트리에 등록합니다."""
+    get_backend().set(NAMESPACE_STORES, _registry_key(store_name, owner), {
+        "name": store_name,
+        "display_name": display_name,
+        "owner": owner,
+        "registered_at": time.time()
+    })
+
+
+def list_registered_stores(owner):
+    """owner가 등록한 Store 목록을 최근 등록 순으로 반환합니다."""
+    stores = [
+        value for _, value in get_backend().items(NAMESPACE_STORES)
+        if value.get("owner") == owner
+    ]
+    return sorted(stores, key=lambda store: store["registered_at"], reverse=True)
+
+
+def unregister_store(store_name, owner):
+    get_backend().delete(NAMESPACE_STORES, _registry_key(store_name, owner))
+
+
+def _registry_key(store_name, owner):
+    return f"{owner}|{store_name}"
+
+
+def get_store_version(store_name):
+    """Store 내용이 바뀔 때마다 증가하는 버전을 반환합니다."""
+    return get_backend().get(NAMESPACE_STORE_VERSIONS, store_name) or 0
+
+
+def bump_store_version(store_name):
+    """업로드/삭제 후 호출해 해당 Store의 답변 캐시를 무효화합니다."""
+    return get_backend().update(NAMESPACE_STORE_VERSIONS, store_name, lambda version: (version or 0) + 1)
+
+
+# ============================================================================
+# 답변 캐시
+# ============================================================================
+
+def answer_cache_key(store_name, question, context="", metadata_filter=None):
+    """Store 버전, 질문, 대화 맥락, 검색 범위 필터로 캐시 키를 만듭니다."""
+    version = get_store_version(store_name)
+    key_source = f"{question}\x00{context}"
+    if metadata_filter:
+        key_source += f"\x00{metadata_filter}"
+    digest = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+    return f"{store_name}:{version}:{digest}"
+
+
+def get_cached_answer(cache_key):
+    return get_backend().get(NAMESPACE_ANSWERS, cache_key)
+
+
+def put_cached_answer(cache_key, answer, citations, debug_info, source=None):
+    """답변을 캐시에 저장합니다. source로 출처(예: "precompute")를 표시할 수 있습니다."""
+    entry = {"answer": answer, "citations": citations, "debug_info": debug_info}
+    if source:
+        entry["source"] = source
+    get_backend().set(
+        NAMESPACE_ANSWERS,
+        cache_key,
+        entry,
+        ttl_seconds=SHARED_STATE_CONFIG["answer_cache_ttl_seconds"]
+    )
+
+
+def try_claim(name, ttl_seconds):
+    """이름마다 처음 호출한 한 곳에서만 True를 반환합니다. (여러 워커 중 하나만 작업하도록)
+
+    작업을 맡은 워커가 중간에 죽어도 ttl_seconds가 지나면 다른 워커가 다시 맡을 수 있습니다.
+    """
+    claimed = []
+
+    def claim(state):
+        claimed.append(state is None)
+        # 이미 맡은 항목은 같은 객체를 돌려줘 update가 원래 만료 시각을 유지하게 함
+        return state if state is not None else {"claimed_at": time.time()}
+
+    get_backend().update(NAMESPACE_CLAIMS, name, claim, ttl_seconds=ttl_seconds)
+    return claimed[0]
+
+
+# ============================================================================
+# 요청 한도 (토큰 버킷, 모든 워커가 공유)
+# ============================================================================
+
+def try_acquire_request(bucket="gemini", cost=1):
+    """공유 요청 한도에서 cost만큼 차감합니다. 한도를 넘으면 False를 반환합니다."""
+    capacity = SHARED_STATE_CONFIG["rate_limit_requests_per_minute"]
+    if not capacity:
+        return True
+    refill_per_second = capacity / 60.0
+    acquired = []
+
+    def take(state):
+        now = time.time()
+        if state is None:
+            state = {"tokens": capacity, "updated_at": now}
+        tokens = min(capacity, state["tokens"] + (now - state["updated_at"]) * refill_per_second)
+        allowed = tokens >= cost
+        acquired.append(allowed)
+        return {"tokens": tokens - cost if allowed else tokens, "updated_at": now}
+
+    get_backend().update(NAMESPACE_RATE_LIMIT, bucket, take)
+    return acquired[0]
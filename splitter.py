@@ -0,0 +1,264 @@
+"""대용량 파일 분할 함수들
+
+텍스트/Markdown/CSV는 자연스러운 경계(헤딩, 문단, 행 묶음)에서, PDF는 페이지
+범위 단위로 나눕니다. 각 파트는 `원본이름.partNNN-of-MMM.확장자` 형식의 이름을
+가지므로 검색 결과의 출처를 원본 파일로 되돌릴 수 있습니다.
+"""
+
+import csv
+import io
+import os
+import re
+
+from config import SPLIT_CONFIG
+
+PART_NAME_PATTERN = re.compile(r"^(?P<stem>.+)\.part(?P<index>\d+)-of-(?P<count>\d+)(?P<ext>\.[^.]*)?$")
+
+
+class FilePart:
+    """업로드 함수가 기대하는 파일 객체(name, size, getbuffer)를 흉내 내는 메모리 파일입니다.
+
+    name의 확장자는 업로드 데이터 형식을, display_name은 Store에 표시될 이름을 나타냅니다.
+    """
+
+    def __init__(self, name, data, display_name=None, part_index=None, part_count=None, part_range=None):
+        self.name = name
+        self.display_name = display_name or name
+        self.size = len(data)
+        self.part_index = part_index
+        self.part_count = part_count
+        self.part_range = part_range
+        self._data = data
+
+    def getbuffer(self):
+        return memoryview(self._data)
+
+
+def make_part_name(filename, part_index, part_count):
+    """파트 파일 이름을 생성합니다. (확장자는 유지)"""
+    stem, ext = os.path.splitext(filename)
+    width = max(3, len(str(part_count)))
+    return f"{stem}.part{part_index:0{width}d}-of-{part_count:0{width}d}{ext}"
+
+
+def resolve_source(title):
+    """파트 이름을 (원본 파일 이름, 파트 라벨)로 되돌립니다. 파트가 아니면 라벨은 None입니다."""
+    if not title:
+        return title, None
+    match = PART_NAME_PATTERN.match(title)
+    if not match:
+        return title, None
+    original = match.group("stem") + (match.group("ext") or "")
+    label = f"{int(match.group('index'))}/{int(match.group('count'))}"
+    return original, label
+
+
+def needs_split(filename, size):
+    """파일이 분할 대상인지 확인합니다."""
+    if not SPLIT_CONFIG["enabled"]:
+        return False
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in SPLIT_CONFIG["splittable_extensions"]:
+        return False
+    return size > SPLIT_CONFIG["max_part_bytes"]
+
+
+def split_file(filename, data, display_name=None):
+    """파일을 파트 목록으로 나눕니다. 나눌 수 없거나 필요 없으면 빈 리스트를 반환합니다.
+
+    형식은 filename의 확장자로 판단하고, 파트 이름은 display_name(기본값 filename)을 따릅니다.
+    """
+    if not needs_split(filename, len(data)):
+        return []
+
+    ext = os.path.splitext(filename)[1].lower()
+    max_bytes = SPLIT_CONFIG["max_part_bytes"]
+
+    if ext == ".pdf":
+        pieces = _split_pdf(data, max_bytes)
+    else:
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            return []
+
+        if ext == ".csv":
+            pieces = _split_csv(text, max_bytes)
+            # 한 행이 한도보다 크면(줄바꿈 없는 CSV 등) 행 단위로는 나눌 수 없으므로 텍스트로 나눔
+            if not pieces or any(len(piece_data) > max_bytes for piece_data, _ in pieces):
+                pieces = _split_text(text, max_bytes, _paragraph_blocks(text))
+        elif ext == ".md":
+            pieces = _split_text(text, max_bytes, _markdown_blocks(text))
+        else:
+            pieces = _split_text(text, max_bytes, _paragraph_blocks(text))
+
+    if len(pieces) < 2:
+        return []
+
+    part_count = len(pieces)
+    return [
+        FilePart(
+            make_part_name(filename, idx, part_count),
+            piece_data,
+            display_name=make_part_name(display_name or filename, idx, part_count),
+            part_index=idx,
+            part_count=part_count,
+            part_range=piece_range
+        )
+        for idx, (piece_data, piece_range) in enumerate(pieces, 1)
+    ]
+
+
+def _markdown_blocks(text):
+    """Markdown을 헤딩 단위 블록으로 나눕니다. (코드 블록 안의 #은 무시)"""
+    blocks = []
+    current = []
+    in_code = False
+    for line in text.splitlines(keepends=True):
+        stripped = line.lstrip()
+        if stripped.startswith("```") or stripped.startswith("~~~"):
+            in_code = not in_code
+        if not in_code and stripped.startswith("#") and current:
+            blocks.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append("".join(current))
+    return blocks
+
+
+def _paragraph_blocks(text):
+    """일반 텍스트를 빈 줄 기준 문단 블록으로 나눕니다."""
+    blocks = re.split(r"(?<=\n)(?=[ \t]*\n)", text)
+    return [block for block in blocks if block]
+
+
+def _split_text(text, max_bytes, blocks):
+    """블록을 max_bytes 이하로 묶어 파트를 만듭니다.
+
+    블록이 너무 크면 줄 단위로, 줄도 너무 크면(줄바꿈 없는 파일 등) UTF-8 문자 경계에서
+    바이트 단위로 다시 나눕니다.
+    """
+    pieces = []
+    current = []
+    current_size = 0
+    first_line = 1
+
+    def flush():
+        piece = "".join(current)
+        last_line = first_line + piece.count("\n") - (1 if piece.endswith("\n") else 0)
+        pieces.append((piece.encode("utf-8"), f"lines {first_line}-{last_line}"))
+        # 줄 중간에서 잘렸으면 다음 파트는 같은 줄에서 시작
+        return last_line + 1 if piece.endswith("\n") else last_line
+
+    for block in blocks:
+        units = [block]
+        if len(block.encode("utf-8")) > max_bytes:
+            units = [
+                unit
+                for line in block.splitlines(keepends=True)
+                for unit in _split_long_line(line, max_bytes)
+            ]
+
+        for unit in units:
+            unit_size = len(unit.encode("utf-8"))
+            if current and current_size + unit_size > max_bytes:
+                first_line = flush()
+                current = []
+                current_size = 0
+            current.append(unit)
+            current_size += unit_size
+
+    if current:
+        flush()
+    return pieces
+
+
+def _split_long_line(line, max_bytes):
+    """max_bytes보다 긴 줄을 UTF-8 문자 경계에서 max_bytes 이하 조각으로 나눕니다."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return [line]
+
+    units = []
+    start = 0
+    while start < len(encoded):
+        end = min(start + max_bytes, len(encoded))
+        # 연속 바이트(10xxxxxx)에서 자르지 않도록 문자 시작 위치까지 뒤로 이동
+        while start < end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        if end == start:
+            # 문자 하나가 max_bytes보다 크면 그 문자만 담음
+            end += 1
+            while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+                end += 1
+        units.append(encoded[start:end].decode("utf-8"))
+        start = end
+    return units
+
+
+def _split_csv(text, max_bytes):
+    """CSV를 행 묶음 단위로 나누고, 모든 파트에 헤더 행을 반복합니다."""
+    rows = csv.reader(io.StringIO(text, newline=""))
+    try:
+        header = next(rows)
+    except StopIteration:
+        return []
+
+    def encode_rows(row_list):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(row_list)
+        return buffer.getvalue().encode("utf-8")
+
+    header_bytes = encode_rows([header])
+    pieces = []
+    current = []
+    current_size = len(header_bytes)
+    first_row = 1
+
+    for row_number, row in enumerate(rows, 1):
+        row_size = len(encode_rows([row]))
+        if current and current_size + row_size > max_bytes:
+            pieces.append((header_bytes + encode_rows(current), f"rows {first_row}-{row_number - 1}"))
+            current = []
+            current_size = len(header_bytes)
+            first_row = row_number
+        current.append(row)
+        current_size += row_size
+
+    if current:
+        pieces.append((header_bytes + encode_rows(current), f"rows {first_row}-{first_row + len(current) - 1}"))
+    return pieces
+
+
+def _split_pdf(data, max_bytes):
+    """PDF를 페이지 범위 단위로 나눕니다. pypdf가 없으면 나누지 않습니다."""
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        return []
+
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        total_pages = len(reader.pages)
+    except Exception:
+        return []
+
+    if total_pages < 2:
+        return []
+
+    # 크기 기준 파트 수를 추정하고, 파트당 최대 페이지 수로 제한합니다
+    part_count = max(1, -(-len(data) // max_bytes))
+    pages_per_part = min(SPLIT_CONFIG["pdf_max_pages_per_part"], -(-total_pages // part_count))
+    pages_per_part = max(1, pages_per_part)
+
+    pieces = []
+    for start in range(0, total_pages, pages_per_part):
+        end = min(start + pages_per_part, total_pages)
+        writer = PdfWriter()
+        for page_number in range(start, end):
+            writer.add_page(reader.pages[page_number])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        pieces.append((buffer.getvalue(), f"pages {start + 1}-{end}"))
+    return pieces
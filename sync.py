@@ -0,0 +1,595 @@
+"""디렉터리 → File Search Store 증분 동기화
+
+파일별 경로, mtime, 크기, 해시를 매니페스트에 기록해 두고, 새 파일과 바뀐 파일만
+병렬로 업로드하며 폴더에서 사라진 파일은 Store에서 삭제합니다. mtime과 크기가
+그대로인 파일은 내용을 읽지 않으므로 변경 없는 대규모 트리도 stat 한 번씩으로
+끝납니다. --watch 모드에서는 inotify 이벤트를 모아 한 번에 동기화합니다.
+
+사용법:
+    uv run python sync.py ./docs --store fileSearchStores/xxxx
+    uv run python sync.py ./docs --store fileSearchStores/xxxx --watch
+    uv run python sync.py ./docs --store fileSearchStores/xxxx --precompute
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import re
+import select
+import struct
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from stat import S_ISREG
+
+from config import REQUEST_CONTROL_CONFIG, SYNC_CONFIG, UPLOAD_CONFIG
+from extractor import content_hash
+from gemini_api import delete_document, upload_file
+from request_control import new_deadline
+from shared_state import bump_store_version, try_acquire_request
+from splitter import FilePart
+from tagging import new_upload_batch_id, parse_labels
+from utils import save_store_stats, stats_add_file, stats_remove_file, update_store_stats
+
+MANIFEST_VERSION = 1
+
+
+# ============================================================================
+# 매니페스트
+# ============================================================================
+
+def manifest_path(store_name, root):
+    """Store와 동기화 폴더 쌍마다 별도의 매니페스트 파일 경로를 반환합니다."""
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", store_name)
+    root_digest = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(SYNC_CONFIG["manifest_dir"], f"{safe_name}-{root_digest}.manifest.json")
+
+
+def load_manifest(store_name, root):
+    """매니페스트를 불러옵니다. 없거나 읽을 수 없으면 빈 매니페스트를 반환합니다."""
+    try:
+        with open(manifest_path(store_name, root), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {
+        "version": MANIFEST_VERSION,
+        "store_name": store_name,
+        "root": os.path.abspath(root),
+        "files": {},
+        "pending_deletes": []
+    }
+
+
+def save_manifest(manifest):
+    """매니페스트를 원자적으로 저장합니다. (여러 프로세스가 같은 파일을 써도 임시 파일이 겹치지 않음)"""
+    path = manifest_path(manifest["store_name"], manifest["root"])
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+# ============================================================================
+# 스캔 및 계획
+# ============================================================================
+
+def is_syncable(relpath):
+    """동기화 대상 파일인지 확인합니다. (허용 확장자, 숨김 파일 제외)"""
+    if SYNC_CONFIG["ignore_hidden"] and any(part.startswith(".") for part in relpath.split("/")):
+        return False
+    ext = os.path.splitext(relpath)[1].lower().lstrip(".")
+    return ext in UPLOAD_CONFIG["accepted_types"]
+
+
+def scan_directory(root, paths=None):
+    """동기화 대상 파일의 {상대 경로: (mtime_ns, size)}를 반환합니다.
+
+    paths를 넘기면 해당 상대 경로들만 stat합니다. (watch 모드의 부분 동기화)
+    """
+    scanned = {}
+
+    if paths is not None:
+        for relpath in paths:
+            if not is_syncable(relpath):
+                continue
+            try:
+                stat = os.stat(os.path.join(root, relpath))
+            except OSError:
+                continue
+            if S_ISREG(stat.st_mode):
+                scanned[relpath] = (stat.st_mtime_ns, stat.st_size)
+        return scanned
+
+    stack = [""]
+    while stack:
+        reldir = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, reldir))
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                relpath = f"{reldir}/{entry.name}" if reldir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not (SYNC_CONFIG["ignore_hidden"] and entry.name.startswith(".")):
+                            stack.append(relpath)
+                    elif entry.is_file() and is_syncable(relpath):
+                        stat = entry.stat()
+                        scanned[relpath] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+    return scanned
+
+
+def plan_sync(manifest_files, scanned, paths=None):
+    """(확인할 파일, 변경 없는 파일 수, 삭제할 파일) 목록을 계산합니다.
+
+    mtime과 크기가 매니페스트와 같으면 변경 없음으로 보고, 다르면 내용 해시로
+    실제 변경 여부를 확인하도록 후보에 넣습니다.
+    """
+    candidates = []
+    unchanged = 0
+    for relpath, (mtime_ns, size) in scanned.items():
+        entry = manifest_files.get(relpath)
+        if entry and entry["mtime_ns"] == mtime_ns and entry["size"] == size:
+            unchanged += 1
+        else:
+            candidates.append(relpath)
+
+    scope = manifest_files if paths is None else [relpath for relpath in paths if relpath in manifest_files]
+    deleted = [relpath for relpath in scope if relpath not in scanned]
+    return sorted(candidates), unchanged, sorted(deleted)
+
+
+# ============================================================================
+# 동기화
+# ============================================================================
+
+def sync_directory(client, root, store_name, paths=None, dry_run=False, cancel_event=None, progress=None,
+                   labels=None):
+    """폴더를 Store에 미러링합니다.
+
+    Args:
+        paths: 확인할 상대 경로 목록 (None이면 전체 트리)
+        dry_run: True면 계획만 세우고 업로드/삭제하지 않음
+        cancel_event: 설정되면 진행 중인 업로드를 중단
+        progress: progress(action, relpath, error) 콜백
+        labels: 업로드하는 문서에 붙일 라벨 목록 (업로드 배치 태그는 동기화마다 새로 생성)
+
+    Returns:
+        (요약 dict, 에러 메시지)
+    """
+    if not os.path.isdir(root):
+        return None, f"폴더를 찾을 수 없습니다: {root}"
+
+    start_time = time.time()
+    cancel_event = cancel_event or threading.Event()
+    manifest = load_manifest(store_name, root)
+    files = manifest["files"]
+    # 이전 동기화에서 삭제하지 못한 문서 (교체된 이전 버전 등)
+    pending_deletes = manifest.setdefault("pending_deletes", [])
+
+    scanned = scan_directory(root, paths)
+    candidates, unchanged, deleted = plan_sync(files, scanned, paths)
+
+    summary = {
+        "scanned": len(scanned),
+        "unchanged": unchanged,
+        "touched": 0,
+        "uploaded": 0,
+        "deleted": 0,
+        "failed": [],
+        "pending_upload": len(candidates),
+        "pending_delete": len(deleted),
+        "stale_documents": len(pending_deletes),
+        "dry_run": dry_run
+    }
+    if dry_run or not (candidates or deleted or pending_deletes):
+        summary["duration_seconds"] = round(time.time() - start_time, 2)
+        return summary, None
+
+    state = {"changed": False, "completed": 0}
+
+    if pending_deletes:
+        undeleted = _delete_documents(client, pending_deletes, cancel_event)
+        state["changed"] = len(undeleted) < len(pending_deletes)
+        manifest["pending_deletes"] = pending_deletes = undeleted
+
+    def apply(relpath, result):
+        action, new_entry, file_metadata, error, undeleted = result
+        # 삭제하지 못한 이전 문서는 잊지 않고 다음 동기화 때 다시 삭제
+        pending_deletes.extend(undeleted)
+        if error:
+            summary["failed"].append((relpath, error))
+            if progress:
+                progress("failed", relpath, error)
+            return
+
+        old_entry = files.get(relpath)
+        if action == "touched":
+            files[relpath] = new_entry
+            summary["touched"] += 1
+        elif action == "uploaded":
+            def replace_file(stats):
+                if old_entry:
+                    stats_remove_file(stats, old_entry["stats"])
+                stats_add_file(stats, file_metadata)
+
+            # 앱 워커가 같은 Store 통계를 갱신하고 있어도 덮어쓰지 않도록 파일마다 공유 상태에 적용
+            update_store_stats(store_name, replace_file)
+            files[relpath] = new_entry
+            summary["uploaded"] += 1
+            state["changed"] = True
+        elif action == "deleted":
+            update_store_stats(store_name, lambda stats: stats_remove_file(stats, old_entry["stats"]))
+            del files[relpath]
+            summary["deleted"] += 1
+            state["changed"] = True
+        if progress:
+            progress(action, relpath, None)
+
+        state["completed"] += 1
+        if state["completed"] % SYNC_CONFIG["manifest_save_every"] == 0:
+            save_manifest(manifest)
+
+    upload_batch = f"sync-{new_upload_batch_id()}"
+    executor = ThreadPoolExecutor(max_workers=SYNC_CONFIG["max_parallel_files"], thread_name_prefix="sync")
+    futures = {
+        executor.submit(_sync_file, client, root, relpath, scanned[relpath], files.get(relpath),
+                        store_name, cancel_event, upload_batch, labels): relpath
+        for relpath in candidates
+    }
+    futures.update({
+        executor.submit(_delete_file, client, files[relpath], cancel_event): relpath
+        for relpath in deleted
+    })
+    applied = set()
+    try:
+        for future in as_completed(futures):
+            apply(futures[future], future.result())
+            applied.add(future)
+    except BaseException:
+        # Ctrl+C 등으로 중단되면 진행 중인 업로드를 취소하고, 이미 끝난 결과는 매니페스트에 반영
+        cancel_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        for future, relpath in futures.items():
+            if future not in applied and future.done() and not future.cancelled():
+                apply(relpath, future.result())
+        raise
+    finally:
+        executor.shutdown(wait=False)
+        save_manifest(manifest)
+        if state["changed"]:
+            save_store_stats(store_name, force=True)
+            bump_store_version(store_name)
+
+    summary["stale_documents"] = len(pending_deletes)
+    summary["duration_seconds"] = round(time.time() - start_time, 2)
+    return summary, None
+
+
+def _sync_file(client, root, relpath, stat, entry, store_name, cancel_event, upload_batch=None, labels=None):
+    """파일 하나를 확인하고 내용이 바뀌었으면 업로드한 뒤 이전 문서를 삭제합니다."""
+    mtime_ns, size = stat
+    try:
+        with open(os.path.join(root, relpath), "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return "failed", None, None, str(e), []
+
+    digest = content_hash(data)
+    if entry and entry["hash"] == digest:
+        # 내용은 같고 mtime만 바뀐 경우 (touch, 복사 등)
+        return "touched", dict(entry, mtime_ns=mtime_ns, size=size), None, None, []
+
+    # 앱과 같은 공유 요청 한도 안에서 업로드
+    if not _acquire_request(cancel_event):
+        return "failed", None, None, "작업이 취소되었습니다.", []
+
+    deadline = new_deadline(REQUEST_CONTROL_CONFIG["upload_timeout_seconds"], cancel_event=cancel_event)
+    success, file_metadata, error = upload_file(
+        client, FilePart(relpath, data, display_name=relpath), store_name, deadline=deadline,
+        upload_batch=upload_batch, labels=labels
+    )
+    if not success:
+        return "failed", None, None, error, []
+
+    # 새 문서가 인덱싱된 후 이전 문서를 지워 검색 공백이 없도록 함
+    undeleted = _delete_documents(client, entry["documents"], cancel_event) if entry else []
+
+    new_entry = {
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "hash": digest,
+        "documents": _document_names(file_metadata),
+        "stats": {
+            "file_size_bytes": file_metadata["file_size_bytes"],
+            "file_type": file_metadata["file_type"],
+            "estimated_tokens": file_metadata.get("estimated_tokens"),
+            "estimated_chunks": file_metadata.get("estimated_chunks")
+        },
+        "synced_at": time.time()
+    }
+    return "uploaded", new_entry, file_metadata, None, undeleted
+
+
+def _delete_file(client, entry, cancel_event):
+    """폴더에서 사라진 파일의 문서들을 Store에서 삭제합니다. (실패한 문서는 삭제 대기 목록으로)"""
+    return "deleted", None, None, None, _delete_documents(client, entry["documents"], cancel_event)
+
+
+def _delete_documents(client, document_names, cancel_event):
+    """문서들을 삭제하고 삭제하지 못한 문서 이름 목록을 반환합니다."""
+    undeleted = []
+    for document_name in document_names:
+        if not _acquire_request(cancel_event):
+            undeleted.append(document_name)
+            continue
+        success, error = delete_document(client, document_name)
+        if not success:
+            print(f"⚠️ 문서 삭제 실패 ({document_name}): {error} - 다음 동기화 때 다시 시도", flush=True)
+            undeleted.append(document_name)
+    return undeleted
+
+
+def _acquire_request(cancel_event):
+    """공유 요청 한도에 차례가 올 때까지 기다립니다. 취소되면 False를 반환합니다."""
+    while not try_acquire_request():
+        if cancel_event.wait(SYNC_CONFIG["rate_limit_wait_seconds"]):
+            return False
+    return True
+
+
+def _document_names(file_metadata):
+    if file_metadata.get("document_names"):
+        return list(file_metadata["document_names"])
+    if file_metadata.get("document_name"):
+        return [file_metadata["document_name"]]
+    return []
+
+
+# ============================================================================
+# watch 모드 (inotify, 미지원 환경에서는 주기적 재스캔)
+# ============================================================================
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """ctypes로 호출하는 inotify 기반 재귀 디렉터리 감시기입니다."""
+
+    def __init__(self, root):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify를 사용할 수 없는 환경입니다.")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.root = root
+        self.fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        self._dirs = {}
+        self.add_tree("")
+
+    def add_tree(self, reldir):
+        """reldir와 하위 디렉터리 전체에 감시를 추가합니다."""
+        for dirpath, dirnames, _ in os.walk(os.path.join(self.root, reldir)):
+            if SYNC_CONFIG["ignore_hidden"]:
+                dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd >= 0:
+                relpath = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+                self._dirs[wd] = "" if relpath == "." else relpath
+
+    def read_batch(self, debounce_seconds, stop_event):
+        """첫 이벤트를 기다린 뒤 debounce_seconds 동안 조용해질 때까지 이벤트를 모읍니다.
+
+        Returns:
+            (변경된 상대 경로 집합, 전체 재스캔 필요 여부)
+        """
+        paths = set()
+        rescan = False
+        timeout = 1.0
+        while not stop_event.is_set():
+            readable, _, _ = select.select([self.fd], [], [], timeout)
+            if not readable:
+                if paths or rescan:
+                    break
+                continue
+            batch_paths, batch_rescan = self._read_events()
+            paths |= batch_paths
+            rescan = rescan or batch_rescan
+            timeout = debounce_seconds
+        return paths, rescan
+
+    def close(self):
+        os.close(self.fd)
+
+    def _read_events(self):
+        paths = set()
+        rescan = False
+        buffer = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, name_len = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + name_len].rstrip(b"\0").decode("utf-8", "surrogateescape")
+            offset += name_len
+
+            if mask & IN_Q_OVERFLOW:
+                rescan = True
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            reldir = self._dirs.get(wd)
+            if reldir is None:
+                continue
+            relpath = f"{reldir}/{name}" if reldir and name else (name or reldir)
+
+            if mask & IN_ISDIR or mask & IN_DELETE_SELF:
+                # 디렉터리 생성/이동/삭제는 하위 파일 전체에 영향을 주므로 재스캔
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(relpath)
+                rescan = True
+            else:
+                paths.add(relpath)
+        return paths, rescan
+
+
+def watch_directory(client, root, store_name, stop_event=None, progress=None, on_sync=None, labels=None):
+    """폴더 변경을 감시하며 이벤트 묶음마다 증분 동기화합니다."""
+    stop_event = stop_event or threading.Event()
+
+    def run(paths=None):
+        summary, error = sync_directory(client, root, store_name, paths=paths,
+                                        cancel_event=stop_event, progress=progress, labels=labels)
+        if on_sync:
+            on_sync(summary, error)
+
+    try:
+        watcher = InotifyWatcher(root)
+    except OSError:
+        watcher = None
+
+    # 감시를 건 뒤 전체 동기화해야 그 사이의 변경을 놓치지 않음
+    run()
+
+    if watcher is None:
+        while not stop_event.wait(SYNC_CONFIG["watch_poll_interval_seconds"]):
+            run()
+        return
+
+    try:
+        while not stop_event.is_set():
+            paths, rescan = watcher.read_batch(SYNC_CONFIG["watch_debounce_seconds"], stop_event)
+            if rescan:
+                run()
+            elif paths:
+                run(paths)
+    finally:
+        watcher.close()
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _print_progress(action, relpath, error=None):
+    icons = {"uploaded": "⬆️", "touched": "🕒", "deleted": "🗑️", "failed": "❌"}
+    line = f"{icons.get(action, '•')} {action:<8} {relpath}"
+    print(f"{line} - {error}" if error else line, flush=True)
+
+
+def _print_summary(summary, error):
+    if error:
+        print(f"❌ {error}", flush=True)
+        return
+    if summary["dry_run"]:
+        print(
+            f"🔎 스캔 {summary['scanned']}개 | 변경 없음 {summary['unchanged']}개 | "
+            f"확인/업로드 예정 {summary['pending_upload']}개 | 삭제 예정 {summary['pending_delete']}개",
+            flush=True
+        )
+        return
+    print(
+        f"✅ 스캔 {summary['scanned']}개 | 변경 없음 {summary['unchanged'] + summary['touched']}개 | "
+        f"업로드 {summary['uploaded']}개 | 삭제 {summary['deleted']}개 | "
+        f"실패 {len(summary['failed'])}개 | {summary['duration_seconds']}초",
+        flush=True
+    )
+    if summary["stale_documents"]:
+        print(f"⚠️ 삭제하지 못한 이전 문서 {summary['stale_documents']}개는 다음 동기화 때 다시 삭제합니다", flush=True)
+
+
+def _precompute_after_sync(client, store_name, summary, error):
+    """Store가 바뀐 동기화 뒤에 자주 묻는 질문 답변을 미리 계산합니다."""
+    from precompute import run_precompute
+
+    if error or summary["dry_run"] or not (summary["uploaded"] or summary["deleted"]):
+        return
+    status = run_precompute(client, store_name)
+    done = sum(1 for result in status["questions"].values() if result in ("done", "cached"))
+    print(f"⚡ 답변 사전 계산 {done}/{len(status['questions'])}개 ({status['state']})", flush=True)
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    from gemini_api import initialize_client
+
+    parser = argparse.ArgumentParser(description="폴더를 File Search Store에 증분 동기화합니다.")
+    parser.add_argument("root", help="동기화할 폴더")
+    parser.add_argument("--store", required=True, help="Store 이름 (fileSearchStores/...)")
+    parser.add_argument("--watch", action="store_true", help="변경을 감시하며 계속 동기화")
+    parser.add_argument("--dry-run", action="store_true", help="업로드/삭제 없이 계획만 출력")
+    parser.add_argument("--workers", type=int, default=SYNC_CONFIG["max_parallel_files"],
+                        help="동시에 처리할 파일 수")
+    parser.add_argument("--label", action="append", default=[],
+                        help="업로드하는 문서에 붙일 라벨 (여러 번 지정 가능)")
+    parser.add_argument("--precompute", action="store_true",
+                        help="동기화로 Store가 바뀌면 자주 묻는 질문 답변을 미리 계산")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    SYNC_CONFIG["max_parallel_files"] = max(1, args.workers)
+    labels = parse_labels(",".join(args.label))
+
+    client, error = initialize_client()
+    if error:
+        print(f"❌ 클라이언트 초기화 실패: {error}", flush=True)
+        return 1
+
+    stop_event = threading.Event()
+    try:
+        if args.watch:
+            print(f"👀 {args.root} 감시 중... (Ctrl+C로 종료)", flush=True)
+            def on_sync(summary, error):
+                _print_summary(summary, error)
+                if args.precompute:
+                    _precompute_after_sync(client, args.store, summary, error)
+
+            watch_directory(client, args.root, args.store, stop_event=stop_event,
+                            progress=_print_progress, on_sync=on_sync, labels=labels)
+            return 0
+
+        summary, error = sync_directory(client, args.root, args.store, dry_run=args.dry_run,
+                                        cancel_event=stop_event, progress=_print_progress, labels=labels)
+        _print_summary(summary, error)
+        if args.precompute:
+            _precompute_after_sync(client, args.store, summary, error)
+        return 1 if error or summary["failed"] else 0
+    except KeyboardInterrupt:
+        stop_event.set()
+        print("⏹️ 중단되었습니다. 완료된 파일까지 매니페스트에 저장했습니다.", flush=True)
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""문서 메타데이터 태그와 검색 범위 필터
+
+업로드할 때 파일 이름, 파일 형식, 업로드 배치, 사용자 라벨, 내용 해시를 문서의
+custom_metadata로 붙이고, 질의할 때 선택한 파일/라벨을 FileSearch의
+metadata_filter 문자열(AIP-160 문법)로 바꿔 검색 대상 문서를 좁힙니다.
+"""
+
+import json
+import re
+import time
+import uuid
+
+from config import TAGGING_CONFIG
+
+
+def new_upload_batch_id():
+    """업로드 배치 ID를 만듭니다. (시간순 정렬 가능)"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def parse_labels(text):
+    """쉼표로 구분된 라벨 입력을 중복 없는 목록으로 바꿉니다."""
+    labels = []
+    for label in re.split(r"[,\n]", text or ""):
+        label = label.strip()
+        if label and label not in labels:
+            labels.append(label)
+    return labels[:TAGGING_CONFIG["max_labels"]]
+
+
+def build_tags(filename, file_type, content_hash, upload_batch=None, labels=None):
+    """파일 메타데이터에 기록할 태그 dict를 만듭니다."""
+    tags = {
+        "file_name": filename,
+        "file_type": file_type.lower().lstrip("."),
+        "content_hash": content_hash
+    }
+    if upload_batch:
+        tags["upload_batch"] = upload_batch
+    if labels:
+        tags["labels"] = list(labels)
+    return tags
+
+
+def to_custom_metadata(tags):
+    """태그 dict를 업로드 설정의 custom_metadata 목록으로 바꿉니다."""
+    custom_metadata = []
+    for key, value in tags.items():
+        if isinstance(value, list):
+            custom_metadata.append({"key": key, "string_list_value": {"values": value}})
+        else:
+            custom_metadata.append({"key": key, "string_value": str(value)})
+    return custom_metadata
+
+
+def from_custom_metadata(custom_metadata):
+    """문서의 custom_metadata를 태그 dict로 바꿉니다."""
+    tags = {}
+    for entry in custom_metadata or ():
+        if entry.string_list_value is not None:
+            tags[entry.key] = list(entry.string_list_value.values or ())
+        elif entry.string_value is not None:
+            tags[entry.key] = entry.string_value
+        elif entry.numeric_value is not None:
+            tags[entry.key] = entry.numeric_value
+    return tags
+
+
+def collect_scope_options(files_metadata, documents=None):
+    """검색 범위로 고를 수 있는 (파일 이름 목록, 라벨 목록)을 반환합니다.
+
+    세션에서 업로드한 파일의 태그와 워밍업 시 가져온 Store 문서의 태그를 합칩니다.
+    """
+    file_names = []
+    labels = []
+    tag_sets = [metadata.get("tags") or {} for metadata in files_metadata]
+    tag_sets += [document.get("tags") or {} for document in documents or ()]
+    for tags in tag_sets:
+        file_name = tags.get("file_name")
+        if file_name and file_name not in file_names:
+            file_names.append(file_name)
+        for label in tags.get("labels", ()):
+            if label not in labels:
+                labels.append(label)
+    return sorted(file_names), sorted(labels)
+
+
+def build_metadata_filter(file_names=None, labels=None):
+    """선택한 파일/라벨을 metadata_filter 문자열로 바꿉니다. 선택이 없으면 None을 반환합니다.
+
+    같은 종류 안에서는 OR, 파일과 라벨 사이는 AND로 묶습니다.
+    """
+    clauses = []
+    if file_names:
+        clauses.append(" OR ".join(f"file_name = {_quote(name)}" for name in sorted(file_names)))
+    if labels:
+        clauses.append(" OR ".join(f"labels:{_quote(label)}" for label in sorted(labels)))
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return " AND ".join(f"({clause})" for clause in clauses)
+
+
+def _quote(value):
+    return json.dumps(value, ensure_ascii=False)
@@ -0,0 +1,64 @@
+import pytest
+
+import shared_state
+from shared_state import MemoryBackend, SQLiteBackend, try_claim
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "shared.db"))
+    else:
+        backend = MemoryBackend()
+    shared_state.set_backend(backend)
+    yield backend
+    shared_state.set_backend(None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(shared_state.time, "time", clock)
+    return clock
+
+
+def test_second_claim_keeps_first_expiry(backend, clock):
+    assert try_claim("precompute:store", ttl_seconds=10)
+
+    clock.now += 6
+    assert not try_claim("precompute:store", ttl_seconds=10)
+
+    # 두 번째 호출이 만료 시각을 늦췄다면 아직 맡을 수 없어야 함
+    clock.now += 5
+    assert try_claim("precompute:store", ttl_seconds=10)
+
+
+def test_claim_race_does_not_extend_expiry(backend, clock, monkeypatch):
+    assert try_claim("precompute:store", ttl_seconds=10)
+
+    # 다른 워커가 조회한 직후 먼저 맡은 경우처럼, 잠금 밖의 조회로는 기존 claim이 보이지 않게 함
+    monkeypatch.setattr(backend, "get", lambda namespace, key: None)
+    clock.now += 6
+    assert not try_claim("precompute:store", ttl_seconds=10)
+
+    clock.now += 5
+    assert try_claim("precompute:store", ttl_seconds=10)
+
+
+def test_update_returning_new_value_applies_ttl(backend, clock):
+    backend.update("ns", "key", lambda value: {"count": 1}, ttl_seconds=10)
+    clock.now += 6
+    backend.update("ns", "key", lambda value: {"count": value["count"] + 1}, ttl_seconds=10)
+
+    clock.now += 5
+    assert backend.get("ns", "key") == {"count": 2}
+    clock.now += 6
+    assert backend.get("ns", "key") is None
@@ -0,0 +1,51 @@
+from config import SPLIT_CONFIG
+from splitter import resolve_source, split_file
+
+
+def test_single_long_line_is_split_at_byte_limit(monkeypatch):
+    monkeypatch.setitem(SPLIT_CONFIG, "max_part_bytes", 1000)
+    text = "가나다abc" * 2000  # 줄바꿈 없는 한 줄 (문자마다 1~3바이트)
+    data = text.encode("utf-8")
+
+    parts = split_file("minified.txt", data)
+
+    assert len(parts) > 1
+    assert all(part.size <= 1000 for part in parts)
+    # 문자 경계에서 잘렸으므로 각 파트가 그대로 디코딩되고, 합치면 원본과 같음
+    assert "".join(part.getbuffer().tobytes().decode("utf-8") for part in parts) == text
+    assert {part.part_range for part in parts} == {"lines 1-1"}
+
+
+def test_long_line_after_short_lines_keeps_line_numbers(monkeypatch):
+    monkeypatch.setitem(SPLIT_CONFIG, "max_part_bytes", 100)
+    text = "first\nsecond\n" + "x" * 250 + "\nlast\n"
+
+    parts = split_file("mixed.txt", text.encode("utf-8"))
+
+    assert b"".join(part.getbuffer().tobytes() for part in parts) == text.encode("utf-8")
+    assert all(part.size <= 100 for part in parts)
+    assert [part.part_range for part in parts] == ["lines 1-2", "lines 3-3", "lines 3-3", "lines 3-4"]
+
+
+def test_csv_without_newlines_is_split(monkeypatch):
+    monkeypatch.setitem(SPLIT_CONFIG, "max_part_bytes", 500)
+    text = ",".join(f"column{idx}" for idx in range(500))
+
+    parts = split_file("wide.csv", text.encode("utf-8"))
+
+    assert len(parts) > 1
+    assert all(part.size <= 500 for part in parts)
+
+
+def test_character_larger_than_limit_is_kept_whole(monkeypatch):
+    monkeypatch.setitem(SPLIT_CONFIG, "max_part_bytes", 2)
+    text = "가나다"
+
+    parts = split_file("tiny.txt", text.encode("utf-8"))
+
+    assert [part.getbuffer().tobytes().decode("utf-8") for part in parts] == ["가", "나", "다"]
+
+
+def test_part_names_resolve_to_source():
+    assert resolve_source("report.part002-of-010.md") == ("report.md", "2/10")
+    assert resolve_source("report.md") == ("report.md", None)
@@ -0,0 +1,65 @@
+import pytest
+
+import shared_state
+import utils
+from config import STATS_CONFIG
+from shared_state import NAMESPACE_STORE_STATS, MemoryBackend, SQLiteBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path, monkeypatch):
+    monkeypatch.setitem(STATS_CONFIG, "dir", str(tmp_path / "stores"))
+    if request.param == "sqlite":
+        backend = SQLiteBackend(str(tmp_path / "shared.db"))
+    else:
+        backend = MemoryBackend()
+    shared_state.set_backend(backend)
+    yield backend
+    shared_state.set_backend(None)
+
+
+def test_counter_updates_do_not_touch_latency_windows(backend):
+    utils.update_store_stats("store", lambda stats: utils.stats_record_query(stats, 1.5))
+    window_key = "store|query_latency"
+    window = backend.get(NAMESPACE_STORE_STATS, window_key)
+
+    view = utils.update_store_stats("store", lambda stats: utils.stats_record_cache_lookup(stats, True))
+
+    assert backend.get(NAMESPACE_STORE_STATS, window_key) == window
+    assert view["answer_cache"] == {"lookups": 1, "hits": 1}
+    assert view["query_latency"]["count"] == 1
+    assert "sorted" not in view["query_latency"]
+
+
+def test_view_summarizes_latency(backend):
+    for seconds in range(1, 101):
+        view = utils.update_store_stats("store", lambda stats: utils.stats_record_query(stats, float(seconds)))
+
+    assert view["query_count"] == 100
+    assert view["query_latency"]["count"] == 100
+    assert utils.query_latency_percentile(view, 95, 20) == 95.0
+    assert utils.query_latency_percentile(view, 95, 200) is None
+    assert utils.get_store_stats(view, [])["query_p50_seconds"] == 50.0
+
+
+def test_export_and_snapshot_keep_samples(backend):
+    for seconds in (3.0, 1.0, 2.0):
+        utils.update_store_stats("store", lambda stats: utils.stats_record_query(stats, seconds))
+
+    exported = utils.export_store_stats("store")
+    assert exported["query_latency"]["sorted"] == [1.0, 2.0, 3.0]
+
+    utils.save_store_stats("store", force=True)
+    shared_state.set_backend(MemoryBackend())
+    view = utils.load_store_stats("store")
+    assert view["query_count"] == 3
+    assert view["query_latency"]["p50"] == 2.0
+
+
+def test_seed_keeps_existing_stats(backend):
+    utils.update_store_stats("store", lambda stats: utils.stats_record_query(stats, 1.0))
+    restored = utils.new_store_stats()
+    restored["query_count"] = 42
+
+    assert utils.seed_store_stats("store", restored)["query_count"] == 1
+    assert utils.seed_store_stats("other", restored)["query_count"] == 42
@@ -18,6 +18,95 @@ def render_file_metadata_sidebar(file_meta):
 
     st.markdown(f"**업로드 시간:** {file_meta['upload_duration_seconds']}초")
 
+    if file_meta.get('tags', {}).get('labels'):
+        st.markdown("**라벨:** " + ", ".join(f"`{label}`" for label in file_meta['tags']['labels']))
+
+    if file_meta.get('parts'):
+        st.markdown(f"**분할 업로드:** {file_meta['part_count']}개 파트")
+        for part in file_meta['parts']:
+            st.caption(f"{part['part_index']}. {part['part_range']} ({part['file_size_mb']} MB, {part['upload_duration_seconds']}초)")
+
+
+def render_store_stats(stats):
+    """사이드바에 Store 통계를 렌더링합니다."""
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("파일", stats["uploaded_files"])
+        st.metric("대화", stats["chat_messages"])
+        if stats["total_chunks"] > 0:
+            st.metric("추정 청크", f"~{stats['total_chunks']:,}")
+    with col2:
+        st.metric("총 크기", f"{stats['total_size_mb']:.1f} MB")
+        if stats["total_tokens"] > 0:
+            st.metric("총 토큰", f"~{stats['total_tokens']:,}")
+        st.metric("질의", stats["query_count"])
+
+    if stats["extension_counts"]:
+        st.caption("확장자별 파일: " + ", ".join(
+            f"`{ext}` {count}" for ext, count in sorted(stats["extension_counts"].items())
+        ))
+
+    if stats["upload_throughput_mbps"] is not None:
+        st.caption(
+            f"업로드 처리량 {stats['upload_throughput_mbps']:.2f} MB/s · "
+            f"p50 {stats['upload_p50_seconds']:.1f}초 · p95 {stats['upload_p95_seconds']:.1f}초"
+        )
+
+    if stats["query_count"]:
+        st.caption(
+            f"질의 응답 평균 {stats['query_avg_seconds']:.1f}초 · "
+            f"p50 {stats['query_p50_seconds']:.1f}초 · p95 {stats['query_p95_seconds']:.1f}초"
+        )
+
+    first_query = []
+    if stats["first_query_warm_seconds"] is not None:
+        first_query.append(f"워밍업 후 {stats['first_query_warm_seconds']:.1f}초")
+    if stats["first_query_cold_seconds"] is not None:
+        first_query.append(f"콜드 {stats['first_query_cold_seconds']:.1f}초")
+    if first_query:
+        st.caption("첫 질의 평균: " + " · ".join(first_query))
+
+    if stats["answer_cache_hit_rate"] is not None:
+        cache_caption = (
+            f"답변 캐시 적중률 {stats['answer_cache_hit_rate']:.0%} "
+            f"({stats['answer_cache_lookups']}회 조회)"
+        )
+        if stats["canned_hit_rate"] is not None:
+            cache_caption += f" · 예시 질문 {stats['canned_hit_rate']:.0%}"
+        st.caption(cache_caption)
+        if stats["canned_questions"]:
+            with st.expander("예시 질문별 적중률"):
+                for question, entry in sorted(
+                    stats["canned_questions"].items(), key=lambda item: -item[1]["asked"]
+                ):
+                    st.caption(f"{question}: {entry['hits']}/{entry['asked']}")
+
+
+def render_warmup_status(warmup):
+    """Store 워밍업 상태를 렌더링합니다."""
+    if not warmup:
+        return
+    if warmup["state"] == "running":
+        st.caption("🔥 연결 워밍업 중...")
+        return
+
+    documents = warmup["documents"]
+    document_label = f", 문서 {len(documents)}개" if documents is not None else ""
+    st.caption(f"🔥 워밍업 완료 ({warmup['duration_seconds']:.1f}초{document_label})")
+    if warmup["errors"]:
+        st.caption(f"⚠️ 워밍업 일부 실패: {warmup['errors'][0]}")
+
+
+def render_annotated_answer(annotated_answer, footnotes):
+    """인라인 출처 번호가 삽입된 답변과 각주를 렌더링합니다."""
+    st.markdown(annotated_answer)
+
+    if footnotes:
+        st.caption("\n\n".join(
+            f"\\[{number}\\] **{title}** — {text}" if text else f"\\[{number}\\] **{title}**"
+            for number, title, text in footnotes
+        ))
+
 
 def render_source_citations(chunks):
     """검색된 출처를 렌더링합니다."""
@@ -28,7 +117,9 @@ def render_source_citations(chunks):
             if "retrieved_context" in chunk:
                 ctx = chunk["retrieved_context"]
 
-                if "title" in ctx:
+                if "source_file" in ctx:
+                    st.markdown(f"**📌 제목:** {ctx['source_file']} (파트 {ctx['part']})")
+                elif "title" in ctx:
                     st.markdown(f"**📌 제목:** {ctx['title']}")
                 if "uri" in ctx:
                     st.markdown(f"**🔗 파일:** `{ctx['uri']}`")
@@ -130,30 +221,90 @@ def render_file_metadata_detail(file_metadata):
 오버랩 토큰: {chunking['max_overlap_tokens']}
     """.strip())
 
+    # 로컬 텍스트 추출 정보 표시
+    if file_metadata.get('extraction'):
+        extraction = file_metadata['extraction']
+        uploaded_as = "추출된 텍스트" if extraction['uploaded_as'] == "text" else "원본 파일"
+        cache_label = " (캐시 사용)" if extraction.get('cached') else ""
+        st.markdown(
+            f"**📄 로컬 텍스트 추출:** `{extraction['method']}`{cache_label} · "
+            f"추출 텍스트 {extraction['extracted_bytes']:,} bytes · 업로드 형식: {uploaded_as}"
+        )
+        if extraction.get('text_sufficient') is False:
+            st.caption("⚠️ 추출된 텍스트가 거의 없어(스캔/이미지 문서) 원본 파일을 업로드했습니다")
+
+    # 문서 태그 (검색 범위 필터에 사용)
+    if file_metadata.get('tags'):
+        tags = file_metadata['tags']
+        tag_items = [f"형식 `{tags['file_type']}`"]
+        if tags.get('upload_batch'):
+            tag_items.append(f"배치 `{tags['upload_batch']}`")
+        if tags.get('labels'):
+            tag_items.append("라벨 " + ", ".join(f"`{label}`" for label in tags['labels']))
+        tag_items.append(f"해시 `{tags['content_hash'][:12]}`")
+        st.markdown("**🏷️ 태그:** " + " · ".join(tag_items))
+
+    # 분할 업로드 파트 표시
+    if file_metadata.get('parts'):
+        st.markdown(f"**✂️ 분할 업로드:** {file_metadata['part_count']}개 파트로 병렬 업로드")
+        st.table([
+            {
+                "파트": part['filename'],
+                "범위": part['part_range'],
+                "크기 (MB)": part['file_size_mb'],
+                "업로드 시간 (초)": part['upload_duration_seconds']
+            }
+            for part in file_metadata['parts']
+        ])
+
     # Operation 결과 (고급 정보)
-    if file_metadata.get('operation_result') or file_metadata.get('operation_metadata'):
+    if file_metadata.get('operation'):
         with st.expander("🔍 Gemini API 응답 (고급)"):
-            if file_metadata.get('operation_result'):
-                st.markdown("### Operation Result")
-                st.json(file_metadata['operation_result'])
+            st.json(file_metadata['operation'])
+
+
+def render_example_questions(questions, ready, precompute_status):
+    """예시 질문을 렌더링합니다. 답변이 미리 준비된 질문은 ⚡로 표시됩니다."""
+    with st.expander("📝 질문 예시 보기", expanded=bool(ready)):
+        for idx, question in enumerate(questions):
+            label = f"⚡ {question}" if question in ready else question
+            st.button(
+                label,
+                key=f"example_question_{idx}",
+                on_click=_ask_question,
+                args=(question,)
+            )
+
+        if precompute_status and precompute_status["state"] == "running":
+            st.caption("⏳ 자주 묻는 질문의 답변을 미리 준비하는 중...")
+        elif ready:
+            st.caption(f"⚡ 표시된 질문은 미리 준비된 답변을 바로 보여줍니다 ({len(ready)}/{len(questions)})")
 
-            if file_metadata.get('operation_metadata'):
-                st.markdown("### Operation Metadata")
-                st.json(file_metadata['operation_metadata'])
-
-
-def render_example_questions():
-    """예시 질문을 렌더링합니다."""
-    with st.expander("📝 질문 예시 보기"):
         st.markdown("""
-        - 이 문서의 주요 내용을 요약해주세요
         - [특정 주제]에 대해 설명해주세요
         - [키워드]가 언급된 부분을 찾아주세요
         - [개념A]와 [개념B]의 차이점은 무엇인가요?
-        - 문서에서 중요한 숫자나 통계가 있나요?
         """)
 
 
+def _ask_question(question):
+    st.session_state.pending_question = question
+
+
+def render_search_scope(file_names, labels):
+    """질문 검색 범위(파일/라벨) 선택 UI를 렌더링하고 (선택한 파일, 선택한 라벨)을 반환합니다."""
+    if not file_names and not labels:
+        return [], []
+
+    with st.expander("🎯 검색 범위", expanded=bool(
+        st.session_state.get("scope_files") or st.session_state.get("scope_labels")
+    )):
+        st.caption("선택하지 않으면 Store의 모든 문서에서 검색합니다.")
+        selected_files = st.multiselect("파일", file_names, key="scope_files") if file_names else []
+        selected_labels = st.multiselect("라벨", labels, key="scope_labels") if labels else []
+    return selected_files, selected_labels
+
+
 def render_footer():
     """푸터를 렌더링합니다."""
     st.divider()
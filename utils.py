@@ -1,15 +1,401 @@
 """유틸리티 함수들"""
 
+import bisect
+import copy
+import json
+import os
+import re
+import tempfile
+import threading
+import time
 
-def get_store_stats(uploaded_files_metadata, chat_history):
-    """현재 Store의 통계 정보를 반환합니다."""
-    stats = {
-        "uploaded_files": len(uploaded_files_metadata),
-        "total_size_mb": sum(f.get("file_size_mb", 0) for f in uploaded_files_metadata),
-        "total_tokens": sum(
-            f.get("estimated_tokens", 0) if isinstance(f.get("estimated_tokens"), int) else 0
-            for f in uploaded_files_metadata
+from config import STATS_CONFIG
+from shared_state import NAMESPACE_STORE_STATS, get_backend
+
+LATENCY_WINDOWS = ("upload_latency", "query_latency")
+LATENCY_PERCENTILES = (50, 95)
+
+_PENDING_SAMPLES = "_pending_samples"
+
+_saved_at = {}
+_saved_at_lock = threading.Lock()
+
+
+def new_store_stats():
+    """업로드/삭제/질의 시 증분으로 갱신되는 Store 통계 객체를 생성합니다."""
+    return {
+        "file_count": 0,
+        "total_bytes": 0,
+        "total_tokens": 0,
+        "total_chunks": 0,
+        "extension_counts": {},
+        "upload_bytes": 0,
+        "upload_seconds": 0.0,
+        "upload_latency": _new_latency_window(),
+        "query_count": 0,
+        "query_seconds": 0.0,
+        "query_latency": _new_latency_window(),
+        "first_query": {
+            "warm": {"count": 0, "seconds": 0.0},
+            "cold": {"count": 0, "seconds": 0.0}
+        },
+        "answer_cache": {"lookups": 0, "hits": 0},
+        "canned_questions": {}
+    }
+
+
+def stats_add_file(stats, file_metadata):
+    """업로드된 파일을 통계에 반영합니다."""
+    _apply_file(stats, file_metadata, 1)
+    duration = file_metadata.get("upload_duration_seconds")
+    if isinstance(duration, (int, float)):
+        stats["upload_bytes"] += file_metadata["file_size_bytes"]
+        stats["upload_seconds"] += duration
+        _add_sample(stats, "upload_latency", duration)
+
+
+def stats_remove_file(stats, file_metadata):
+    """삭제된 파일을 통계에서 제외합니다. (업로드 처리량/지연 기록은 유지)"""
+    _apply_file(stats, file_metadata, -1)
+
+
+def stats_record_query(stats, duration_seconds):
+    """질의 1회와 응답 시간을 통계에 반영합니다."""
+    stats["query_count"] += 1
+    stats["query_seconds"] += duration_seconds
+    _add_sample(stats, "query_latency", duration_seconds)
+
+
+def stats_record_first_query(stats, duration_seconds, warm):
+    """Store 활성화 후 첫 질의의 응답 시간을 워밍업 여부별로 기록합니다."""
+    bucket = stats["first_query"]["warm" if warm else "cold"]
+    bucket["count"] += 1
+    bucket["seconds"] += duration_seconds
+
+
+def stats_record_cache_lookup(stats, hit):
+    """답변 캐시 조회 결과를 기록합니다."""
+    stats["answer_cache"]["lookups"] += 1
+    if hit:
+        stats["answer_cache"]["hits"] += 1
+
+
+def stats_record_canned_question(stats, question, hit):
+    """사전 계산 대상 질문이 들어왔을 때 캐시 적중 여부를 질문별로 기록합니다."""
+    entry = stats["canned_questions"].setdefault(question, {"asked": 0, "hits": 0})
+    entry["asked"] += 1
+    if hit:
+        entry["hits"] += 1
+
+
+def get_store_stats(store_stats, chat_history):
+    """현재 Store의 통계 정보를 반환합니다. (세션에 보관한 통계 요약의 집계값만 읽음)"""
+    upload_latency = store_stats["upload_latency"]
+    query_latency = store_stats["query_latency"]
+    upload_seconds = store_stats["upload_seconds"]
+
+    return {
+        "uploaded_files": store_stats["file_count"],
+        "total_size_mb": store_stats["total_bytes"] / (1024 * 1024),
+        "total_tokens": store_stats["total_tokens"],
+        "total_chunks": store_stats["total_chunks"],
+        "extension_counts": store_stats["extension_counts"],
+        "upload_throughput_mbps": (
+            store_stats["upload_bytes"] / (1024 * 1024) / upload_seconds if upload_seconds > 0 else None
+        ),
+        "upload_p50_seconds": upload_latency["p50"],
+        "upload_p95_seconds": upload_latency["p95"],
+        "query_count": store_stats["query_count"],
+        "query_avg_seconds": (
+            store_stats["query_seconds"] / store_stats["query_count"] if store_stats["query_count"] else None
+        ),
+        "query_p50_seconds": query_latency["p50"],
+        "query_p95_seconds": query_latency["p95"],
+        "first_query_warm_seconds": _average(store_stats["first_query"]["warm"]),
+        "first_query_cold_seconds": _average(store_stats["first_query"]["cold"]),
+        "answer_cache_lookups": store_stats["answer_cache"]["lookups"],
+        "answer_cache_hit_rate": _ratio(store_stats["answer_cache"]["hits"], store_stats["answer_cache"]["lookups"]),
+        "canned_questions": store_stats["canned_questions"],
+        "canned_hit_rate": _ratio(
+            sum(entry["hits"] for entry in store_stats["canned_questions"].values()),
+            sum(entry["asked"] for entry in store_stats["canned_questions"].values())
         ),
         "chat_messages": len(chat_history)
     }
+
+
+def query_latency_percentile(store_stats, percent, min_samples):
+    """질의 응답 시간 백분위수(LATENCY_PERCENTILES 중 하나)를 반환합니다.
+
+    샘플이 min_samples보다 적으면 None입니다.
+    """
+    summary = store_stats["query_latency"]
+    if summary["count"] < min_samples:
+        return None
+    return summary[f"p{percent}"]
+
+
+def load_store_stats(store_name):
+    """세션에 보관할 Store 통계 요약을 반환합니다.
+
+    공유 상태에 없으면 Store별 파일에서, 파일도 없으면 새 통계로 공유 상태를 채웁니다.
+    """
+    return update_store_stats(store_name)
+
+
+def update_store_stats(store_name, *changes):
+    """공유 상태의 최신 Store 통계에 changes(통계를 받아 수정하는 함수)를 원자적으로 적용합니다.
+
+    여러 워커/세션이 같은 Store 통계를 갱신해도 서로의 값을 덮어쓰지 않습니다.
+    세션에 보관할 통계 요약(카운터와 지연 시간 창별 샘플 수/백분위수)을 반환합니다.
+    """
+    return _update_counters(store_name, changes, lambda: _read_stats_file(store_name))
+
+
+def seed_store_stats(store_name, stats):
+    """공유 상태에 통계가 없을 때만 stats로 채우고 통계 요약을 반환합니다. (세션 복원용)"""
+    return _update_counters(store_name, (), lambda: _with_defaults(copy.deepcopy(stats)))
+
+
+def export_store_stats(store_name):
+    """지연 시간 샘플까지 포함한 Store 통계 전체 사본을 반환합니다. (세션 내보내기, 스냅샷용)"""
+    load_store_stats(store_name)
+    stats = _read_locked(store_name, new_store_stats)
+    for key in LATENCY_WINDOWS:
+        stats[key] = _read_locked(_window_key(store_name, key), _new_latency_window)
     return stats
+
+
+def store_stats_view(stats):
+    """전체 통계를 세션에 보관하는 요약 형식(지연 시간 창 대신 샘플 수/백분위수)으로 바꾼 사본을 반환합니다."""
+    view = _with_defaults(copy.deepcopy(stats))
+    _to_counters(view, {})
+    return view
+
+
+def save_store_stats(store_name, force=False):
+    """공유 상태의 통계를 Store별 파일에 저장합니다. (재시작 후 공유 상태가 비어 있을 때 불러올 스냅샷)
+
+    질의마다 지연 시간 샘플 전체를 쓰지 않도록 save_interval_seconds 안에 다시 부르면
+    건너뜁니다. force=True면 바로 저장합니다.
+    """
+    now = time.monotonic()
+    with _saved_at_lock:
+        if not force and now - _saved_at.get(store_name, float("-inf")) < STATS_CONFIG["save_interval_seconds"]:
+            return
+        _saved_at[store_name] = now
+
+    stats = export_store_stats(store_name)
+    path = _stats_path(store_name)
+    temp_path = None
+    try:
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # 여러 세션/워커가 동시에 저장해도 임시 파일이 겹치지 않도록 고유한 이름 사용
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(stats, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except OSError:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _update_counters(store_name, changes, initial):
+    """카운터를 백엔드 잠금 안에서 제자리 수정하고, 모인 지연 시간 샘플을 창에 기록합니다.
+
+    공유 상태에는 카운터(지연 시간 창 자리에는 요약)와 창별 샘플을 다른 키로 두므로,
+    카운터만 바뀌는 갱신은 샘플 목록을 읽거나 직렬화하지 않습니다. 공유된 객체는
+    잠금 밖으로 내보내지 않고 요약 사본만 반환합니다.
+    initial()은 공유 상태에 통계가 없을 때 채울 전체 통계를 만듭니다.
+    """
+    view = []
+    samples = {}
+    windows = {}
+
+    def apply(stats):
+        if stats is None:
+            stats = initial()
+        _to_counters(stats, windows)
+        for change in changes:
+            change(stats)
+        samples.update(stats.pop(_PENDING_SAMPLES, {}))
+        view.append(copy.deepcopy(stats))
+        return stats
+
+    get_backend().update(NAMESPACE_STORE_STATS, store_name, apply)
+    if not samples and not windows:
+        return view[0]
+
+    summaries = {
+        key: _update_window(store_name, key, samples.get(key, ()), windows.get(key))
+        for key in set(samples) | set(windows)
+    }
+
+    def merge(stats):
+        if stats is None:
+            stats = initial()
+        _to_counters(stats, {})
+        for key, summary in summaries.items():
+            # 다른 워커가 더 최근 창 요약을 먼저 반영했으면 유지
+            if summary["updated_at"] > stats[key].get("updated_at", 0):
+                stats[key] = summary
+        view[0] = copy.deepcopy(stats)
+        return stats
+
+    get_backend().update(NAMESPACE_STORE_STATS, store_name, merge)
+    return view[0]
+
+
+def _update_window(store_name, key, values, seed):
+    """지연 시간 창에 샘플을 기록하고 창 요약을 반환합니다. 창이 없으면 seed(또는 빈 창)로 시작합니다."""
+    summary = []
+
+    def apply(window):
+        if window is None:
+            window = seed or _new_latency_window()
+        for value in values:
+            _record_latency(window, value)
+        if values:
+            window["updated_at"] = time.time()
+        summary.append(_latency_summary(window))
+        return window
+
+    get_backend().update(NAMESPACE_STORE_STATS, _window_key(store_name, key), apply)
+    return summary[0]
+
+
+def _read_locked(key, default):
+    """공유 상태 값을 백엔드 잠금 안에서 복사해 반환합니다. 없으면 default()로 채웁니다."""
+    result = []
+
+    def read(value):
+        if value is None:
+            value = default()
+        result.append(copy.deepcopy(value))
+        return value
+
+    get_backend().update(NAMESPACE_STORE_STATS, key, read)
+    return result[0]
+
+
+def _to_counters(stats, windows):
+    """통계를 공유 상태의 카운터 형식으로 제자리 변환합니다.
+
+    빠진 필드는 기본값으로 채우고, 지연 시간 창이 들어 있으면(파일/세션/이전 형식)
+    windows로 옮긴 뒤 그 자리에 요약을 둡니다.
+    """
+    missing = _STATS_FIELDS - stats.keys()
+    if missing:
+        defaults = new_store_stats()
+        for key in missing:
+            stats[key] = defaults[key]
+    for key in LATENCY_WINDOWS:
+        if "sorted" in stats[key]:
+            windows[key] = stats[key]
+            stats[key] = _latency_summary(stats[key])
+
+
+def _latency_summary(window):
+    samples = window["sorted"]
+    summary = {"count": len(samples), "updated_at": window.get("updated_at", 0)}
+    for percent in LATENCY_PERCENTILES:
+        summary[f"p{percent}"] = _percentile(samples, percent)
+    return summary
+
+
+def _window_key(store_name, key):
+    return f"{store_name}|{key}"
+
+
+def _add_sample(stats, key, value):
+    # 지연 시간 창은 별도 키에 있으므로 샘플을 모아 두고 update_store_stats가 창에 기록
+    stats.setdefault(_PENDING_SAMPLES, {}).setdefault(key, []).append(value)
+
+
+def _read_stats_file(store_name):
+    try:
+        with open(_stats_path(store_name), "r", encoding="utf-8") as f:
+            stats = json.load(f)
+    except (OSError, ValueError):
+        return new_store_stats()
+    return _with_defaults(stats)
+
+
+def _with_defaults(stats):
+    # 새로 추가된 필드가 있어도 오래된 통계를 읽을 수 있도록 기본값과 병합
+    merged = new_store_stats()
+    merged.update(stats)
+    return merged
+
+
+
+def _stats_path(store_name):
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", store_name)
+    return os.path.join(STATS_CONFIG["dir"], f"{safe_name}.stats.json")
+
+
+def _apply_file(stats, file_metadata, sign):
+    stats["file_count"] += sign
+    stats["total_bytes"] += sign * file_metadata.get("file_size_bytes", 0)
+
+    tokens = file_metadata.get("estimated_tokens")
+    if isinstance(tokens, int):
+        stats["total_tokens"] += sign * tokens
+
+    chunks = file_metadata.get("estimated_chunks")
+    if isinstance(chunks, int):
+        stats["total_chunks"] += sign * chunks
+
+    ext = (file_metadata.get("file_type") or "").lower() or "(없음)"
+    count = stats["extension_counts"].get(ext, 0) + sign
+    if count > 0:
+        stats["extension_counts"][ext] = count
+    else:
+        stats["extension_counts"].pop(ext, None)
+
+
+def _new_latency_window():
+    """최근 N개 지연 시간 샘플
+
+    recent는 next 위치를 덮어쓰는 원형 버퍼(입력 순서), sorted는 백분위수 계산용
+    정렬 사본입니다. 통계는 공유 상태/파일/세션 파일에 JSON으로 저장되므로 deque
+    대신 리스트와 인덱스로 둡니다.
+    """
+    return {"recent": [], "sorted": [], "next": 0}
+
+
+_STATS_FIELDS = frozenset(new_store_stats())
+
+
+def _record_latency(window, value):
+    """샘플 하나를 기록합니다.
+
+    가장 오래된 샘플 교체는 O(1), 정렬 사본 갱신은 이진 탐색 O(log N)과
+    max_latency_samples개 이하 리스트의 요소 이동입니다.
+    """
+    recent = window["recent"]
+    if len(recent) < STATS_CONFIG["max_latency_samples"]:
+        recent.append(value)
+    else:
+        index = window.get("next", 0) % len(recent)
+        oldest = recent[index]
+        recent[index] = value
+        window["next"] = (index + 1) % len(recent)
+        del window["sorted"][bisect.bisect_left(window["sorted"], oldest)]
+    bisect.insort(window["sorted"], value)
+
+
+def _ratio(part, total):
+    return part / total if total else None
+
+
+def _average(bucket):
+    return bucket["seconds"] / bucket["count"] if bucket["count"] else None
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
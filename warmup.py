@@ -0,0 +1,79 @@
+"""Store 활성화 시 백그라운드 워밍업 함수들
+
+Store가 활성화되면 별도 스레드에서 API 연결(TLS 포함)을 열고, Store 정보와 문서
+목록을 미리 가져오며, 추출 캐시 같은 로컬 캐시를 준비하고, 선택적으로
+모델 호출 경로를 예열합니다. 결과는 상태 딕셔너리에 기록되어 UI가 블로킹 없이 읽을
+수 있습니다.
+"""
+
+import threading
+import time
+
+from config import WARMUP_CONFIG
+from extractor import warm_up as warm_up_extractor
+from gemini_api import get_store, list_documents, prime_model
+
+
+def start_store_warmup(client, store_name):
+    """워밍업 스레드를 시작하고 상태 딕셔너리를 반환합니다. 비활성화 시 None을 반환합니다."""
+    if not WARMUP_CONFIG["enabled"]:
+        return None
+
+    status = {
+        "store_name": store_name,
+        "state": "running",
+        "documents": None,
+        "steps": {},
+        "errors": [],
+        "duration_seconds": None
+    }
+    thread = threading.Thread(
+        target=_run_warmup,
+        args=(client, store_name, status),
+        name=f"warmup-{store_name}",
+        daemon=True
+    )
+    thread.start()
+    return status
+
+
+def is_warm(status):
+    """워밍업이 완료되었는지 확인합니다."""
+    return bool(status) and status["state"] == "done"
+
+
+def _run_warmup(client, store_name, status):
+    start_time = time.perf_counter()
+
+    # 연결 풀/TLS 세션 생성 및 Store 메타데이터 확인
+    step_start = time.perf_counter()
+    _, error = get_store(client, store_name)
+    status["steps"]["store"] = round(time.perf_counter() - step_start, 3)
+    if error:
+        status["errors"].append(error)
+
+    # 문서 목록 미리 가져오기
+    step_start = time.perf_counter()
+    documents, error = list_documents(client, store_name, limit=WARMUP_CONFIG["max_documents"])
+    status["steps"]["documents"] = round(time.perf_counter() - step_start, 3)
+    if error:
+        status["errors"].append(error)
+    else:
+        status["documents"] = documents
+
+    # 로컬 캐시 준비: 첫 업로드가 기다리지 않도록 추출 캐시 디렉터리와 PDF 파서를 준비
+    # (Store 통계 파일은 활성화 시 load_store_stats가 이미 공유 상태에 올림)
+    step_start = time.perf_counter()
+    warm_up_extractor()
+    status["steps"]["local_caches"] = round(time.perf_counter() - step_start, 3)
+
+    # 모델 첫 토큰 지연 예열 (토큰 비용이 있으므로 선택 사항)
+    if WARMUP_CONFIG["prime_model"]:
+        step_start = time.perf_counter()
+        _, error = prime_model(client)
+        status["steps"]["model"] = round(time.perf_counter() - step_start, 3)
+        if error:
+            status["errors"].append(error)
+
+    status["duration_seconds"] = round(time.perf_counter() - start_time, 3)
+    status["state"] = "done"